@@ -0,0 +1,138 @@
+"""
+Parallel Gather Timing Check
+
+Runs the system_info_gatherer ParallelAgent (the real CPU, memory and disk
+agents and tools) and checks that its wall time matches the slowest tool, not
+the sum of all of them.
+
+No model is called: each agent gets a scripted model that calls the agent's
+tool once and then answers. To make the difference measurable, every tool is
+slowed down by a fixed delay (--delays, in seconds, for cpu/memory/disk). The
+check runs twice:
+
+- blocking: the original synchronous tools, which hold the event loop
+- offloaded: the tools as shipped, run in the thread pool
+
+and fails (exit code 1) unless the offloaded run takes about as long as the
+slowest tool.
+
+Usage:
+    python check_parallel_timing.py [--delays 1.0 0.5 1.5]
+"""
+
+import argparse
+import asyncio
+import functools
+import logging
+import sys
+import time
+from typing import AsyncGenerator
+
+from google.adk.agents import ParallelAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from system_monitor_agent.offload import run_in_thread
+from system_monitor_agent.subagents.cpu_info_agent import cpu_info_agent
+from system_monitor_agent.subagents.disk_info_agent import disk_info_agent
+from system_monitor_agent.subagents.memory_info_agent import memory_info_agent
+
+# ParallelAgent runs sub-agents in separate tasks, which makes OpenTelemetry
+# log harmless "Failed to detach context" errors
+logging.getLogger("opentelemetry.context").setLevel(logging.CRITICAL)
+
+# Slack for scheduling and event handling on top of the slowest tool
+TOLERANCE_SECONDS = 0.3
+
+
+class ScriptedLlm(BaseLlm):
+    """Calls the agent's only tool, then answers with a fixed text."""
+
+    model: str = "scripted"
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        last = llm_request.contents[-1] if llm_request.contents else None
+        if last and any(part.function_response for part in last.parts or []):
+            part = types.Part(text="done")
+        else:
+            tool_name = next(iter(llm_request.tools_dict))
+            part = types.Part(function_call=types.FunctionCall(name=tool_name, args={}))
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+def delayed(func, seconds):
+    """Wrap a blocking tool function so it takes `seconds` longer."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        time.sleep(seconds)
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def build_gatherer(delays, offloaded):
+    agents = []
+    for agent, delay in zip(
+        (cpu_info_agent, memory_info_agent, disk_info_agent), delays
+    ):
+        tool = agent.tools[0]
+        # The synchronous function behind the shipped async tool
+        slow = delayed(tool.__wrapped__, delay)
+        if offloaded:
+            slow = run_in_thread(timeout=delay + 10)(slow)
+        agents.append(
+            agent.model_copy(
+                update={
+                    "model": ScriptedLlm(),
+                    "tools": [slow],
+                    "parent_agent": None,
+                }
+            )
+        )
+    return ParallelAgent(name="system_info_gatherer", sub_agents=agents)
+
+
+async def time_gather(delays, offloaded):
+    session_service = InMemorySessionService()
+    session = session_service.create_session(app_name="timing", user_id="check")
+    runner = Runner(
+        agent=build_gatherer(delays, offloaded),
+        app_name="timing",
+        session_service=session_service,
+    )
+    message = types.Content(role="user", parts=[types.Part(text="Check my system")])
+    started = time.perf_counter()
+    async for _ in runner.run_async(
+        user_id="check", session_id=session.id, new_message=message
+    ):
+        pass
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--delays", type=float, nargs=3, default=[1.0, 0.5, 1.5], metavar="SECONDS"
+    )
+    args = parser.parse_args()
+
+    slowest, total = max(args.delays), sum(args.delays)
+    blocking = asyncio.run(time_gather(args.delays, offloaded=False))
+    offloaded = asyncio.run(time_gather(args.delays, offloaded=True))
+
+    print(f"Tool delays: {args.delays} (slowest {slowest:.2f}s, sum {total:.2f}s)")
+    print(f"  blocking tools:  {blocking:.2f}s")
+    print(f"  offloaded tools: {offloaded:.2f}s")
+    if offloaded > slowest + TOLERANCE_SECONDS:
+        print("FAIL: the parallel gather is slower than its slowest tool")
+        sys.exit(1)
+    print("OK: the parallel gather takes as long as its slowest tool")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Fleet Mode Demo
+
+Runs the fleet collector against stand-in hosts on this machine: several
+metrics endpoints (system_monitor_agent/endpoint.py) on local ports, each
+serving this host's metrics with the CPU and memory usage replaced by a
+typical reading plus some per-host noise, so the result doesn't depend on how
+busy this machine is. Among them are:
+
+- a "hot" host with high CPU and memory usage, which should be an outlier
+- a hung host that never answers in time
+- a host that is down (nothing listening on its port)
+
+The demo prints the fleet summary and fails (exit code 1) unless the hot host
+is flagged, the hung and down hosts are reported as unreachable, and the whole
+collection takes about one timeout rather than one per host.
+
+Usage:
+    python fleet_demo.py [--hosts 12] [--timeout 1.0]
+"""
+
+import argparse
+import random
+import socket
+import sys
+import threading
+import time
+
+from system_monitor_agent.endpoint import MetricsServer, local_snapshot
+from system_monitor_agent.fleet import aggregate, collect
+
+# Slack for thread scheduling on top of the request timeout
+TOLERANCE_SECONDS = 1.0
+
+# Typical readings for the healthy stand-ins, and the hot host's readings
+TYPICAL = {"cpu_percent": 35.0, "memory_percent": 55.0}
+HOT = {"cpu_percent": 97.0, "memory_percent": 93.0}
+
+
+def noisy_snapshot(seed):
+    """This host's metrics with typical CPU and memory usage plus noise."""
+    rng = random.Random(seed)
+    readings = {
+        metric: round(value + rng.uniform(-3, 3), 2)
+        for metric, value in TYPICAL.items()
+    }
+
+    def snapshot():
+        return {**local_snapshot(), **readings}
+
+    return snapshot
+
+
+def hot_snapshot():
+    return {**local_snapshot(), **HOT}
+
+
+def hung_snapshot(seconds):
+    def snapshot():
+        time.sleep(seconds)
+        return local_snapshot()
+
+    return snapshot
+
+
+def start(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--hosts", type=int, default=12, help="Healthy stand-ins")
+    parser.add_argument("--timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    servers = [
+        start(MetricsServer(("127.0.0.1", 0), f"node-{i:02d}", noisy_snapshot(i)))
+        for i in range(args.hosts)
+    ]
+    servers.append(start(MetricsServer(("127.0.0.1", 0), "node-hot", hot_snapshot)))
+    hung = start(
+        MetricsServer(("127.0.0.1", 0), "node-hung", hung_snapshot(args.timeout * 3))
+    )
+    servers.append(hung)
+    urls = [server.url for server in servers]
+    down_url = f"http://127.0.0.1:{free_port()}"
+    urls.append(down_url)
+
+    local_snapshot()  # Take the first local sample before timing
+    started = time.perf_counter()
+    snapshots, errors = collect(urls, timeout=args.timeout)
+    summary = aggregate(snapshots)
+    elapsed = time.perf_counter() - started
+
+    print(f"Queried {len(urls)} endpoints in {elapsed:.2f}s")
+    print(f"  reporting: {len(snapshots)}, unreachable: {len(errors)}")
+    for url, error in errors.items():
+        print(f"    {url}: {error}")
+    for metric, stats in summary.items():
+        if not stats["hosts_reporting"]:
+            print(f"  {metric}: no data")
+            continue
+        outliers = ", ".join(
+            f"{o['host']}={o['value']:g} (z={o['score']:g})" for o in stats["outliers"]
+        )
+        print(
+            f"  {metric}: p50 {stats['p50']:g}, p95 {stats['p95']:g},"
+            f" max {stats['max']:g}; outliers: {outliers or 'none'}"
+        )
+
+    failures = []
+    cpu = summary["cpu_percent"]
+    if not any(
+        o["host"] == "node-hot" and o["value"] > cpu["p50"] for o in cpu["outliers"]
+    ):
+        failures.append("the hot host wasn't flagged as a high CPU outlier")
+    if set(errors) != {hung.url, down_url}:
+        failures.append("expected the hung and down hosts to be unreachable")
+    if elapsed > args.timeout + TOLERANCE_SECONDS:
+        failures.append(f"collection took {elapsed:.2f}s, more than one timeout")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK: the fleet was collected concurrently and the outliers found")
+
+
+if __name__ == "__main__":
+    main()
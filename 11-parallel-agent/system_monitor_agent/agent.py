@@ -6,17 +6,57 @@ It uses a parallel agent for system information gathering and a sequential
 pipeline for the overall flow.
 """
 
+import os
+
 from google.adk.agents import ParallelAgent, SequentialAgent
 
-from .subagents.cpu_info_agent import cpu_info_agent
-from .subagents.disk_info_agent import disk_info_agent
-from .subagents.memory_info_agent import memory_info_agent
+from .collector import get_collector
+from .fleet import fleet_endpoints
+from .subagents.cpu_info_agent import cpu_info_agent, cpu_info_tool_agent
+from .subagents.disk_info_agent import disk_info_agent, disk_info_tool_agent
+from .subagents.fleet_info_agent import fleet_info_agent, fleet_info_tool_agent
+from .subagents.memory_info_agent import memory_info_agent, memory_info_tool_agent
+from .subagents.process_info_agent import process_info_agent, process_info_tool_agent
 from .subagents.synthesizer_agent import system_report_synthesizer
 
+# Start collecting metric history when the agent is loaded, so the trend
+# tools have a window to report on
+get_collector()
+
+# "llm": each gatherer is an LlmAgent that writes a report section
+# "direct": the gatherers call their tools without a model, so only the
+# synthesizer calls the model
+GATHER_MODE = os.getenv("SYSTEM_MONITOR_GATHER_MODE", "llm")
+
+if GATHER_MODE == "direct":
+    gatherers = [
+        cpu_info_tool_agent,
+        memory_info_tool_agent,
+        disk_info_tool_agent,
+        process_info_tool_agent,
+    ]
+elif GATHER_MODE == "llm":
+    gatherers = [
+        cpu_info_agent,
+        memory_info_agent,
+        disk_info_agent,
+        process_info_agent,
+    ]
+else:
+    raise ValueError(
+        f"SYSTEM_MONITOR_GATHER_MODE must be 'llm' or 'direct', not {GATHER_MODE!r}"
+    )
+
+# Fleet mode: also summarize the hosts listed in SYSTEM_MONITOR_FLEET
+if fleet_endpoints():
+    gatherers.append(
+        fleet_info_tool_agent if GATHER_MODE == "direct" else fleet_info_agent
+    )
+
 # --- 1. Create Parallel Agent to gather information concurrently ---
 system_info_gatherer = ParallelAgent(
     name="system_info_gatherer",
-    sub_agents=[cpu_info_agent, memory_info_agent, disk_info_agent],
+    sub_agents=gatherers,
 )
 
 # --- 2. Create Sequential Pipeline to gather info in parallel, then synthesize ---
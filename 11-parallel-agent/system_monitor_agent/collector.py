@@ -0,0 +1,219 @@
+"""
+Metric Collector
+
+Each system monitor run only sees a single reading, so on its own it can't
+tell whether memory is creeping up or a disk is filling. MetricCollector
+samples the main system metrics on a background thread into a fixed-size
+NumPy ring buffer, and computes window statistics over it:
+
+    min, max, mean, p95 and slope (change per minute, by least squares)
+
+Samples that couldn't be taken (e.g. no disk IO counters in a container) are
+stored as NaN and ignored by the statistics.
+
+The sampling interval and history length can be set with the
+SYSTEM_MONITOR_INTERVAL (seconds, default 5) and SYSTEM_MONITOR_HISTORY
+(samples, default 720, i.e. an hour at 5s) environment variables.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import psutil
+
+# Column order of the ring buffer
+METRICS = (
+    "cpu_percent",
+    "memory_percent",
+    "swap_percent",
+    "disk_percent",
+    "disk_read_bytes_per_s",
+    "disk_write_bytes_per_s",
+)
+
+
+class MetricCollector:
+    """Samples system metrics into a NumPy ring buffer on a daemon thread.
+
+    Args:
+        interval: Seconds between samples
+        capacity: Number of samples kept
+        disk_path: Mount point whose usage is tracked as disk_percent
+    """
+
+    def __init__(
+        self, interval: float = 5.0, capacity: int = 720, disk_path: str = "/"
+    ):
+        self.interval = interval
+        self.capacity = capacity
+        self.disk_path = disk_path
+        self._times = np.full(capacity, np.nan)
+        self._values = np.full((capacity, len(METRICS)), np.nan)
+        self._count = 0  # Samples taken so far; the next one goes to count % capacity
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampled = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_io = None
+
+    def start(self) -> "MetricCollector":
+        """Start collecting, if not already started."""
+        with self._lock:
+            if self._thread is None:
+                # Baselines for the rates and CPU usage between samples
+                psutil.cpu_percent(interval=None)
+                self._last_io = (time.monotonic(), psutil.disk_io_counters())
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="metric-collector", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def _run(self) -> None:
+        # The first sample waits a full interval: CPU usage and IO rates are
+        # measured since the baselines taken in start()
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        """Take one sample of every metric and add it to the buffer."""
+        row = np.full(len(METRICS), np.nan)
+        row[0] = psutil.cpu_percent(interval=None)
+        row[1] = psutil.virtual_memory().percent
+        row[2] = psutil.swap_memory().percent
+        try:
+            row[3] = psutil.disk_usage(self.disk_path).percent
+        except OSError:
+            pass
+
+        now, io = time.monotonic(), psutil.disk_io_counters()
+        with self._lock:
+            last_at, last_io = self._last_io or (now, None)
+            if io is not None and last_io is not None and now > last_at:
+                row[4] = (io.read_bytes - last_io.read_bytes) / (now - last_at)
+                row[5] = (io.write_bytes - last_io.write_bytes) / (now - last_at)
+            self._last_io = (now, io)
+
+            index = self._count % self.capacity
+            self._times[index] = time.time()
+            self._values[index] = row
+            self._count += 1
+        self._sampled.set()
+
+    def latest(
+        self, timeout: Optional[float] = None
+    ) -> Optional[Dict[str, Optional[float]]]:
+        """The most recent value of each metric, or None if there is none yet.
+
+        Before the first sample, waits up to timeout seconds (by default a bit
+        more than one interval) for the collector to take it. Sampling here
+        instead would measure CPU usage over the moment since start().
+        """
+        if timeout is None:
+            timeout = self.interval + 1
+        if not self._sampled.wait(timeout):
+            return None
+        with self._lock:
+            index = (self._count - 1) % self.capacity
+            sampled_at, row = float(self._times[index]), self._values[index].copy()
+        latest = {
+            metric: None if np.isnan(value) else round(float(value), 2)
+            for metric, value in zip(METRICS, row)
+        }
+        latest["sampled_at"] = sampled_at
+        return latest
+
+    def window(self, seconds: float):
+        """Return (timestamps, values) of the samples from the last `seconds`."""
+        with self._lock:
+            times = self._times.copy()
+            values = self._values.copy()
+        mask = times >= time.time() - seconds
+        order = np.argsort(times[mask])
+        return times[mask][order], values[mask][order]
+
+    def window_stats(
+        self, seconds: float, metrics: Iterable[str] = METRICS
+    ) -> Dict[str, Dict[str, Optional[float]]]:
+        """Min, max, mean, p95 and slope (per minute) of metrics over a window."""
+        times, values = self.window(seconds)
+        stats = {}
+        for metric in metrics:
+            column = values[:, METRICS.index(metric)]
+            valid = ~np.isnan(column)
+            samples = int(valid.sum())
+            if samples == 0:
+                stats[metric] = {"samples": 0}
+                continue
+            column, minutes = column[valid], (times[valid] - times[valid][0]) / 60
+            slope = None
+            if samples >= 2 and minutes[-1] > 0:
+                slope = round(float(np.polyfit(minutes, column, 1)[0]), 3)
+            stats[metric] = {
+                "samples": samples,
+                "min": round(float(column.min()), 2),
+                "max": round(float(column.max()), 2),
+                "mean": round(float(column.mean()), 2),
+                "p95": round(float(np.percentile(column, 95)), 2),
+                "slope_per_minute": slope,
+                "latest": round(float(column[-1]), 2),
+            }
+        return stats
+
+
+_collector: Optional[MetricCollector] = None
+_collector_lock = threading.Lock()
+
+
+def get_collector() -> MetricCollector:
+    """Return the shared collector, starting it on first use."""
+    global _collector
+    with _collector_lock:
+        if _collector is None:
+            _collector = MetricCollector(
+                interval=float(os.getenv("SYSTEM_MONITOR_INTERVAL", "5")),
+                capacity=int(os.getenv("SYSTEM_MONITOR_HISTORY", "720")),
+            ).start()
+        return _collector
+
+
+def trend_report(metrics: Iterable[str], window_minutes: int) -> Dict:
+    """Window statistics in the tools' result/stats/additional_info structure."""
+    collector = get_collector()
+    seconds = max(window_minutes, 1) * 60
+    stats = collector.window_stats(seconds, metrics)
+    # Percentages climbing 5 points an hour or more
+    rising = [
+        metric
+        for metric, values in stats.items()
+        if metric.endswith("_percent")
+        and (values.get("slope_per_minute") or 0) * 60 >= 5
+    ]
+    return {
+        "result": stats,
+        "stats": {
+            "window_minutes": window_minutes,
+            "samples": max((v["samples"] for v in stats.values()), default=0),
+            "rising_fast": rising,
+        },
+        "additional_info": {
+            "data_format": "dictionary",
+            "collection_timestamp": time.time(),
+            "sampling_interval_seconds": collector.interval,
+            "note": (
+                "slope_per_minute is the least-squares trend; rising_fast lists"
+                " percentages climbing 5 points per hour or more"
+            ),
+        },
+    }
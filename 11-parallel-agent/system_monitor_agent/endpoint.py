@@ -0,0 +1,105 @@
+"""
+Metrics Endpoint
+
+A lightweight HTTP endpoint that serves this host's latest metrics, for the
+fleet collector (fleet.py) to query. It answers from the metric collector's
+ring buffer, so a request never takes a measurement itself. Requests made
+before the collector's first sample wait for it, up to one sampling interval,
+and get a 503 if it still isn't there.
+
+    GET /metrics  ->  {"host": ..., "cpu_percent": ..., "memory_percent": ..., ...}
+
+Usage:
+    python -m system_monitor_agent.endpoint [--port 8765] [--bind 0.0.0.0] [--name HOST]
+"""
+
+import argparse
+import json
+import socket
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+
+from .collector import get_collector
+
+
+def local_snapshot() -> Optional[Dict[str, Any]]:
+    """This host's latest metrics, as served by the endpoint.
+
+    None until the collector has taken its first sample.
+    """
+    return get_collector().latest()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        try:
+            snapshot = self.server.snapshot()
+        except Exception as e:
+            self.send_error(500, str(e))
+            return
+        if snapshot is None:
+            self.send_error(503, "No metrics sampled yet")
+            return
+        body = json.dumps({"host": self.server.host_name, **snapshot}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep the console quiet; the collector polls often
+        pass
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """Serves snapshot() at /metrics, labelled with host_name.
+
+    Args:
+        address: (bind address, port); port 0 picks a free port
+        host_name: Name reported for this host (defaults to the hostname)
+        snapshot: Function returning the metrics to serve, or None if there
+            are none yet
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address=("127.0.0.1", 8765),
+        host_name: Optional[str] = None,
+        snapshot: Callable[[], Dict[str, Any]] = local_snapshot,
+    ):
+        super().__init__(address, MetricsHandler)
+        self.host_name = host_name or socket.gethostname()
+        self.snapshot = snapshot
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--bind", default="0.0.0.0")
+    parser.add_argument("--name", default=None, help="Host name to report")
+    args = parser.parse_args()
+
+    get_collector()
+    server = MetricsServer((args.bind, args.port), host_name=args.name)
+    print(f"Serving {server.host_name} metrics on {server.url}/metrics")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
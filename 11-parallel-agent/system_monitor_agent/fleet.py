@@ -0,0 +1,139 @@
+"""
+Fleet Collector
+
+Gathers metrics from many hosts at once, from the metrics endpoint
+(endpoint.py) each host runs, and summarizes them across the fleet so the
+synthesizer gets one compact view instead of a report per host.
+
+Requests run concurrently in a bounded thread pool (FLEET_MAX_WORKERS) with a
+per-request timeout (FLEET_TIMEOUT seconds), so a slow or dead host is listed
+as unreachable instead of holding up the report. The results are aggregated
+with NumPy, as one array per metric:
+
+    hosts reporting, min, mean, p50, p95, max, and outlier hosts
+
+Outliers are hosts whose value is far from the fleet's median, measured by the
+modified z-score (|value - median| / MAD, scaled; above 3.5 is an outlier).
+
+Set SYSTEM_MONITOR_FLEET to a comma-separated list of endpoint URLs, e.g.
+"http://node1:8765,http://node2:8765", to enable fleet mode.
+"""
+
+import json
+import math
+import os
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from .collector import METRICS
+
+FLEET_MAX_WORKERS = int(os.getenv("FLEET_MAX_WORKERS", "32"))
+FLEET_TIMEOUT = float(os.getenv("FLEET_TIMEOUT", "2"))
+OUTLIER_THRESHOLD = 3.5
+
+_executor = ThreadPoolExecutor(
+    max_workers=FLEET_MAX_WORKERS, thread_name_prefix="fleet"
+)
+
+
+def fleet_endpoints() -> List[str]:
+    """The endpoint URLs configured in SYSTEM_MONITOR_FLEET."""
+    value = os.getenv("SYSTEM_MONITOR_FLEET", "")
+    return [url.strip().rstrip("/") for url in value.split(",") if url.strip()]
+
+
+def fetch(url: str, timeout: float = FLEET_TIMEOUT) -> Dict[str, Any]:
+    """Read one host's metrics from its endpoint."""
+    with urllib.request.urlopen(f"{url}/metrics", timeout=timeout) as response:
+        return json.load(response)
+
+
+def collect(
+    urls: List[str], timeout: float = FLEET_TIMEOUT
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """Query all endpoints concurrently.
+
+    Returns:
+        (snapshots by URL, errors by URL for the hosts that didn't answer)
+    """
+    futures = {url: _executor.submit(fetch, url, timeout) for url in urls}
+    # Requests beyond the pool size wait for a worker, so allow one timeout
+    # per round of requests, plus slack for a response that is slow to read
+    rounds = math.ceil(len(urls) / FLEET_MAX_WORKERS) if urls else 0
+    wait(futures.values(), timeout=rounds * timeout + 1)
+
+    snapshots, errors = {}, {}
+    for url, future in futures.items():
+        if not future.done():
+            future.cancel()
+            errors[url] = "timed out"
+        elif future.exception() is not None:
+            error = future.exception()
+            errors[url] = f"{type(error).__name__}: {error}"
+        else:
+            snapshots[url] = future.result()
+    return snapshots, errors
+
+
+def _modified_z_scores(values: np.ndarray) -> np.ndarray:
+    median = np.nanmedian(values)
+    deviations = np.abs(values - median)
+    mad = np.nanmedian(deviations)
+    if mad > 0:
+        return 0.6745 * deviations / mad
+    # More than half the hosts have the same value; fall back to the mean
+    # absolute deviation so a single different host still stands out
+    mean_ad = np.nanmean(deviations)
+    if mean_ad > 0:
+        return deviations / (1.253314 * mean_ad)
+    return np.zeros_like(values)
+
+
+def aggregate(
+    snapshots: Dict[str, Dict[str, Any]], metrics=METRICS
+) -> Dict[str, Dict[str, Any]]:
+    """Fleet-wide statistics and outlier hosts for each metric."""
+    hosts = [snapshot.get("host") or url for url, snapshot in snapshots.items()]
+    # One row per host, one column per metric; missing values are NaN
+    values = np.array(
+        [
+            [
+                np.nan if snapshot.get(metric) is None else snapshot[metric]
+                for metric in metrics
+            ]
+            for snapshot in snapshots.values()
+        ],
+        dtype=float,
+    ).reshape(len(snapshots), len(metrics))
+
+    summary = {}
+    for column, metric in enumerate(metrics):
+        reported = ~np.isnan(values[:, column])
+        column_values = values[reported, column]
+        if column_values.size == 0:
+            summary[metric] = {"hosts_reporting": 0}
+            continue
+        p50, p95 = np.percentile(column_values, [50, 95])
+        scores = _modified_z_scores(column_values)
+        reporting_hosts = [host for host, ok in zip(hosts, reported) if ok]
+        summary[metric] = {
+            "hosts_reporting": int(column_values.size),
+            "min": round(float(column_values.min()), 2),
+            "mean": round(float(column_values.mean()), 2),
+            "p50": round(float(p50), 2),
+            "p95": round(float(p95), 2),
+            "max": round(float(column_values.max()), 2),
+            "outliers": [
+                {
+                    "host": reporting_hosts[i],
+                    "value": round(float(column_values[i]), 2),
+                    "score": round(float(scores[i]), 1),
+                }
+                for i in np.argsort(-scores)
+                if scores[i] > OUTLIER_THRESHOLD
+            ],
+        }
+    return summary
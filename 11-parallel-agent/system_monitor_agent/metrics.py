@@ -0,0 +1,89 @@
+"""
+Metric Schema
+
+The system monitor tools return plain numbers, so results can be compared,
+aggregated and computed on. Units are carried by the key suffix:
+
+    *_bytes      sizes, in bytes (int)
+    *_percent    usage, in percent (float, 0-100)
+    *_per_s      rates, per second (float)
+
+Lists hold one value per item, e.g. per_core_percent has one entry per core.
+
+Formatting for people is left to the report. What a model reads is the
+compact() encoding, which uses fewer tokens: floats rounded, bytes as GiB
+(keys ending in _gib), empty values dropped, and JSON without whitespace. The
+gatherers use it in both gather modes: ToolRunnerAgent stores it in state, and
+compact_tool_response replaces the LlmAgents' tool responses with it. Set
+SYSTEM_MONITOR_STATE_ENCODING=raw to give the model the result dictionaries
+instead.
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+ENCODING = os.getenv("SYSTEM_MONITOR_STATE_ENCODING", "compact")
+
+GIB = 1024**3
+
+
+def _convert(value: Any, key: str, on_bytes, on_percent, on_float) -> Any:
+    if isinstance(value, dict):
+        return {
+            k: _convert(v, k, on_bytes, on_percent, on_float) for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [_convert(v, key, on_bytes, on_percent, on_float) for v in value]
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return value
+    if key.endswith("_bytes"):
+        return on_bytes(value)
+    if key.endswith("_percent"):
+        return on_percent(value)
+    if isinstance(value, float):
+        return on_float(value)
+    return value
+
+
+def _drop_empty(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _drop_empty(v) for k, v in value.items() if v not in (None, [], {})}
+    if isinstance(value, list):
+        return [_drop_empty(v) for v in value]
+    return value
+
+
+def _gib_keys(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            (k[: -len("_bytes")] + "_gib" if k.endswith("_bytes") else k): _gib_keys(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [_gib_keys(v) for v in value]
+    return value
+
+
+def compact(metrics: Any) -> str:
+    """Token-efficient JSON encoding of a tool result for a model to read."""
+    converted = _convert(
+        metrics,
+        "",
+        lambda v: round(v / GIB, 2),
+        lambda v: round(v, 1),
+        lambda v: round(v, 2),
+    )
+    return json.dumps(_gib_keys(_drop_empty(converted)), separators=(",", ":"))
+
+
+def compact_tool_response(
+    tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext, tool_response: Dict
+) -> Optional[Dict]:
+    """after_tool_callback that hands the model the compact encoding."""
+    if ENCODING != "compact":
+        return None
+    return {"result": compact(tool_response)}
@@ -0,0 +1,56 @@
+"""
+Tool Offloading
+
+The system monitor tools are blocking psutil calls. ADK runs a synchronous
+tool function directly on the event loop, so while one tool blocks, the other
+agents of the ParallelAgent can't make progress and the "parallel" gather runs
+one tool after another.
+
+run_in_thread turns a blocking tool into an async one that runs in a shared
+thread pool, with a timeout. The tools of the parallel agents then really run
+at the same time, and the gather takes as long as the slowest tool.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+# Shared by all system monitor tools; psutil calls release the GIL while they
+# wait on the OS
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="system-monitor-tool")
+
+
+def run_in_thread(timeout: float) -> Callable:
+    """Decorator that runs a blocking tool in the thread pool, with a timeout.
+
+    The wrapped tool keeps its name, docstring and signature, so ADK declares
+    it to the model exactly as before. On timeout it returns the same error
+    structure the tools use for failures. (The worker thread can't be
+    interrupted; it finishes in the background and its result is dropped.)
+
+    Args:
+        timeout: Seconds to wait for the tool before giving up
+    """
+
+    def decorator(func: Callable[..., Dict[str, Any]]):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> Dict[str, Any]:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(
+                _executor, functools.partial(func, *args, **kwargs)
+            )
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                return {
+                    "result": {
+                        "error": f"{func.__name__} timed out after {timeout:g} seconds"
+                    },
+                    "stats": {"success": False},
+                    "additional_info": {"error_type": "TimeoutError"},
+                }
+
+        return wrapper
+
+    return decorator
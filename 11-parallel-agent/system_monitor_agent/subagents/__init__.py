@@ -1,3 +1,10 @@
 """Subagents for the system monitor pipeline."""
 
-from . import cpu_info_agent, disk_info_agent, memory_info_agent, synthesizer_agent
+from . import (
+    cpu_info_agent,
+    disk_info_agent,
+    fleet_info_agent,
+    memory_info_agent,
+    process_info_agent,
+    synthesizer_agent,
+)
@@ -1,3 +1,3 @@
 """CPU info agent for system monitoring."""
 
-from .agent import cpu_info_agent
+from .agent import cpu_info_agent, cpu_info_tool_agent
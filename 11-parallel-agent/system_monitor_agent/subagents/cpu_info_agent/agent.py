@@ -6,7 +6,9 @@ This agent is responsible for gathering and analyzing CPU information.
 
 from google.adk.agents import LlmAgent
 
-from .tools import get_cpu_info
+from ...metrics import compact_tool_response
+from ...tool_agent import ToolRunnerAgent
+from .tools import get_cpu_info, get_cpu_trends
 
 # --- Constants ---
 GEMINI_MODEL = "gemini-2.0-flash"
@@ -19,22 +21,39 @@ cpu_info_agent = LlmAgent(
     
     When asked for system information, you should:
     1. Use the 'get_cpu_info' tool to gather CPU data
-    2. Analyze the returned dictionary data
-    3. Format this information into a concise, clear section of a system report
+    2. Use the 'get_cpu_trends' tool with window_minutes=15 to get the CPU usage trend
+    3. Analyze the returned dictionary data
+    4. Format this information into a concise, clear section of a system report
     
     The tool will return a dictionary with:
     - result: Core CPU information
     - stats: Key statistical data about CPU usage
     - additional_info: Context about the data collection
     
+    Values are numbers: usage is in percent (keys ending in _percent).
+    
+    The trends tool returns min, max, mean, p95 and slope_per_minute for each
+    metric over the window (samples: 0 means there is no history yet).
+    
     Format your response as a well-structured report section with:
     - CPU core information (physical vs logical)
-    - CPU usage statistics
+    - CPU usage statistics (current, and averaged over the last 10s and 60s)
+    - CPU usage trend (direction and rate over the window, and the p95 peak)
     - Any performance concerns (high usage > 80%)
     
-    IMPORTANT: You MUST call the get_cpu_info tool. Do not make up information.
+    IMPORTANT: You MUST call the get_cpu_info and get_cpu_trends tools. Do not make up information.
     """,
     description="Gathers and analyzes CPU information",
-    tools=[get_cpu_info],
+    tools=[get_cpu_info, get_cpu_trends],
+    after_tool_callback=compact_tool_response,
+    output_key="cpu_info",
+)
+
+# The same gathering without a model call (SYSTEM_MONITOR_GATHER_MODE=direct)
+cpu_info_tool_agent = ToolRunnerAgent(
+    name="CpuInfoAgent",
+    description="Gathers CPU information without a model call",
+    tools=[get_cpu_info, get_cpu_trends],
+    tool_args={"get_cpu_trends": {"window_minutes": 15}},
     output_key="cpu_info",
 )
@@ -0,0 +1,121 @@
+"""
+Background CPU Sampler
+
+This module keeps rolling CPU usage statistics up to date on a background
+thread, so the CPU tool can read them instantly instead of blocking while it
+measures.
+
+Every interval the sampler reads per-core usage since its previous reading
+(psutil.cpu_percent(interval=None, percpu=True) doesn't block) and stores it
+in a ring buffer. Usage over the last 1, 10 or 60 seconds is the mean of the
+samples in that window; the aggregate usage is the mean over the cores.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+# Windows reported by the CPU tool, in seconds
+WINDOWS = (1, 10, 60)
+
+
+class CpuSampler:
+    """Samples per-core CPU usage into a ring buffer on a daemon thread.
+
+    Args:
+        interval: Seconds between samples
+        capacity: Number of samples kept (the longest window it can cover is
+            capacity * interval seconds)
+    """
+
+    def __init__(self, interval: float = 1.0, capacity: int = 60):
+        self.interval = interval
+        self._samples: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._has_sample = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "CpuSampler":
+        """Start sampling, if not already started."""
+        with self._lock:
+            if self._thread is None:
+                # The first reading only sets the baseline for the next one
+                psutil.cpu_percent(interval=None, percpu=True)
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="cpu-sampler", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            per_core = psutil.cpu_percent(interval=None, percpu=True)
+            with self._lock:
+                self._samples.append((time.monotonic(), per_core))
+            self._has_sample.set()
+
+    def wait_for_sample(self, timeout: Optional[float] = None) -> bool:
+        """Wait until at least one sample has been taken (only slow at startup)."""
+        return self._has_sample.wait(timeout)
+
+    def window(self, seconds: float) -> Tuple[List[float], int]:
+        """Mean per-core usage over the last `seconds`.
+
+        Returns:
+            (per-core usage percentages, number of samples averaged). Falls
+            back to the latest sample when the window holds none.
+        """
+        cutoff = time.monotonic() - seconds
+        with self._lock:
+            # Allow for timer jitter, so a 1s window always holds the last sample
+            samples = [
+                per_core
+                for taken_at, per_core in self._samples
+                if taken_at >= cutoff - self.interval / 2
+            ]
+            if not samples and self._samples:
+                samples = [self._samples[-1][1]]
+        if not samples:
+            return [], 0
+        cores = len(samples[0])
+        per_core = [
+            sum(s[core] for s in samples) / len(samples) for core in range(cores)
+        ]
+        return per_core, len(samples)
+
+    def usage(self, windows=WINDOWS) -> Dict[str, Dict[str, object]]:
+        """Per-core and aggregate usage for each window, keyed like "10s"."""
+        usage = {}
+        for seconds in windows:
+            per_core, samples = self.window(seconds)
+            usage[f"{seconds}s"] = {
+                "per_core": per_core,
+                "average": sum(per_core) / len(per_core) if per_core else 0.0,
+                "samples": samples,
+            }
+        return usage
+
+
+_sampler: Optional[CpuSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler() -> CpuSampler:
+    """Return the shared sampler, starting it on first use."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = CpuSampler().start()
+        return _sampler
@@ -1,7 +1,7 @@
 """
 CPU Information Tool
 
-This module provides a tool for gathering CPU information.
+This module provides tools for gathering CPU information and its recent trends.
 """
 
 import time
@@ -9,30 +9,45 @@ from typing import Any, Dict
 
 import psutil
 
+from ...collector import trend_report
+from ...offload import run_in_thread
+from .sampler import get_sampler
 
+# Start sampling when the agent is loaded, so the windows have history by the
+# time the tool is first called
+get_sampler()
+
+
+@run_in_thread(timeout=5)
 def get_cpu_info() -> Dict[str, Any]:
     """
     Gather CPU information including core count and usage.
 
+    Usage comes from the background sampler, so this returns immediately
+    (except on the very first call, which waits for the first sample).
+
     Returns:
         Dict[str, Any]: Dictionary with CPU information structured for ADK
     """
     try:
+        sampler = get_sampler()
+        sampler.wait_for_sample(timeout=2 * sampler.interval)
+        usage = sampler.usage()
+        latest = usage["1s"]
+
         # Get CPU information
         cpu_info = {
             "physical_cores": psutil.cpu_count(logical=False),
             "logical_cores": psutil.cpu_count(logical=True),
-            "cpu_usage_per_core": [
-                f"Core {i}: {percentage:.1f}%"
-                for i, percentage in enumerate(
-                    psutil.cpu_percent(interval=1, percpu=True)
-                )
-            ],
-            "avg_cpu_usage": f"{psutil.cpu_percent(interval=1):.1f}%",
+            "per_core_percent": [round(p, 1) for p in latest["per_core"]],
         }
+        # Averages of the per-core usage over each window (avg_1s_percent, ...),
+        # not separate measurements
+        for window, values in usage.items():
+            cpu_info[f"avg_{window}_percent"] = values["average"]
 
         # Calculate some stats for the result summary
-        avg_usage = float(cpu_info["avg_cpu_usage"].strip("%"))
+        avg_usage = latest["average"]
         high_usage = avg_usage > 80
 
         # Format for ADK tool return structure
@@ -41,12 +56,17 @@ def get_cpu_info() -> Dict[str, Any]:
             "stats": {
                 "physical_cores": cpu_info["physical_cores"],
                 "logical_cores": cpu_info["logical_cores"],
-                "avg_usage_percentage": avg_usage,
+                "avg_usage_percent": avg_usage,
+                "avg_usage_10s_percent": usage["10s"]["average"],
+                "avg_usage_60s_percent": usage["60s"]["average"],
                 "high_usage_alert": high_usage,
             },
             "additional_info": {
                 "data_format": "dictionary",
                 "collection_timestamp": time.time(),
+                "samples_per_window": {
+                    window: values["samples"] for window, values in usage.items()
+                },
                 "performance_concern": (
                     "High CPU usage detected" if high_usage else None
                 ),
@@ -58,3 +78,25 @@ def get_cpu_info() -> Dict[str, Any]:
             "stats": {"success": False},
             "additional_info": {"error_type": str(type(e).__name__)},
         }
+
+
+@run_in_thread(timeout=5)
+def get_cpu_trends(window_minutes: int) -> Dict[str, Any]:
+    """
+    Summarize how CPU usage changed over a recent window.
+
+    Args:
+        window_minutes: How far back to look, in minutes
+
+    Returns:
+        Dict[str, Any]: Min, max, mean, p95 and slope per minute of each
+        metric, from the background metric collector
+    """
+    try:
+        return trend_report(["cpu_percent"], window_minutes)
+    except Exception as e:
+        return {
+            "result": {"error": f"Failed to gather CPU trends: {str(e)}"},
+            "stats": {"success": False},
+            "additional_info": {"error_type": str(type(e).__name__)},
+        }
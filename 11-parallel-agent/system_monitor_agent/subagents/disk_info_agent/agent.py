@@ -6,7 +6,9 @@ This agent is responsible for gathering and analyzing disk information.
 
 from google.adk.agents import LlmAgent
 
-from .tools import get_disk_info
+from ...metrics import compact_tool_response
+from ...tool_agent import ToolRunnerAgent
+from .tools import get_disk_info, get_disk_trends
 
 # --- Constants ---
 GEMINI_MODEL = "gemini-2.0-flash"
@@ -19,22 +21,42 @@ disk_info_agent = LlmAgent(
     
     When asked for system information, you should:
     1. Use the 'get_disk_info' tool to gather disk data
-    2. Analyze the returned dictionary data
-    3. Format this information into a concise, clear section of a system report
+    2. Use the 'get_disk_trends' tool with window_minutes=15 to get the disk usage and IO trends
+    3. Analyze the returned dictionary data
+    4. Format this information into a concise, clear section of a system report
     
     The tool will return a dictionary with:
     - result: Core disk information including partitions
     - stats: Key statistical data about storage usage
     - additional_info: Context about the data collection
     
+    Values are numbers: usage is in percent (keys ending in _percent)
+    and sizes are in GiB (keys ending in _gib) or bytes (keys ending in
+    _bytes); show sizes in GB.
+    
+    The trends tool returns min, max, mean, p95 and slope_per_minute for each
+    metric over the window (samples: 0 means there is no history yet).
+    
     Format your response as a well-structured report section with:
     - Partition information
     - Storage capacity and usage
+    - Disk usage and IO throughput trends (direction and rate over the window)
     - Any storage concerns (high usage > 85%)
+    - Any mounts that didn't respond (listed in additional_info.unresponsive_mounts)
     
-    IMPORTANT: You MUST call the get_disk_info tool. Do not make up information.
+    IMPORTANT: You MUST call the get_disk_info and get_disk_trends tools. Do not make up information.
     """,
     description="Gathers and analyzes disk information",
-    tools=[get_disk_info],
+    tools=[get_disk_info, get_disk_trends],
+    after_tool_callback=compact_tool_response,
+    output_key="disk_info",
+)
+
+# The same gathering without a model call (SYSTEM_MONITOR_GATHER_MODE=direct)
+disk_info_tool_agent = ToolRunnerAgent(
+    name="DiskInfoAgent",
+    description="Gathers disk information without a model call",
+    tools=[get_disk_info, get_disk_trends],
+    tool_args={"get_disk_trends": {"window_minutes": 15}},
     output_key="disk_info",
 )
@@ -1,15 +1,86 @@
 """
 Disk Information Tool
 
-This module provides a tool for gathering disk information.
+This module provides tools for gathering disk information and its recent trends.
+
+Usage is read for all mounts at once, each in its own thread, and a mount that
+doesn't answer within DISK_MOUNT_TIMEOUT seconds (default 2) is reported as
+unresponsive instead of holding up the report; a hung network mount would
+otherwise block forever. The partition list changes rarely, so it is cached
+for PARTITION_CACHE_SECONDS.
+
+Which filesystems are included can be set with comma-separated lists:
+DISK_SKIP_FSTYPES (default: squashfs, overlay, tmpfs and other virtual
+filesystems) and DISK_ONLY_FSTYPES (if set, only these types are included).
 """
 
+import os
+import threading
 import time
-from typing import Any, Dict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Set
 
 import psutil
 
+from ...collector import trend_report
+from ...offload import run_in_thread
+
+DEFAULT_SKIP_FSTYPES = "squashfs,overlay,tmpfs,devtmpfs,ramfs,iso9660,nsfs"
+PARTITION_CACHE_SECONDS = 60
+
+# Separate from the tool pool: this tool already runs in that pool, and a hung
+# mount keeps its thread, so it mustn't take threads from the other tools
+_mount_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="disk-usage")
+
+_lock = threading.Lock()
+_partitions_cache: Optional[tuple] = None  # (cached at, partitions)
+# disk_usage calls that timed out and haven't returned yet, by mountpoint
+_pending: Dict[str, Future] = {}
+
+
+def _fstypes(variable: str, default: str = "") -> Set[str]:
+    value = os.getenv(variable, default)
+    return {fstype.strip() for fstype in value.split(",") if fstype.strip()}
+
 
+def _partitions() -> List[Any]:
+    """The partitions to report on, filtered by filesystem type and cached."""
+    global _partitions_cache
+    with _lock:
+        if _partitions_cache and (
+            time.monotonic() - _partitions_cache[0] < PARTITION_CACHE_SECONDS
+        ):
+            return _partitions_cache[1]
+
+    skip = _fstypes("DISK_SKIP_FSTYPES", DEFAULT_SKIP_FSTYPES)
+    only = _fstypes("DISK_ONLY_FSTYPES")
+    partitions = [
+        partition
+        for partition in psutil.disk_partitions()
+        if partition.fstype not in skip and (not only or partition.fstype in only)
+    ]
+    with _lock:
+        _partitions_cache = (time.monotonic(), partitions)
+    return partitions
+
+
+def _usage_futures(partitions) -> Dict[str, Future]:
+    """Start disk_usage for every mount, reusing calls that are still hanging."""
+    futures = {}
+    with _lock:
+        for partition in partitions:
+            mountpoint = partition.mountpoint
+            pending = _pending.get(mountpoint)
+            if pending is not None and not pending.done():
+                # Still stuck from an earlier report; don't pile up threads on it
+                futures[mountpoint] = pending
+                continue
+            _pending.pop(mountpoint, None)
+            futures[mountpoint] = _mount_executor.submit(psutil.disk_usage, mountpoint)
+    return futures
+
+
+@run_in_thread(timeout=15)
 def get_disk_info() -> Dict[str, Any]:
     """
     Gather disk information including partitions and usage.
@@ -21,17 +92,34 @@ def get_disk_info() -> Dict[str, Any]:
         # Get disk information
         disk_info = {"partitions": []}
         partitions_over_threshold = []
+        unresponsive_partitions = []
         total_space = 0
         used_space = 0
 
-        for partition in psutil.disk_partitions():
+        partitions = _partitions()
+        futures = _usage_futures(partitions)
+        wait(
+            futures.values(),
+            timeout=float(os.getenv("DISK_MOUNT_TIMEOUT", "2")),
+        )
+
+        for partition in partitions:
+            future = futures[partition.mountpoint]
+            if not future.done():
+                with _lock:
+                    _pending[partition.mountpoint] = future
+                unresponsive_partitions.append(partition.mountpoint)
+                continue
             try:
-                partition_usage = psutil.disk_usage(partition.mountpoint)
+                partition_usage = future.result()
 
                 # Track high usage partitions
                 if partition_usage.percent > 85:
                     partitions_over_threshold.append(
-                        f"{partition.mountpoint} ({partition_usage.percent:.1f}%)"
+                        {
+                            "mountpoint": partition.mountpoint,
+                            "used_percent": partition_usage.percent,
+                        }
                     )
 
                 # Add to totals
@@ -43,13 +131,13 @@ def get_disk_info() -> Dict[str, Any]:
                         "device": partition.device,
                         "mountpoint": partition.mountpoint,
                         "filesystem_type": partition.fstype,
-                        "total_size": f"{partition_usage.total / (1024 ** 3):.2f} GB",
-                        "used": f"{partition_usage.used / (1024 ** 3):.2f} GB",
-                        "free": f"{partition_usage.free / (1024 ** 3):.2f} GB",
-                        "percentage": f"{partition_usage.percent:.1f}%",
+                        "total_bytes": partition_usage.total,
+                        "used_bytes": partition_usage.used,
+                        "free_bytes": partition_usage.free,
+                        "used_percent": partition_usage.percent,
                     }
                 )
-            except (PermissionError, FileNotFoundError):
+            except OSError:
                 # Some partitions may not be accessible
                 pass
 
@@ -63,10 +151,11 @@ def get_disk_info() -> Dict[str, Any]:
             "result": disk_info,
             "stats": {
                 "partition_count": len(disk_info["partitions"]),
-                "total_space_gb": total_space / (1024**3),
-                "used_space_gb": used_space / (1024**3),
+                "total_space_bytes": total_space,
+                "used_space_bytes": used_space,
                 "overall_usage_percent": overall_usage_percent,
                 "partitions_with_high_usage": len(partitions_over_threshold),
+                "unresponsive_partitions": len(unresponsive_partitions),
             },
             "additional_info": {
                 "data_format": "dictionary",
@@ -74,6 +163,9 @@ def get_disk_info() -> Dict[str, Any]:
                 "high_usage_partitions": (
                     partitions_over_threshold if partitions_over_threshold else None
                 ),
+                "unresponsive_mounts": (
+                    unresponsive_partitions if unresponsive_partitions else None
+                ),
             },
         }
     except Exception as e:
@@ -82,3 +174,28 @@ def get_disk_info() -> Dict[str, Any]:
             "stats": {"success": False},
             "additional_info": {"error_type": str(type(e).__name__)},
         }
+
+
+@run_in_thread(timeout=5)
+def get_disk_trends(window_minutes: int) -> Dict[str, Any]:
+    """
+    Summarize how disk usage and IO throughput changed over a recent window.
+
+    Args:
+        window_minutes: How far back to look, in minutes
+
+    Returns:
+        Dict[str, Any]: Min, max, mean, p95 and slope per minute of each
+        metric, from the background metric collector
+    """
+    try:
+        return trend_report(
+            ["disk_percent", "disk_read_bytes_per_s", "disk_write_bytes_per_s"],
+            window_minutes,
+        )
+    except Exception as e:
+        return {
+            "result": {"error": f"Failed to gather disk trends: {str(e)}"},
+            "stats": {"success": False},
+            "additional_info": {"error_type": str(type(e).__name__)},
+        }
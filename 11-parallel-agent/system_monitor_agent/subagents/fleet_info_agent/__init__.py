@@ -0,0 +1,3 @@
+"""Fleet info agent for system monitoring."""
+
+from .agent import fleet_info_agent, fleet_info_tool_agent
@@ -0,0 +1,58 @@
+"""
+Fleet Information Agent
+
+This agent is responsible for gathering and analyzing metrics across a fleet
+of hosts.
+"""
+
+from google.adk.agents import LlmAgent
+
+from ...metrics import compact_tool_response
+from ...tool_agent import ToolRunnerAgent
+from .tools import get_fleet_metrics
+
+# --- Constants ---
+GEMINI_MODEL = "gemini-2.0-flash"
+
+# Fleet Information Agent
+fleet_info_agent = LlmAgent(
+    name="FleetInfoAgent",
+    model=GEMINI_MODEL,
+    instruction="""You are a Fleet Information Agent.
+    
+    When asked for system information, you should:
+    1. Use the 'get_fleet_metrics' tool to gather metrics from all hosts
+    2. Analyze the returned dictionary data
+    3. Format this information into a concise, clear section of a system report
+    
+    The tool will return a dictionary with:
+    - result: For each metric, the fleet-wide min, mean, p50, p95 and max, and
+      the outlier hosts (far from the fleet median)
+    - stats: How many hosts were configured, reported and were unreachable
+    - additional_info: Context about the data collection, including the
+      unreachable hosts and why
+    
+    Values ending in _percent are percentages and _bytes_per_s are bytes per
+    second.
+    
+    Format your response as a well-structured report section with:
+    - Fleet coverage (hosts reporting vs configured)
+    - Fleet-wide CPU, memory, swap and disk usage (median and p95)
+    - Outlier hosts and which metrics they stand out on
+    - Unreachable hosts
+    
+    IMPORTANT: You MUST call the get_fleet_metrics tool. Do not make up information.
+    """,
+    description="Gathers and analyzes metrics across a fleet of hosts",
+    tools=[get_fleet_metrics],
+    after_tool_callback=compact_tool_response,
+    output_key="fleet_info",
+)
+
+# The same gathering without a model call (SYSTEM_MONITOR_GATHER_MODE=direct)
+fleet_info_tool_agent = ToolRunnerAgent(
+    name="FleetInfoAgent",
+    description="Gathers fleet metrics without a model call",
+    tools=[get_fleet_metrics],
+    output_key="fleet_info",
+)
@@ -0,0 +1,50 @@
+"""
+Fleet Information Tool
+
+This module provides a tool for gathering metrics across a fleet of hosts.
+"""
+
+import time
+from typing import Any, Dict
+
+from ...fleet import OUTLIER_THRESHOLD, aggregate, collect, fleet_endpoints
+from ...offload import run_in_thread
+
+
+@run_in_thread(timeout=30)
+def get_fleet_metrics() -> Dict[str, Any]:
+    """
+    Gather metrics from every host in the fleet and summarize them.
+
+    Returns:
+        Dict[str, Any]: Fleet-wide statistics per metric, outlier hosts and
+        unreachable hosts, structured for ADK
+    """
+    try:
+        urls = fleet_endpoints()
+        started = time.perf_counter()
+        snapshots, errors = collect(urls)
+        return {
+            "result": aggregate(snapshots),
+            "stats": {
+                "hosts_configured": len(urls),
+                "hosts_reporting": len(snapshots),
+                "hosts_unreachable": len(errors),
+                "collection_seconds": round(time.perf_counter() - started, 2),
+            },
+            "additional_info": {
+                "data_format": "dictionary",
+                "collection_timestamp": time.time(),
+                "unreachable_hosts": errors or None,
+                "note": (
+                    "outliers are hosts far from the fleet median"
+                    f" (modified z-score above {OUTLIER_THRESHOLD})"
+                ),
+            },
+        }
+    except Exception as e:
+        return {
+            "result": {"error": f"Failed to gather fleet metrics: {str(e)}"},
+            "stats": {"success": False},
+            "additional_info": {"error_type": str(type(e).__name__)},
+        }
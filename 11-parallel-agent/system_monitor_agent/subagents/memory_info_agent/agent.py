@@ -6,7 +6,9 @@ This agent is responsible for gathering and analyzing memory information.
 
 from google.adk.agents import LlmAgent
 
-from .tools import get_memory_info
+from ...metrics import compact_tool_response
+from ...tool_agent import ToolRunnerAgent
+from .tools import get_memory_info, get_memory_trends
 
 # --- Constants ---
 GEMINI_MODEL = "gemini-2.0-flash"
@@ -19,23 +21,42 @@ memory_info_agent = LlmAgent(
     
     When asked for system information, you should:
     1. Use the 'get_memory_info' tool to gather memory data
-    2. Analyze the returned dictionary data
-    3. Format this information into a concise, clear section of a system report
+    2. Use the 'get_memory_trends' tool with window_minutes=15 to get the memory and swap trends
+    3. Analyze the returned dictionary data
+    4. Format this information into a concise, clear section of a system report
     
     The tool will return a dictionary with:
     - result: Core memory information
     - stats: Key statistical data about memory usage
     - additional_info: Context about the data collection
     
+    Values are numbers: usage is in percent (keys ending in _percent)
+    and sizes are in GiB (keys ending in _gib) or bytes (keys ending in
+    _bytes); show sizes in GB.
+    
+    The trends tool returns min, max, mean, p95 and slope_per_minute for each
+    metric over the window (samples: 0 means there is no history yet).
+    
     Format your response as a well-structured report section with:
     - Total and available memory
     - Memory usage statistics
     - Swap memory information
+    - Memory and swap trends (direction and rate over the window, and the p95 peak)
     - Any performance concerns (high usage > 80%)
     
-    IMPORTANT: You MUST call the get_memory_info tool. Do not make up information.
+    IMPORTANT: You MUST call the get_memory_info and get_memory_trends tools. Do not make up information.
     """,
     description="Gathers and analyzes memory information",
-    tools=[get_memory_info],
+    tools=[get_memory_info, get_memory_trends],
+    after_tool_callback=compact_tool_response,
+    output_key="memory_info",
+)
+
+# The same gathering without a model call (SYSTEM_MONITOR_GATHER_MODE=direct)
+memory_info_tool_agent = ToolRunnerAgent(
+    name="MemoryInfoAgent",
+    description="Gathers memory information without a model call",
+    tools=[get_memory_info, get_memory_trends],
+    tool_args={"get_memory_trends": {"window_minutes": 15}},
     output_key="memory_info",
 )
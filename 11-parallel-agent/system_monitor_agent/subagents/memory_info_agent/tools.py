@@ -1,7 +1,7 @@
 """
 Memory Information Tool
 
-This module provides a tool for gathering memory information.
+This module provides tools for gathering memory information and its recent trends.
 """
 
 import time
@@ -9,7 +9,11 @@ from typing import Any, Dict
 
 import psutil
 
+from ...collector import trend_report
+from ...offload import run_in_thread
 
+
+@run_in_thread(timeout=5)
 def get_memory_info() -> Dict[str, Any]:
     """
     Gather memory information including RAM and swap usage.
@@ -23,13 +27,13 @@ def get_memory_info() -> Dict[str, Any]:
         swap = psutil.swap_memory()
 
         memory_info = {
-            "total_memory": f"{memory.total / (1024 ** 3):.2f} GB",
-            "available_memory": f"{memory.available / (1024 ** 3):.2f} GB",
-            "used_memory": f"{memory.used / (1024 ** 3):.2f} GB",
-            "memory_percentage": f"{memory.percent:.1f}%",
-            "swap_total": f"{swap.total / (1024 ** 3):.2f} GB",
-            "swap_used": f"{swap.used / (1024 ** 3):.2f} GB",
-            "swap_percentage": f"{swap.percent:.1f}%",
+            "total_bytes": memory.total,
+            "available_bytes": memory.available,
+            "used_bytes": memory.used,
+            "used_percent": memory.percent,
+            "swap_total_bytes": swap.total,
+            "swap_used_bytes": swap.used,
+            "swap_used_percent": swap.percent,
         }
 
         # Calculate stats
@@ -42,10 +46,10 @@ def get_memory_info() -> Dict[str, Any]:
         return {
             "result": memory_info,
             "stats": {
-                "memory_usage_percentage": memory_usage,
-                "swap_usage_percentage": swap_usage,
-                "total_memory_gb": memory.total / (1024**3),
-                "available_memory_gb": memory.available / (1024**3),
+                "memory_usage_percent": memory_usage,
+                "swap_usage_percent": swap_usage,
+                "total_memory_bytes": memory.total,
+                "available_memory_bytes": memory.available,
             },
             "additional_info": {
                 "data_format": "dictionary",
@@ -62,3 +66,25 @@ def get_memory_info() -> Dict[str, Any]:
             "stats": {"success": False},
             "additional_info": {"error_type": str(type(e).__name__)},
         }
+
+
+@run_in_thread(timeout=5)
+def get_memory_trends(window_minutes: int) -> Dict[str, Any]:
+    """
+    Summarize how memory and swap usage changed over a recent window.
+
+    Args:
+        window_minutes: How far back to look, in minutes
+
+    Returns:
+        Dict[str, Any]: Min, max, mean, p95 and slope per minute of each
+        metric, from the background metric collector
+    """
+    try:
+        return trend_report(["memory_percent", "swap_percent"], window_minutes)
+    except Exception as e:
+        return {
+            "result": {"error": f"Failed to gather memory trends: {str(e)}"},
+            "stats": {"success": False},
+            "additional_info": {"error_type": str(type(e).__name__)},
+        }
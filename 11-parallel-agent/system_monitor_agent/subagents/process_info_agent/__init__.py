@@ -0,0 +1,3 @@
+"""Process info agent for system monitoring."""
+
+from .agent import process_info_agent, process_info_tool_agent
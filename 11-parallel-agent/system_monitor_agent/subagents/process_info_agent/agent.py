@@ -0,0 +1,58 @@
+"""
+Process Information Agent
+
+This agent is responsible for finding the processes using the most resources.
+"""
+
+from google.adk.agents import LlmAgent
+
+from ...metrics import compact_tool_response
+from ...tool_agent import ToolRunnerAgent
+from .tools import get_top_processes
+
+# --- Constants ---
+GEMINI_MODEL = "gemini-2.0-flash"
+
+# Process Information Agent
+process_info_agent = LlmAgent(
+    name="ProcessInfoAgent",
+    model=GEMINI_MODEL,
+    instruction="""You are a Process Information Agent.
+    
+    When asked for system information, you should:
+    1. Use the 'get_top_processes' tool with limit=5 to find the busiest processes
+    2. Analyze the returned dictionary data
+    3. Format this information into a concise, clear section of a system report
+    
+    The tool will return a dictionary with:
+    - result: The top processes by CPU (top_cpu), memory (top_memory) and disk IO (top_io)
+    - stats: How many processes were scanned, and the window in seconds (rate_window_seconds) the CPU and IO rates cover
+    - additional_info: Context about the data collection
+    
+    Values are numbers: cpu_percent is in percent of one core (so it can be
+    above 100 on multi-core machines), rss_gib (or rss_bytes) is resident
+    memory in GiB (or bytes; show it in MB or GB) and io_bytes_per_s is disk
+    IO in bytes per second.
+    
+    Format your response as a well-structured report section with:
+    - The processes using the most CPU
+    - The processes using the most memory
+    - The processes doing the most disk IO
+    - Any single process that dominates a resource
+    
+    IMPORTANT: You MUST call the get_top_processes tool. Do not make up information.
+    """,
+    description="Finds the processes using the most CPU, memory and disk IO",
+    tools=[get_top_processes],
+    after_tool_callback=compact_tool_response,
+    output_key="process_info",
+)
+
+# The same gathering without a model call (SYSTEM_MONITOR_GATHER_MODE=direct)
+process_info_tool_agent = ToolRunnerAgent(
+    name="ProcessInfoAgent",
+    description="Finds the busiest processes without a model call",
+    tools=[get_top_processes],
+    tool_args={"get_top_processes": {"limit": 5}},
+    output_key="process_info",
+)
@@ -0,0 +1,157 @@
+"""
+Process Information Tool
+
+This module provides a tool for finding the processes using the most CPU,
+memory and disk IO.
+
+CPU and IO usage are rates, so they need two samples per process. The scan
+keeps the previous sample, so a call only has to wait for a second sample
+when the previous one is missing or more than MAX_SAMPLE_AGE_SECONDS old;
+otherwise the rates cover the time since the last scan. The window the rates
+cover is reported as rate_window_seconds. Results are cached for
+CACHE_SECONDS, and concurrent calls share one scan.
+
+Every process is ranked: a cap on the scan would drop processes in pid order,
+before anything is known about their usage. To keep the cost down on hosts
+with thousands of processes, each scan reads only the attributes it needs
+(in one pass per process) and picks the top N with a heap instead of sorting
+everything. The time a scan took is reported as scan_seconds.
+"""
+
+import heapq
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import psutil
+
+from ...offload import run_in_thread
+
+CACHE_SECONDS = 5
+# Interval between the two samples when there is no usable previous scan
+SAMPLE_SECONDS = 0.5
+# A previous scan older than this is too coarse for current rates
+MAX_SAMPLE_AGE_SECONDS = 10
+MAX_LIMIT = 25
+
+ATTRS = ["pid", "name", "create_time", "cpu_times", "memory_info", "io_counters"]
+
+_lock = threading.Lock()
+# (monotonic time, {(pid, create_time): (cpu seconds, io bytes)})
+_previous: Optional[Tuple[float, Dict[Tuple[int, float], Tuple[float, int]]]] = None
+# (monotonic time, processes, stats)
+_cached: Optional[Tuple[float, List[Dict[str, Any]], Dict[str, Any]]] = None
+
+
+def _sample():
+    """One pass over the processes: counters by process, and the details."""
+    counters, details = {}, {}
+    for process in psutil.process_iter(ATTRS, ad_value=None):
+        info = process.info
+        key = (info["pid"], info["create_time"])
+        cpu_times, io = info["cpu_times"], info["io_counters"]
+        counters[key] = (
+            cpu_times.user + cpu_times.system if cpu_times else None,
+            io.read_bytes + io.write_bytes if io else None,
+        )
+        details[key] = (
+            info["name"],
+            info["memory_info"].rss if info["memory_info"] else None,
+        )
+    return time.monotonic(), counters, details
+
+
+def _rate(current, previous, seconds: float) -> Optional[float]:
+    if current is None or previous is None:
+        return None
+    return max(current - previous, 0) / seconds
+
+
+def _scan() -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """All processes with CPU and IO rates since the previous sample."""
+    global _previous
+    if _previous is None or time.monotonic() - _previous[0] > MAX_SAMPLE_AGE_SECONDS:
+        taken_at, counters, _ = _sample()
+        _previous = (taken_at, counters)
+        time.sleep(SAMPLE_SECONDS)
+
+    previous_at, previous = _previous
+    started = time.monotonic()
+    taken_at, counters, details = _sample()
+    _previous = (taken_at, counters)
+    seconds = taken_at - previous_at
+
+    processes = []
+    for key, (cpu, io) in counters.items():
+        previous_cpu, previous_io = previous.get(key, (None, None))
+        cpu_rate = _rate(cpu, previous_cpu, seconds)
+        name, rss = details[key]
+        processes.append(
+            {
+                "pid": key[0],
+                "name": name,
+                # Like top: 100 is one full core
+                "cpu_percent": None if cpu_rate is None else round(cpu_rate * 100, 1),
+                "rss_bytes": rss,
+                "io_bytes_per_s": _rate(io, previous_io, seconds),
+            }
+        )
+    stats = {
+        "process_count": len(processes),
+        "scan_seconds": round(taken_at - started, 3),
+        "rate_window_seconds": round(seconds, 2),
+    }
+    return processes, stats
+
+
+def _top(processes, key: str, limit: int) -> List[Dict[str, Any]]:
+    candidates = (p for p in processes if p[key] is not None)
+    return heapq.nlargest(limit, candidates, key=lambda p: p[key])
+
+
+@run_in_thread(timeout=10)
+def get_top_processes(limit: int) -> Dict[str, Any]:
+    """
+    Find the processes using the most CPU, memory (RSS) and disk IO.
+
+    Args:
+        limit: How many processes to list for each resource (at most 25)
+
+    Returns:
+        Dict[str, Any]: Dictionary with the top processes structured for ADK
+    """
+    global _cached
+    try:
+        limit = max(1, min(limit, MAX_LIMIT))
+        with _lock:
+            if _cached is None or time.monotonic() - _cached[0] > CACHE_SECONDS:
+                processes, stats = _scan()
+                _cached = (time.monotonic(), processes, stats)
+            cached_at, processes, stats = _cached
+
+        return {
+            "result": {
+                "top_cpu": _top(processes, "cpu_percent", limit),
+                "top_memory": _top(processes, "rss_bytes", limit),
+                "top_io": _top(processes, "io_bytes_per_s", limit),
+            },
+            "stats": stats,
+            "additional_info": {
+                "data_format": "dictionary",
+                "collection_timestamp": time.time(),
+                "cache_age_seconds": round(time.monotonic() - cached_at, 2),
+                "note": (
+                    "cpu_percent and io_bytes_per_s are averages over the last"
+                    " rate_window_seconds (at most"
+                    f" {MAX_SAMPLE_AGE_SECONDS}s); each list is sorted by its"
+                    " metric over all processes, and processes whose counters"
+                    " can't be read are left out of that ranking"
+                ),
+            },
+        }
+    except Exception as e:
+        return {
+            "result": {"error": f"Failed to gather process information: {str(e)}"},
+            "stats": {"success": False},
+            "additional_info": {"error_type": str(type(e).__name__)},
+        }
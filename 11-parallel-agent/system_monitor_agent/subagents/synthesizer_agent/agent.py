@@ -20,11 +20,23 @@ system_report_synthesizer = LlmAgent(
     - CPU information: {cpu_info}
     - Memory information: {memory_info}
     - Disk information: {disk_info}
+    - Top processes: {process_info}
+    - Fleet information (only when monitoring a fleet of hosts): {fleet_info?}
+    
+    Each of these is either a written report section or the raw tool results
+    as JSON, keyed by the tool name. In the raw results, keys ending in
+    _percent are percentages, _gib sizes in GiB and _bytes sizes in bytes.
+    Process cpu_percent is relative to one core.
     
     Create a well-formatted report with:
     1. An executive summary at the top with overall system health status
-    2. Sections for each component with their respective information
-    3. Recommendations based on any concerning metrics
+    2. Sections for each component with their respective information, and a
+       fleet section with outlier and unreachable hosts if fleet information
+       is present
+    3. Trends: which metrics are rising or falling, and how fast
+    4. Recommendations based on any concerning metrics, including current
+       values that are fine now but trending towards a limit, and naming the
+       processes responsible where the process information shows them
     
     Use markdown formatting to make the report readable and professional.
     Highlight any concerning values and provide practical recommendations.
@@ -0,0 +1,67 @@
+"""
+Tool Runner Agent
+
+The CPU, memory and disk agents are LlmAgents whose only job is to call their
+tools and restate the result, which costs a model call each before the
+synthesizer even starts. ToolRunnerAgent does the same gathering without a
+model: it calls its tools directly (concurrently) and stores their results
+under output_key in the session state, where the synthesizer's instruction
+picks them up.
+
+Set SYSTEM_MONITOR_GATHER_MODE=direct to gather with these agents; the
+default ("llm") keeps the LlmAgents.
+
+Since the results go straight into the synthesizer's prompt, they are stored
+in the compact encoding from metrics.py by default, like the tool responses
+the LlmAgents read. Set SYSTEM_MONITOR_STATE_ENCODING=raw to store the result
+dictionaries instead.
+"""
+
+import asyncio
+import inspect
+from typing import Any, AsyncGenerator, Callable, Dict, List
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+
+from .metrics import ENCODING, compact
+
+
+class ToolRunnerAgent(BaseAgent):
+    """Calls its tools without a model and saves the results to state.
+
+    The state value is a dictionary of each tool's result, keyed by the tool
+    name, or its compact JSON encoding.
+
+    Args:
+        tools: Tool functions, sync or async
+        tool_args: Keyword arguments for the tools that take any, by tool name
+        output_key: State key the results are stored under
+        encoding: "compact" or "raw"
+    """
+
+    tools: List[Callable[..., Any]]
+    tool_args: Dict[str, Dict[str, Any]] = {}
+    output_key: str
+    encoding: str = ENCODING
+
+    async def _call(self, tool: Callable[..., Any]) -> Any:
+        result = tool(**self.tool_args.get(tool.__name__, {}))
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        results = await asyncio.gather(*(self._call(tool) for tool in self.tools))
+        value = {tool.__name__: result for tool, result in zip(self.tools, results)}
+        if self.encoding == "compact":
+            value = compact(value)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={self.output_key: value}),
+        )
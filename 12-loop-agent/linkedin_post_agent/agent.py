@@ -5,17 +5,28 @@ This module defines the root agent for the LinkedIn post generation application.
 It uses a sequential agent with an initial post generator followed by a refinement loop.
 """
 
-from google.adk.agents import LoopAgent, SequentialAgent
+from google.adk.agents import SequentialAgent
 
+from .convergent_loop import ConvergentLoopAgent
 from .subagents.post_generator import initial_post_generator
 from .subagents.post_refiner import post_refiner
-from .subagents.post_reviewer import post_reviewer
+from .subagents.post_reviewer import post_reviewer, post_rule_checker
+from .subagents.post_reviewer.rules import score_post
 
 # Create the Refinement Loop Agent
-refinement_loop = LoopAgent(
+# Besides the reviewer's exit_loop, it stops early when the refiner stops
+# changing the post, the rule score stalls, or the time/output token budget runs out
+refinement_loop = ConvergentLoopAgent(
     name="PostRefinementLoop",
     max_iterations=10,
+    watch_key="current_post",
+    score=score_post,
+    similarity_threshold=0.99,
+    patience=3,
+    max_seconds=300,
+    max_output_tokens=10000,
     sub_agents=[
+        post_rule_checker,
         post_reviewer,
         post_refiner,
     ],
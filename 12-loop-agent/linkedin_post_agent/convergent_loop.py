@@ -0,0 +1,175 @@
+"""
+Convergent Loop Agent
+
+A LoopAgent only stops when a sub-agent escalates or after max_iterations. A
+refiner that has stopped changing the post, or that goes back and forth
+between versions, uses up the remaining iterations for nothing.
+ConvergentLoopAgent also stops when:
+
+- converged: an iteration changed the watched text by less than the
+  similarity threshold (difflib ratio between the versions)
+- plateau: the best score hasn't improved for `patience` iterations
+- budget: the loop ran out of wall-clock time, or its model calls generated
+  more than a number of output tokens
+
+On an early stop it restores the best-scoring candidate seen so far, since
+the last version isn't necessarily the best one. Either way it writes a
+refinement report to state: the iterations run, why the loop stopped, time
+and output tokens used, and the score and similarity of each iteration.
+"""
+
+import difflib
+import time
+from typing import AsyncGenerator, Callable, Optional
+
+from google.adk.agents import LoopAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+
+# Rough size of a token, for estimating when the model doesn't report usage
+CHARS_PER_TOKEN = 4
+
+
+def _output_tokens(event: Event) -> int:
+    """Tokens generated for a model response event.
+
+    Prompt tokens aren't counted: ADK doesn't report usage on events here,
+    and the prompt can't be estimated from the event.
+    """
+    usage = getattr(event, "usage_metadata", None)
+    if usage is not None and usage.candidates_token_count:
+        return usage.candidates_token_count
+    if event.author == "user" or not event.content or not event.content.parts:
+        return 0
+    chars = 0
+    for part in event.content.parts:
+        if part.text:
+            chars += len(part.text)
+        elif part.function_call:
+            chars += len(str(part.function_call.args or {})) + len(
+                part.function_call.name or ""
+            )
+    return -(-chars // CHARS_PER_TOKEN)
+
+
+class ConvergentLoopAgent(LoopAgent):
+    """A LoopAgent that also stops when its output converges or stalls.
+
+    Args:
+        watch_key: State key of the text being refined
+        score: Scores a candidate text, higher is better; without it there
+            is no plateau check and the last candidate is kept
+        similarity_threshold: Stop when an iteration leaves the text at
+            least this similar (0-1) to the previous version
+        patience: Stop after this many iterations without a better score
+        max_seconds: Wall-clock budget for the loop
+        max_output_tokens: Budget for the tokens generated by the loop's
+            model calls (prompt tokens aren't counted)
+        report_key: State key for the refinement report
+    """
+
+    watch_key: str
+    score: Optional[Callable[[str], float]] = None
+    similarity_threshold: float = 0.98
+    patience: int = 3
+    max_seconds: Optional[float] = None
+    max_output_tokens: Optional[int] = None
+    report_key: str = "refinement_report"
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        started = time.monotonic()
+        tokens = 0
+        text = ctx.session.state.get(self.watch_key, "")
+        best_text = text
+        best_score = self.score(text) if self.score else None
+        best_iteration = 0
+        # Patience counts from the last strict improvement, not from a tie
+        improved_iteration = 0
+        scores = [best_score]
+        similarities = []
+        iterations = 0
+        stop_reason = "max_iterations"
+
+        while not self.max_iterations or iterations < self.max_iterations:
+            escalated = over_budget = False
+            for sub_agent in self.sub_agents:
+                async for event in sub_agent.run_async(ctx):
+                    tokens += _output_tokens(event)
+                    yield event
+                    escalated = escalated or bool(event.actions.escalate)
+                if escalated:
+                    break
+                over_budget = self._over_budget(started, tokens)
+                if over_budget:
+                    break
+            iterations += 1
+            if escalated:
+                stop_reason = "escalated"
+                break
+
+            previous, text = text, ctx.session.state.get(self.watch_key, "")
+            similarity = difflib.SequenceMatcher(None, previous, text).ratio()
+            similarities.append(round(similarity, 3))
+            if self.score:
+                score = self.score(text)
+                scores.append(score)
+                if score > best_score:
+                    improved_iteration = iterations
+                # Ties go to the later, more refined candidate
+                if score >= best_score:
+                    best_score, best_text, best_iteration = score, text, iterations
+            else:
+                best_text, best_iteration = text, iterations
+
+            if over_budget:
+                stop_reason = over_budget
+                break
+            if similarity >= self.similarity_threshold:
+                stop_reason = "converged"
+                break
+            if self.score and iterations - improved_iteration >= self.patience:
+                stop_reason = "plateau"
+                break
+
+        state_delta = {
+            self.report_key: {
+                "iterations": iterations,
+                "stop_reason": stop_reason,
+                "seconds": round(time.monotonic() - started, 2),
+                "output_tokens": tokens,
+                "best_iteration": best_iteration,
+                "best_score": best_score,
+                "scores": scores,
+                "similarities": similarities,
+            }
+        }
+        # An approved text stands; otherwise keep the best candidate
+        if stop_reason != "escalated" and best_text != text:
+            state_delta[self.watch_key] = best_text
+
+        print("\n----------- REFINEMENT REPORT -----------")
+        print(f"Stopped after {iterations} iteration(s): {stop_reason}")
+        print(
+            f"Output tokens: ~{tokens}, time: {state_delta[self.report_key]['seconds']}s"
+        )
+        print(f"Best candidate: iteration {best_iteration} (score {best_score})")
+        print("-----------------------------------------\n")
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=state_delta),
+        )
+
+    def _over_budget(self, started: float, tokens: int) -> Optional[str]:
+        if (
+            self.max_seconds is not None
+            and time.monotonic() - started > self.max_seconds
+        ):
+            return "time_budget"
+        if self.max_output_tokens is not None and tokens > self.max_output_tokens:
+            return "token_budget"
+        return None
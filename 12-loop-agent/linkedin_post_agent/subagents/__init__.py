@@ -6,4 +6,4 @@ This package provides all subagents used in the LinkedIn post generation system.
 
 from .post_generator import initial_post_generator
 from .post_refiner import post_refiner
-from .post_reviewer import post_reviewer
+from .post_reviewer import post_reviewer, post_rule_checker
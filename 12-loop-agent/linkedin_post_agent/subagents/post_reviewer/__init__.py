@@ -1,7 +1,7 @@
 """
 LinkedIn Post Reviewer Agent Package
 
-This package provides an agent for reviewing and validating LinkedIn posts.
+This package provides agents for reviewing and validating LinkedIn posts.
 """
 
-from .agent import post_reviewer
+from .agent import post_reviewer, post_rule_checker
@@ -2,15 +2,24 @@
 LinkedIn Post Reviewer Agent
 
 This agent reviews LinkedIn posts for quality and provides feedback.
+The rules that need no judgement are checked first by post_rule_checker,
+without a model; the reviewer only runs once the post passes them.
 """
 
 from google.adk.agents.llm_agent import LlmAgent
 
-from .tools import count_characters, exit_loop
+from .rule_checker import PostRuleChecker, skip_review_if_failed
+from .tools import exit_loop
 
 # Constants
 GEMINI_MODEL = "gemini-2.0-flash"
 
+# Define the Post Rule Checker (no model call)
+post_rule_checker = PostRuleChecker(
+    name="PostRuleChecker",
+    description="Checks post length, emojis, hashtags, the required mention and the number of ADK capabilities",
+)
+
 # Define the Post Reviewer Agent
 post_reviewer = LlmAgent(
     name="PostReviewer",
@@ -20,26 +29,18 @@ post_reviewer = LlmAgent(
     Your task is to evaluate the quality of a LinkedIn post about Agent Development Kit (ADK).
     
     ## EVALUATION PROCESS
-    1. Use the count_characters tool to check the post's length.
-       Pass the post text directly to the tool.
-    
-    2. If the length check fails (tool result is "fail"), provide specific feedback on what needs to be fixed.
-       Use the tool's message as a guideline, but add your own professional critique.
-    
-    3. If length check passes, evaluate the post against these criteria:
+    The post has already passed the automatic checks: it is 1000-1500
+    characters long, has no emojis or hashtags, mentions @aiwithbrandon and
+    lists at least 4 ADK capabilities. Evaluate it against the remaining criteria:
        - REQUIRED ELEMENTS:
-         1. Mentions @aiwithbrandon
-         2. Lists multiple ADK capabilities (at least 4)
-         3. Has a clear call-to-action
-         4. Includes practical applications
-         5. Shows genuine enthusiasm
+         1. Has a clear call-to-action
+         2. Includes practical applications
+         3. Shows genuine enthusiasm
        
        - STYLE REQUIREMENTS:
-         1. NO emojis
-         2. NO hashtags
-         3. Professional tone
-         4. Conversational style
-         5. Clear and concise writing
+         1. Professional tone
+         2. Conversational style
+         3. Clear and concise writing
     
     ## OUTPUT INSTRUCTIONS
     IF the post fails ANY of the checks above:
@@ -55,6 +56,7 @@ post_reviewer = LlmAgent(
     {current_post}
     """,
     description="Reviews post quality and provides feedback on what to improve or exits the loop if requirements are met",
-    tools=[count_characters, exit_loop],
+    tools=[exit_loop],
     output_key="review_feedback",
+    before_agent_callback=skip_review_if_failed,
 )
@@ -0,0 +1,70 @@
+"""
+Rule Checker for LinkedIn Post Reviewer
+
+PostRuleChecker runs the rules in rules.py on the current post, without a
+model, before the reviewer. When the post breaks a rule the review is already
+decided: the checker writes the feedback itself, and skip_review_if_failed
+(the reviewer's before_agent_callback) skips the reviewer's model call.
+"""
+
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from .rules import check_post, format_feedback
+
+
+class PostRuleChecker(BaseAgent):
+    """Checks current_post against the rules and saves the result to state.
+
+    Sets rule_check (the full report) and review_status ('pass' or 'fail').
+    On failure it also sets review_feedback, which the refiner reads.
+    """
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        report = check_post(ctx.session.state.get("current_post", ""))
+        state_delta = {"rule_check": report, "review_status": report["result"]}
+        if report["result"] == "fail":
+            state_delta["review_feedback"] = format_feedback(report)
+
+        print("\n----------- RULE CHECK -----------")
+        print(f"Post length: {report['char_count']} characters")
+        print(f"Result: {report['result']}")
+        for violation in report["violations"]:
+            print(f"  - {violation['rule']}: {violation['message']}")
+        print("----------------------------------\n")
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=state_delta),
+        )
+
+
+def skip_review_if_failed(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Skips the reviewer when the rule check has already failed the post.
+
+    Args:
+        callback_context: Contains state and context information
+
+    Returns:
+        The content to use instead of the reviewer's response, or None to
+        run the reviewer
+    """
+    rule_check = callback_context.state.get("rule_check")
+    if rule_check and rule_check["result"] == "fail":
+        return types.Content(
+            role="model",
+            parts=[
+                types.Part(text="Skipping the review: the post fails the rule check.")
+            ],
+        )
+    return None
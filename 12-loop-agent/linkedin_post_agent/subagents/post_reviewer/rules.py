@@ -0,0 +1,156 @@
+"""
+Post Rules for LinkedIn Post Reviewer
+
+This module checks the requirements of a post that don't need judgement:
+length, no emojis, no hashtags, the @aiwithbrandon mention and the number of
+ADK capabilities it lists. They run locally, so the reviewer model is only
+asked about what is left (call-to-action, tone, enthusiasm) and only once the
+post passes these checks.
+"""
+
+import re
+from typing import Any, Dict, List
+
+MIN_LENGTH = 1000
+MAX_LENGTH = 1500
+REQUIRED_MENTION = "@aiwithbrandon"
+MIN_CAPABILITIES = 4
+
+EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001f000-\U0001faff"  # Pictographs, emoticons, transport, symbols
+    "\u2600-\u27bf"  # Miscellaneous symbols and dingbats
+    "\u2b00-\u2bff"  # Arrows and stars
+    "\ufe0f"  # Emoji presentation selector
+    "]"
+)
+HASHTAG_PATTERN = re.compile(r"(?<![\w&/])#[A-Za-z]\w*")
+
+# ADK capabilities the post can list, and how to recognize them. Only
+# ADK-specific phrasing counts: "tools", "state" or "in the loop" are everyday
+# English, so they would let any post pass without naming a capability.
+CAPABILITY_PATTERNS = {
+    "basic agents": r"\bbasic[- ]agents?\b",
+    "tool integration": r"\btool[- ](integration|agents?|calling|calls)\b|\bfunction tools?\b",
+    "LiteLLM": r"\blite-?llm\b",
+    "sessions and memory": (
+        r"\bsessions? (and|&) memory\b|\bsession (management|services?)\b"
+        r"|\bmanag(e|ing) sessions\b|\bmemory (services?|management)\b"
+    ),
+    "persistent storage": r"\bpersistent (storage|sessions?|state)\b|\bdatabase sessions?\b",
+    "multi-agent systems": r"\bmulti-?agent\b",
+    "session state": r"\bstateful\b|\b(session|shared) state\b|\bstate management\b",
+    "callbacks": r"\bcallbacks?\b",
+    "sequential agents": r"\bsequential[- ]?agents?\b|\bsequential (pipelines?|workflows?)\b",
+    "parallel agents": r"\bparallel[- ]?agents?\b|\bparallel (execution|workflows?)\b",
+    "loop agents": r"\bloop[- ]?agents?\b|\b(refinement|agent) loops?\b",
+}
+
+
+def find_capabilities(text: str) -> List[str]:
+    """The ADK capabilities mentioned in the text."""
+    return [
+        capability
+        for capability, pattern in CAPABILITY_PATTERNS.items()
+        if re.search(pattern, text, re.IGNORECASE)
+    ]
+
+
+def check_post(text: str) -> Dict[str, Any]:
+    """
+    Check a post against the rules.
+
+    Args:
+        text: The post to check
+
+    Returns:
+        Dict[str, Any]: Dictionary containing:
+            - result: 'fail' or 'pass'
+            - char_count: number of characters in the post
+            - capabilities: the ADK capabilities found
+            - violations: one dictionary per failed rule, with the rule name
+              and a message on how to fix it
+    """
+    text = text.strip()
+    char_count = len(text)
+    violations = []
+
+    if char_count < MIN_LENGTH:
+        chars_needed = MIN_LENGTH - char_count
+        violations.append(
+            {
+                "rule": "min_length",
+                "chars_needed": chars_needed,
+                "message": f"Post is too short. Add {chars_needed} more characters to reach minimum length of {MIN_LENGTH}.",
+            }
+        )
+    elif char_count > MAX_LENGTH:
+        chars_to_remove = char_count - MAX_LENGTH
+        violations.append(
+            {
+                "rule": "max_length",
+                "chars_to_remove": chars_to_remove,
+                "message": f"Post is too long. Remove {chars_to_remove} characters to meet maximum length of {MAX_LENGTH}.",
+            }
+        )
+
+    emojis = EMOJI_PATTERN.findall(text)
+    if emojis:
+        violations.append(
+            {
+                "rule": "no_emojis",
+                "found": emojis,
+                "message": f"Remove all emojis ({' '.join(emojis)}).",
+            }
+        )
+
+    hashtags = HASHTAG_PATTERN.findall(text)
+    if hashtags:
+        violations.append(
+            {
+                "rule": "no_hashtags",
+                "found": hashtags,
+                "message": f"Remove all hashtags ({', '.join(hashtags)}).",
+            }
+        )
+
+    if REQUIRED_MENTION.lower() not in text.lower():
+        violations.append(
+            {
+                "rule": "mention",
+                "message": f"Mention {REQUIRED_MENTION} as the author of the tutorial.",
+            }
+        )
+
+    capabilities = find_capabilities(text)
+    if len(capabilities) < MIN_CAPABILITIES:
+        missing = [c for c in CAPABILITY_PATTERNS if c not in capabilities]
+        violations.append(
+            {
+                "rule": "capabilities",
+                "found": capabilities,
+                "message": (
+                    f"List at least {MIN_CAPABILITIES} specific ADK capabilities"
+                    f" (found {len(capabilities)}). For example: {', '.join(missing[:4])}."
+                ),
+            }
+        )
+
+    return {
+        "result": "fail" if violations else "pass",
+        "char_count": char_count,
+        "capabilities": capabilities,
+        "violations": violations,
+    }
+
+
+def format_feedback(report: Dict[str, Any]) -> str:
+    """Review feedback for the refiner from a failed rule check."""
+    lines = ["The post fails these requirements:"]
+    lines += [f"- {violation['message']}" for violation in report["violations"]]
+    return "\n".join(lines)
+
+
+def score_post(text: str) -> float:
+    """Score for comparing refinement candidates: minus the rules broken."""
+    return float(-len(check_post(text)["violations"]))
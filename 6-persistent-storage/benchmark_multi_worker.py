@@ -0,0 +1,156 @@
+"""
+Multi-Worker Stress Benchmark
+
+Starts 1, 2, 4, ... worker processes that all read and write sessions in the
+same SQLite file, and reports how throughput scales with the worker count.
+Most writes go to a worker's own session; a fraction go to a shared session so
+that optimistic-concurrency conflicts are exercised too.
+
+Usage:
+    python benchmark_multi_worker.py [--workers 1 2 4 8] [--seconds 3]
+    python benchmark_multi_worker.py --mode plain   # stock DatabaseSessionService
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import DatabaseSessionService
+from sqlalchemy.exc import OperationalError
+from worker_session_service import (
+    MultiWorkerSessionService,
+    SessionVersionConflictError,
+)
+
+APP_NAME = "Memory Agent"
+SHARED_USER = "shared_user"
+SHARED_SESSION = "shared_session"
+
+
+def create_service(mode, db_url):
+    if mode == "plain":
+        return DatabaseSessionService(db_url=db_url)
+    return MultiWorkerSessionService(db_url=db_url)
+
+
+def worker(mode, db_url, worker_id, seconds, shared_ratio, ready, results):
+    """Read-modify-write sessions until the time is up, counting outcomes."""
+    session_service = create_service(mode, db_url)
+    user_id = f"worker_{worker_id}"
+    own_session_id = f"session_{worker_id}"
+    counts = {"ops": 0, "conflicts": 0, "locked": 0, "other_errors": 0}
+    rng = random.Random(worker_id)
+
+    # Start the clock only once every process has imported ADK and connected
+    ready.wait()
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        if rng.random() < shared_ratio:
+            key = (SHARED_USER, SHARED_SESSION)
+        else:
+            key = (user_id, own_session_id)
+        try:
+            session = session_service.get_session(
+                app_name=APP_NAME, user_id=key[0], session_id=key[1]
+            )
+            counter = session.state.get("counter", 0) + 1
+            session_service.append_event(
+                session=session,
+                event=Event(
+                    invocation_id=f"{user_id}-{counts['ops']}",
+                    author="memory_agent",
+                    actions=EventActions(
+                        state_delta={"counter": counter, "last_writer": user_id}
+                    ),
+                ),
+            )
+            counts["ops"] += 1
+        except SessionVersionConflictError:
+            counts["conflicts"] += 1
+        except OperationalError as e:
+            if "locked" in str(e).lower():
+                counts["locked"] += 1
+            else:
+                counts["other_errors"] += 1
+        except ValueError:
+            # The stock service raises ValueError for stale sessions
+            counts["conflicts"] += 1
+
+    stats = session_service.stats() if hasattr(session_service, "stats") else {}
+    counts["lock_retries"] = stats.get("lock_retries", 0)
+    results.put(counts)
+
+
+def run(mode, workers, seconds, shared_ratio):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_url = f"sqlite:///{os.path.join(tmp_dir, 'workers.db')}"
+        setup = create_service(mode, db_url)
+        setup.create_session(
+            app_name=APP_NAME,
+            user_id=SHARED_USER,
+            session_id=SHARED_SESSION,
+            state={"counter": 0},
+        )
+        for worker_id in range(workers):
+            setup.create_session(
+                app_name=APP_NAME,
+                user_id=f"worker_{worker_id}",
+                session_id=f"session_{worker_id}",
+                state={"counter": 0},
+            )
+        setup.db_engine.dispose()
+
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        ready = context.Barrier(workers)
+        processes = [
+            context.Process(
+                target=worker,
+                args=(mode, db_url, i, seconds, shared_ratio, ready, results),
+            )
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        totals = {}
+        for _ in processes:
+            for name, value in results.get().items():
+                totals[name] = totals.get(name, 0) + value
+        for process in processes:
+            process.join()
+        return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--shared-ratio", type=float, default=0.1)
+    parser.add_argument(
+        "--mode", choices=["multi-worker", "plain"], default="multi-worker"
+    )
+    args = parser.parse_args()
+
+    print(f"\nMode: {args.mode}, {args.seconds:.0f}s per run")
+    print(
+        f"{'workers':>8} {'writes/s':>10} {'scaling':>8} {'conflicts':>10}"
+        f" {'lock retries':>13} {'locked errors':>14} {'other errors':>13}"
+    )
+    baseline = None
+    for workers in args.workers:
+        totals = run(args.mode, workers, args.seconds, args.shared_ratio)
+        throughput = totals["ops"] / args.seconds
+        baseline = baseline or throughput
+        print(
+            f"{workers:>8} {throughput:>10.1f} {throughput / baseline:>7.2f}x"
+            f" {totals['conflicts']:>10} {totals['lock_retries']:>13}"
+            f" {totals['locked']:>14} {totals['other_errors']:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
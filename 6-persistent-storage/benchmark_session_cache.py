@@ -0,0 +1,123 @@
+"""
+Session Cache Benchmark
+
+Replays the read/write pattern of one chat turn (runner read, two display_state
+reads, a few state-changing events) against a plain DatabaseSessionService and
+against CachedDatabaseSessionService, then prints hit rates and read-latency
+percentiles. A second service instance stands in for another process writing
+to the same session, to check that stale cache entries are invalidated.
+
+Usage:
+    python benchmark_session_cache.py [--turns 200] [--events-per-turn 3]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import DatabaseSessionService
+from session_cache import CachedDatabaseSessionService, percentile
+
+APP_NAME = "Memory Agent"
+USER_ID = "benchmark_user"
+
+
+def run_turns(session_service, session_id, turns, events_per_turn):
+    """Simulate chat turns and return the latency of every session read."""
+    read_latencies = []
+
+    def timed_read():
+        start = time.perf_counter()
+        session = session_service.get_session(
+            app_name=APP_NAME, user_id=USER_ID, session_id=session_id
+        )
+        read_latencies.append(time.perf_counter() - start)
+        return session
+
+    for turn in range(turns):
+        timed_read()  # display_state BEFORE processing
+        session = timed_read()  # runner.run_async
+        for i in range(events_per_turn):
+            reminders = session.state.get("reminders", []) + [f"turn {turn} item {i}"]
+            event = Event(
+                invocation_id=f"turn-{turn}",
+                author="memory_agent",
+                actions=EventActions(state_delta={"reminders": reminders[-20:]}),
+            )
+            session_service.append_event(session=session, event=event)
+        timed_read()  # display_state AFTER processing
+
+    return sorted(read_latencies)
+
+
+def report(label, latencies):
+    print(
+        f"{label:<28} p50 {percentile(latencies, 50) * 1000:7.3f} ms   "
+        f"p95 {percentile(latencies, 95) * 1000:7.3f} ms   "
+        f"p99 {percentile(latencies, 99) * 1000:7.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--events-per-turn", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_url = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+        initial_state = {"user_name": "Benchmark User", "reminders": []}
+
+        # ===== Plain database reads =====
+        plain_service = DatabaseSessionService(db_url=db_url)
+        plain_session = plain_service.create_session(
+            app_name=APP_NAME, user_id=USER_ID, state=initial_state
+        )
+        plain = run_turns(
+            plain_service, plain_session.id, args.turns, args.events_per_turn
+        )
+
+        # ===== Cached reads =====
+        cached_service = CachedDatabaseSessionService(db_url=db_url)
+        cached_session = cached_service.create_session(
+            app_name=APP_NAME, user_id=USER_ID, state=initial_state
+        )
+        cached = run_turns(
+            cached_service, cached_session.id, args.turns, args.events_per_turn
+        )
+
+        print(f"\nSession reads over {args.turns} turns:")
+        report("DatabaseSessionService", plain)
+        report("CachedDatabaseSessionService", cached)
+        stats = cached_service.stats()
+        print(
+            f"Cache hit rate: {stats['hit_rate']:.1%} "
+            f"({stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['invalidations']} invalidations)"
+        )
+
+        # ===== Cross-process invalidation =====
+        # A second cached service has its own memory, like another worker process
+        other_process = CachedDatabaseSessionService(db_url=db_url)
+        session = other_process.get_session(
+            app_name=APP_NAME, user_id=USER_ID, session_id=cached_session.id
+        )
+        other_process.append_event(
+            session=session,
+            event=Event(
+                invocation_id="other-process",
+                author="memory_agent",
+                actions=EventActions(state_delta={"user_name": "Renamed Elsewhere"}),
+            ),
+        )
+        seen = cached_service.get_session(
+            app_name=APP_NAME, user_id=USER_ID, session_id=cached_session.id
+        )
+        status = "OK" if seen.state["user_name"] == "Renamed Elsewhere" else "STALE"
+        print(f"Cross-process invalidation: {status}")
+
+
+if __name__ == "__main__":
+    main()
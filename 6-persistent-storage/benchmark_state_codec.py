@@ -0,0 +1,154 @@
+"""
+State Codec Benchmark
+
+Measures encode time, decode time and stored size of every available state
+codec, using state shaped like the 8-stateful-multi-agent customer service
+example (user_name, purchased_courses and a growing interaction_history).
+It then round-trips a session through the database with each codec and checks
+that rows written by the stock service are still readable.
+
+Usage:
+    python benchmark_state_codec.py [--history 10 100 1000] [--repeat 200]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import timeit
+
+from google.adk.sessions import DatabaseSessionService
+from session_cache import CachedDatabaseSessionService
+from state_codec import StateCodec, decode_state
+
+CODEC_OPTIONS = [
+    ("json", None),
+    ("orjson", None),
+    ("msgpack", None),
+    ("json", "zlib"),
+    ("orjson", "zstd"),
+    ("msgpack", "zstd"),
+]
+
+
+def customer_service_state(history_length):
+    """Build a state dict like the one customer_service_agent works with."""
+    history = []
+    for i in range(history_length):
+        timestamp = f"2025-04-{1 + i % 28:02d} 10:{i % 60:02d}:00"
+        if i % 2 == 0:
+            history.append(
+                {
+                    "action": "user_query",
+                    "query": f"Can you tell me more about section {i % 19 + 1}?",
+                    "timestamp": timestamp,
+                }
+            )
+        else:
+            history.append(
+                {
+                    "action": "agent_response",
+                    "agent": "course_support",
+                    "response": (
+                        "Section covers data modeling, view structure and component"
+                        " design. Start with the overview video, then follow along"
+                        " with the hands-on exercises in the project repository."
+                    ),
+                    "timestamp": timestamp,
+                }
+            )
+    return {
+        "user_name": "Brandon Hancock",
+        "purchased_courses": [
+            {"id": "ai_marketing_platform", "purchase_date": "2025-04-01 10:30:00"}
+        ],
+        "interaction_history": history,
+    }
+
+
+def available_codecs():
+    codecs = []
+    for encoding, compression in CODEC_OPTIONS:
+        try:
+            codecs.append(StateCodec(encoding, compression))
+        except ValueError as e:
+            print(f"Skipping {encoding}+{compression}: {e}")
+    return codecs
+
+
+def encoded_size(encoded):
+    return len(encoded.encode("utf-8")) if isinstance(encoded, str) else len(encoded)
+
+
+def run_micro_benchmark(codecs, history_lengths, repeat):
+    print(
+        f"\n{'history':>8} {'codec':<14} {'encode µs':>10} {'decode µs':>10}"
+        f" {'size bytes':>11} {'vs json':>8}"
+    )
+    for history_length in history_lengths:
+        state = customer_service_state(history_length)
+        json_size = None
+        for codec in codecs:
+            encoded = codec.encode(state)
+            assert decode_state(encoded) == state, f"{codec.name} did not round-trip"
+            encode_time = timeit.timeit(lambda: codec.encode(state), number=repeat)
+            # Plain JSON is timed with json.loads, the stock service's decoder
+            decode = json.loads if codec.name == "json" else decode_state
+            decode_time = timeit.timeit(lambda: decode(encoded), number=repeat)
+            size = encoded_size(encoded)
+            json_size = json_size or size
+            print(
+                f"{history_length:>8} {codec.name:<14}"
+                f" {encode_time / repeat * 1e6:>10.1f}"
+                f" {decode_time / repeat * 1e6:>10.1f}"
+                f" {size:>11} {size / json_size:>7.0%}"
+            )
+
+
+def run_database_check(codecs):
+    """Write and read a session with each codec, next to a legacy JSON row."""
+    print("\nDatabase round trip:")
+    state = customer_service_state(100)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_url = f"sqlite:///{os.path.join(tmp_dir, 'codec.db')}"
+
+        # A row written by the stock service, before any codec was installed
+        legacy = DatabaseSessionService(db_url=db_url).create_session(
+            app_name="legacy", user_id="user", state=state
+        )
+
+        session_service = CachedDatabaseSessionService(
+            db_url=db_url, state_codecs={codec.name: codec for codec in codecs}
+        )
+        loaded = session_service.get_session(
+            app_name="legacy", user_id="user", session_id=legacy.id
+        )
+        print(f"  legacy JSON row readable: {loaded.state == state}")
+
+        for codec in codecs:
+            created = session_service.create_session(
+                app_name=codec.name, user_id="user", state=state
+            )
+            # Bypass the cache so the row is really decoded from the database
+            loaded = DatabaseSessionService.get_session(
+                session_service,
+                app_name=codec.name,
+                user_id="user",
+                session_id=created.id,
+            )
+            print(f"  {codec.name:<14} round trip: {loaded.state == state}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--history", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    codecs = available_codecs()
+    run_micro_benchmark(codecs, args.history, args.repeat)
+    run_database_check(codecs)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,19 @@
 import asyncio
 
+from console import AsyncConsole
 from dotenv import load_dotenv
 from google.adk.runners import Runner
-from google.adk.sessions import DatabaseSessionService
 from memory_agent.agent import memory_agent
-from utils import call_agent_async
+from session_cache import CachedDatabaseSessionService
+from utils import call_agent_async, display_cache_stats
 
 load_dotenv()
 
 # ===== PART 1: Initialize Persistent Session Service =====
-# Using SQLite database for persistent storage
+# Using SQLite database for persistent storage, with an in-memory session
+# cache in front of it so repeated reads within a turn skip the database
 db_url = "sqlite:///./my_agent_data.db"
-session_service = DatabaseSessionService(db_url=db_url)
+session_service = CachedDatabaseSessionService(db_url=db_url)
 
 
 # ===== PART 2: Define Initial State =====
@@ -62,17 +64,26 @@ async def main_async():
     print("Your reminders will be remembered across conversations.")
     print("Type 'exit' or 'quit' to end the conversation.\n")
 
-    while True:
-        # Get user input
-        user_input = input("You: ")
-
-        # Check if user wants to exit
-        if user_input.lower() in ["exit", "quit"]:
-            print("Ending conversation. Your data has been saved to the database.")
-            break
-
-        # Process the user query through the agent
-        await call_agent_async(runner, USER_ID, SESSION_ID, user_input)
+    # The console reads input without blocking the event loop
+    async with AsyncConsole() as console:
+        while True:
+            # Get user input
+            try:
+                user_input = await console.read_line("You: ")
+            except EOFError:
+                user_input = "exit"
+
+            # Check if user wants to exit
+            if user_input.lower() in ["exit", "quit"]:
+                break
+
+            # Process the user query through the agent
+            await call_agent_async(
+                runner, USER_ID, SESSION_ID, user_input, stream=True, console=console
+            )
+
+    print("Ending conversation. Your data has been saved to the database.")
+    display_cache_stats(session_service)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,435 @@
+"""
+Session Cache
+
+This module provides a read-through, write-through LRU cache that sits in front
+of DatabaseSessionService. Repeated reads of the same session (the runner's
+get_session plus the display_state helpers) are served from memory, while every
+write still goes straight to the database.
+
+Each cached session carries a version stamp. Before a cached copy is served, a
+single lightweight query reads the session's current stamp: its update_time and
+write counter, the number of stored events and the latest event timestamp, and
+the app and user state. If another process has written to the session in the
+meantime, the stamps differ and the session is reloaded from the database.
+
+The event count and latest event timestamp change on every write, including
+writes by a stock DatabaseSessionService in another process (e.g. `adk web` on
+the same database), which doesn't know about the write counter; update_time
+alone has only one-second resolution in SQLite. The write counter is bumped in
+the same transaction as the write, by an after_flush hook on the service's
+database sessions.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import DatabaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.sessions.database_session_service import (
+    Base,
+    StorageAppState,
+    StorageEvent,
+    StorageSession,
+    StorageUserState,
+)
+from sqlalchemy import (
+    Index,
+    Integer,
+    String,
+    Text,
+    and_,
+    bindparam,
+    delete,
+    event,
+    func,
+    insert,
+    select,
+    type_coerce,
+    update,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+from state_codec import StateCodec, install_state_codecs, use_codec
+
+SessionKey = Tuple[str, str, str]
+
+
+class StorageSessionVersion(Base):
+    """Write counter for a session, bumped on every write through the cache."""
+
+    __tablename__ = "session_versions"
+
+    app_name: Mapped[str] = mapped_column(String, primary_key=True)
+    user_id: Mapped[str] = mapped_column(String, primary_key=True)
+    session_id: Mapped[str] = mapped_column(String, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0)
+
+
+# Lets the stamp query count a session's events without scanning the table
+_EVENTS_BY_SESSION = Index(
+    "ix_events_session",
+    StorageEvent.app_name,
+    StorageEvent.user_id,
+    StorageEvent.session_id,
+    StorageEvent.timestamp,
+)
+
+
+class Stamp(NamedTuple):
+    """What a cached session is checked against before it is served."""
+
+    update_time: datetime
+    version: Optional[int]
+    event_count: int
+    last_event_time: Optional[datetime]
+    # As stored (JSON text or a codec payload), not decoded
+    app_state: Optional[Any]
+    user_state: Optional[Any]
+
+
+def _session_events(column):
+    return (
+        select(column)
+        .where(
+            StorageEvent.app_name == StorageSession.app_name,
+            StorageEvent.user_id == StorageSession.user_id,
+            StorageEvent.session_id == StorageSession.id,
+        )
+        .correlate(StorageSession)
+        .scalar_subquery()
+    )
+
+
+# Statements are built once; building them per call costs more than running them
+_STAMP_QUERY = (
+    select(
+        StorageSession.update_time,
+        StorageSessionVersion.version,
+        _session_events(func.count()),
+        _session_events(func.max(StorageEvent.timestamp)),
+        # Read raw from the table columns: comparing stored values needs no
+        # decoding, and the mapped attributes keep ADK's DynamicJSON type,
+        # which has no cache key and would keep this out of the compiled cache
+        type_coerce(StorageAppState.__table__.c.state, Text).label("app_state"),
+        type_coerce(StorageUserState.__table__.c.state, Text).label("user_state"),
+    )
+    .select_from(StorageSession)
+    .outerjoin(
+        StorageSessionVersion,
+        and_(
+            StorageSessionVersion.app_name == StorageSession.app_name,
+            StorageSessionVersion.user_id == StorageSession.user_id,
+            StorageSessionVersion.session_id == StorageSession.id,
+        ),
+    )
+    .outerjoin(StorageAppState, StorageAppState.app_name == StorageSession.app_name)
+    .outerjoin(
+        StorageUserState,
+        and_(
+            StorageUserState.app_name == StorageSession.app_name,
+            StorageUserState.user_id == StorageSession.user_id,
+        ),
+    )
+    .where(
+        StorageSession.app_name == bindparam("key_app_name"),
+        StorageSession.user_id == bindparam("key_user_id"),
+        StorageSession.id == bindparam("key_session_id"),
+    )
+)
+
+_BUMP_VERSION = (
+    update(StorageSessionVersion)
+    .where(
+        StorageSessionVersion.app_name == bindparam("key_app_name"),
+        StorageSessionVersion.user_id == bindparam("key_user_id"),
+        StorageSessionVersion.session_id == bindparam("key_session_id"),
+    )
+    .values(version=StorageSessionVersion.version + 1)
+)
+
+_INSERT_VERSION = insert(StorageSessionVersion).values(
+    app_name=bindparam("key_app_name"),
+    user_id=bindparam("key_user_id"),
+    session_id=bindparam("key_session_id"),
+    version=1,
+)
+
+
+def session_key_params(key: SessionKey) -> Dict[str, str]:
+    app_name, user_id, session_id = key
+    return {
+        "key_app_name": app_name,
+        "key_user_id": user_id,
+        "key_session_id": session_id,
+    }
+
+
+def clone_session(session: Session) -> Session:
+    """Copy a session for handing out of the cache.
+
+    State is deep-copied because callers mutate it. Events are shared: once
+    appended they are never modified, so copying the list is enough.
+    """
+    return Session.model_construct(
+        id=session.id,
+        app_name=session.app_name,
+        user_id=session.user_id,
+        state=copy.deepcopy(session.state),
+        events=list(session.events),
+        last_update_time=session.last_update_time,
+    )
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Return the nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    index = max(
+        0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+class CachedDatabaseSessionService(DatabaseSessionService):
+    """DatabaseSessionService with an in-memory LRU session cache.
+
+    Args:
+        db_url: The database URL to connect to
+        max_sessions: Maximum number of sessions kept in memory
+        latency_window: Number of recent read latencies kept for percentiles
+        state_codecs: Optional map of app name to the StateCodec used to store
+            that app's state (see state_codec.py); other apps use plain JSON
+    """
+
+    def __init__(
+        self,
+        db_url: str,
+        max_sessions: int = 256,
+        latency_window: int = 10000,
+        state_codecs: Optional[Dict[str, StateCodec]] = None,
+    ):
+        # Always installed: reads detect the codec, and the default writes the
+        # same JSON text as the stock service
+        install_state_codecs()
+        self.state_codecs = state_codecs or {}
+        super().__init__(db_url=db_url)
+        _EVENTS_BY_SESSION.create(self.db_engine, checkfirst=True)
+        self._bump_versions_on_write(self.DatabaseSessionFactory)
+        self.max_sessions = max_sessions
+        self._entries: "OrderedDict[SessionKey, Tuple[Stamp, Session]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._read_latencies = deque(maxlen=latency_window)
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "evictions": 0,
+            "writes": 0,
+        }
+
+    # ===== Version stamps =====
+
+    def _read_stamp(self, db, key: SessionKey) -> Optional[Stamp]:
+        """Read the current version stamp of a session, or None if it is gone."""
+        row = db.execute(_STAMP_QUERY, session_key_params(key)).first()
+        return Stamp(*row) if row is not None else None
+
+    def _bump_versions_on_write(self, session_factory) -> None:
+        """Bump the write counter of every session a database session writes to.
+
+        Runs after each flush, in the same transaction, so the bump commits (or
+        rolls back) with the write. Covers the sessions and events added by
+        DatabaseSessionService itself.
+        """
+
+        def _after_flush(db, flush_context):
+            keys = set()
+            for obj in db.new:
+                if isinstance(obj, StorageEvent):
+                    keys.add((obj.app_name, obj.user_id, obj.session_id))
+                elif isinstance(obj, StorageSession):
+                    keys.add((obj.app_name, obj.user_id, obj.id))
+            # Core statements on the connection, so they don't flush again;
+            # new session ids are only assigned by the flush
+            connection = db.connection()
+            for key in keys:
+                params = session_key_params(key)
+                if connection.execute(_BUMP_VERSION, params).rowcount == 0:
+                    connection.execute(_INSERT_VERSION, params)
+
+        event.listen(session_factory, "after_flush", _after_flush)
+
+    def _commit_event(self, session: Session, event: Event) -> Optional[Stamp]:
+        """Write an event to the database and return the session's new stamp."""
+        super().append_event(session=session, event=event)
+        key = (session.app_name, session.user_id, session.id)
+        with self.DatabaseSessionFactory() as db:
+            return self._read_stamp(db, key)
+
+    def _load_session(
+        self, key: SessionKey, stamp: Stamp
+    ) -> Tuple[Optional[Session], Optional[Stamp]]:
+        """Load a session from the database after a cache miss.
+
+        The stamp was read first, so a concurrent write can only make the stored
+        stamp older than the data, which just forces another reload later.
+        """
+        app_name, user_id, session_id = key
+        session = super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        return session, stamp
+
+    def _session_loaded(self, session: Session, stamp: Stamp) -> None:
+        """Hook called with every session handed out, and the stamp it matches."""
+
+    # ===== Cache bookkeeping =====
+
+    def _store(self, key: SessionKey, stamp: Stamp, session: Session) -> None:
+        with self._lock:
+            self._entries[key] = (stamp, clone_session(session))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def _evict(self, key: SessionKey) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and read-latency percentiles (in ms)."""
+        with self._lock:
+            counters = dict(self._counters)
+            latencies = sorted(self._read_latencies)
+            size = len(self._entries)
+        reads = counters["hits"] + counters["misses"] + counters["invalidations"]
+        return {
+            **counters,
+            "reads": reads,
+            "hit_rate": counters["hits"] / reads if reads else 0.0,
+            "cached_sessions": size,
+            "read_latency_ms": {
+                "p50": percentile(latencies, 50) * 1000,
+                "p95": percentile(latencies, 95) * 1000,
+                "p99": percentile(latencies, 99) * 1000,
+            },
+        }
+
+    # ===== Session service API =====
+
+    def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        with use_codec(self.state_codecs.get(app_name)):
+            session = super().create_session(
+                app_name=app_name, user_id=user_id, state=state, session_id=session_id
+            )
+        key = (session.app_name, session.user_id, session.id)
+        with self.DatabaseSessionFactory() as db:
+            stamp = self._read_stamp(db, key)
+        if stamp is not None:
+            self._store(key, stamp, session)
+            self._session_loaded(session, stamp)
+        return session
+
+    def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        # Filtered reads are rare and return partial event lists, so skip the cache
+        if config is not None:
+            return super().get_session(
+                app_name=app_name, user_id=user_id, session_id=session_id, config=config
+            )
+
+        start = time.perf_counter()
+        key = (app_name, user_id, session_id)
+        try:
+            with self.DatabaseSessionFactory() as db:
+                stamp = self._read_stamp(db, key)
+            if stamp is None:
+                self._evict(key)
+                with self._lock:
+                    self._counters["misses"] += 1
+                return None
+
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == stamp:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    session = clone_session(entry[1])
+                else:
+                    session = None
+                    self._counters[
+                        "invalidations" if entry is not None else "misses"
+                    ] += 1
+
+            if session is None:
+                session, stamp = self._load_session(key, stamp)
+                if session is None or stamp is None:
+                    self._evict(key)
+                    return session
+                self._store(key, stamp, session)
+            self._session_loaded(session, stamp)
+            return session
+        finally:
+            self._read_latencies.append(time.perf_counter() - start)
+
+    def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+
+        key = (session.app_name, session.user_id, session.id)
+        with self._lock:
+            entry = self._entries.get(key)
+            self._counters["writes"] += 1
+        previous = entry[0] if entry is not None else None
+
+        with use_codec(self.state_codecs.get(session.app_name)):
+            stamp = self._commit_event(session, event)
+
+        # Only write through when nobody else touched the session in between:
+        # our own write bumps the counter and adds an event exactly once, and
+        # sets update_time
+        if (
+            stamp is not None
+            and previous is not None
+            and previous.version is not None
+            and stamp.version == previous.version + 1
+            and stamp.event_count == previous.event_count + 1
+            and stamp.update_time.timestamp() == session.last_update_time
+        ):
+            self._store(key, stamp, session)
+        else:
+            self._evict(key)
+        return event
+
+    def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        super().delete_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        with self.DatabaseSessionFactory() as db:
+            db.execute(
+                delete(StorageSessionVersion).where(
+                    StorageSessionVersion.app_name == app_name,
+                    StorageSessionVersion.user_id == user_id,
+                    StorageSessionVersion.session_id == session_id,
+                )
+            )
+            db.commit()
+        self._evict((app_name, user_id, session_id))
@@ -0,0 +1,199 @@
+"""
+State Codecs
+
+This module makes the serialization of session, user and app state pluggable.
+DatabaseSessionService stores state as JSON text (json.dumps/json.loads) on every
+commit and load. A StateCodec can replace that with a faster encoding:
+
+- json:    the stock format, plain JSON text
+- orjson:  the same JSON text, produced and parsed by orjson (much faster)
+- msgpack: a compact binary encoding
+- any of the above compressed with zstd (or zlib, which needs no extra package)
+
+Binary payloads start with a one-byte header naming the codec, so reading never
+depends on configuration: rows written as JSON text by the stock service, or by
+another codec, always decode correctly. JSON and orjson rows stay plain text, so
+the stock DatabaseSessionService can read them too.
+
+orjson, msgpack and zstandard are optional dependencies:
+    pip install orjson msgpack zstandard
+"""
+
+import json
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from google.adk.sessions.database_session_service import (
+    DynamicJSON,
+    StorageAppState,
+    StorageSession,
+    StorageUserState,
+)
+from sqlalchemy.orm import configure_mappers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Header byte of binary payloads: low bits pick the encoding, high bits the
+# compression. JSON text rows have no header (they always start with "{").
+_FORMAT_JSON = 0x01
+_FORMAT_MSGPACK = 0x02
+_COMPRESSION_ZLIB = 0x40
+_COMPRESSION_ZSTD = 0x80
+_FORMAT_MASK = 0x0F
+
+
+class StateCodec:
+    """Encodes a state dict for storage and decodes it again.
+
+    Args:
+        encoding: "json", "orjson" or "msgpack"
+        compression: None, "zstd" or "zlib"
+        level: Compression level
+    """
+
+    def __init__(
+        self,
+        encoding: str = "json",
+        compression: Optional[str] = None,
+        level: int = 3,
+    ):
+        if encoding not in ("json", "orjson", "msgpack"):
+            raise ValueError(f"Unknown state encoding: {encoding}")
+        if compression not in (None, "zstd", "zlib"):
+            raise ValueError(f"Unknown state compression: {compression}")
+        if encoding == "orjson" and orjson is None:
+            raise ValueError("The orjson codec requires: pip install orjson")
+        if encoding == "msgpack" and msgpack is None:
+            raise ValueError("The msgpack codec requires: pip install msgpack")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires: pip install zstandard")
+
+        self.encoding = encoding
+        self.compression = compression
+        self.level = level
+        self.name = encoding + (f"+{compression}" if compression else "")
+
+        if compression == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=level)
+
+    def encode(self, value: Dict[str, Any]):
+        """Encode a state dict as JSON text (str) or a binary payload (bytes)."""
+        if self.encoding == "msgpack":
+            data = msgpack.packb(value, use_bin_type=True)
+            fmt = _FORMAT_MSGPACK
+        elif self.encoding == "orjson":
+            data = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+            fmt = _FORMAT_JSON
+        else:
+            data = json.dumps(value).encode("utf-8")
+            fmt = _FORMAT_JSON
+
+        if self.compression == "zstd":
+            return bytes([fmt | _COMPRESSION_ZSTD]) + self._compressor.compress(data)
+        if self.compression == "zlib":
+            return bytes([fmt | _COMPRESSION_ZLIB]) + zlib.compress(data, self.level)
+        if fmt == _FORMAT_JSON:
+            # Keep uncompressed JSON as text so the stock service can read it
+            return data.decode("utf-8")
+        return bytes([fmt]) + data
+
+    def __repr__(self):
+        return f"StateCodec({self.name!r})"
+
+
+def _loads_json(data) -> Dict[str, Any]:
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # Stock json.dumps writes NaN and Infinity, which orjson rejects
+            pass
+    return json.loads(data)
+
+
+def decode_state(stored) -> Dict[str, Any]:
+    """Decode a stored state value written by any codec or by the stock service."""
+    if isinstance(stored, str):
+        return _loads_json(stored)
+
+    stored = bytes(stored)
+    header, data = stored[0], stored[1:]
+    if header == ord("{"):
+        # JSON text that the database handed back as bytes
+        data = stored
+    elif header & _COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise ValueError("State was stored with zstd: pip install zstandard")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif header & _COMPRESSION_ZLIB:
+        data = zlib.decompress(data)
+
+    if header != ord("{") and header & _FORMAT_MASK == _FORMAT_MSGPACK:
+        if msgpack is None:
+            raise ValueError("State was stored with msgpack: pip install msgpack")
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    return _loads_json(data)
+
+
+# The codec used for writes in the current context; reads detect it themselves
+DEFAULT_CODEC = StateCodec("json")
+_active_codec: ContextVar[StateCodec] = ContextVar("state_codec", default=DEFAULT_CODEC)
+
+
+@contextmanager
+def use_codec(codec: Optional[StateCodec]):
+    """Encode state written inside this block with the given codec."""
+    token = _active_codec.set(codec or DEFAULT_CODEC)
+    try:
+        yield
+    finally:
+        _active_codec.reset(token)
+
+
+class CodecJSON(DynamicJSON):
+    """DynamicJSON column type that encodes with the active StateCodec."""
+
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            # JSONB columns keep their native encoding
+            return super().process_bind_param(value, dialect)
+        return _active_codec.get().encode(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return super().process_result_value(value, dialect)
+        return decode_state(value)
+
+
+def install_state_codecs() -> None:
+    """Switch the session, user and app state columns over to CodecJSON.
+
+    This changes the column types on ADK's own tables, which are module-level
+    globals: every DatabaseSessionService in the process, including stock ones,
+    reads and writes state through CodecJSON afterwards. Without a codec in
+    use_codec() that is plain JSON, as before. Call this before the first database session service is created. Mutation
+    tracking is set up per mapped attribute when the mappers are configured, so
+    configure them first and only then swap the column types.
+    """
+    configure_mappers()
+    for table in (StorageSession, StorageAppState, StorageUserState):
+        column = table.__table__.c.state
+        if not isinstance(column.type, CodecJSON):
+            column.type = CodecJSON()
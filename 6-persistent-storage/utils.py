@@ -1,3 +1,7 @@
+import sys
+import time
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.genai import types
 
 
@@ -58,8 +62,106 @@ def display_state(
         print(f"Error displaying state: {e}")
 
 
-async def process_agent_response(event):
-    """Process and display agent response events."""
+def display_cache_stats(session_service):
+    """Display session cache hit rates and read latencies, if the service has a cache."""
+    if not hasattr(session_service, "stats"):
+        return
+
+    stats = session_service.stats()
+    latency = stats["read_latency_ms"]
+    print(f"\n{'-' * 10} Session Cache {'-' * 10}")
+    print(
+        f"📖 Reads: {stats['reads']} (hits: {stats['hits']}, misses: {stats['misses']}, "
+        f"invalidated: {stats['invalidations']})"
+    )
+    print(f"🎯 Hit rate: {stats['hit_rate']:.1%}")
+    print(
+        f"⏱️  Read latency: p50 {latency['p50']:.2f} ms, p95 {latency['p95']:.2f} ms, "
+        f"p99 {latency['p99']:.2f} ms"
+    )
+    print("-" * 35)
+
+
+class ResponseStream:
+    """Renders streamed text deltas and times one agent call.
+
+    Time to first token is measured from the start of the call to the first
+    text the user sees, separately from the total latency of the call.
+    """
+
+    def __init__(self, write=None):
+        self.write = write or _write_stdout
+        self.author = None
+        self.started_at = time.perf_counter()
+        self.first_token_s = None
+        self.total_s = None
+
+    @property
+    def is_open(self):
+        return self.author is not None
+
+    def mark_first_token(self):
+        if self.first_token_s is None:
+            self.first_token_s = time.perf_counter() - self.started_at
+
+    def add_delta(self, author, text):
+        """Print a chunk of a partial response as soon as it arrives."""
+        if self.author != author:
+            self.close()
+            self.write(
+                f"\n{Colors.BG_BLUE}{Colors.WHITE}{Colors.BOLD}╔══ AGENT RESPONSE ({author}) ═════════════════════════════{Colors.RESET}\n"
+            )
+            self.author = author
+        self.mark_first_token()
+        self.write(f"{Colors.CYAN}{Colors.BOLD}{text}{Colors.RESET}")
+
+    def close(self):
+        """End the response currently being streamed, if any."""
+        if not self.is_open:
+            return
+        self.write(
+            f"\n{Colors.BG_BLUE}{Colors.WHITE}{Colors.BOLD}╚═════════════════════════════════════════════════════════════{Colors.RESET}\n\n"
+        )
+        self.author = None
+
+    def finish(self):
+        self.close()
+        self.total_s = time.perf_counter() - self.started_at
+
+
+def _write_stdout(text):
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def display_response_timing(response_stream):
+    """Display time to first token and total latency of an agent call."""
+    first_token = (
+        f"{response_stream.first_token_s:.2f}s"
+        if response_stream.first_token_s is not None
+        else "n/a"
+    )
+    print(f"⏱️  First token: {first_token}, total: {response_stream.total_s:.2f}s")
+
+
+async def process_agent_response(event, response_stream=None):
+    """Process and display agent response events.
+
+    Partial events (streaming mode) are rendered as text deltas through
+    response_stream; the final event that follows them is not printed again.
+    """
+    # Render streamed text as it arrives
+    if event.partial:
+        if response_stream and event.content and event.content.parts:
+            for part in event.content.parts:
+                if part.text:
+                    response_stream.add_delta(event.author, part.text)
+        return None
+
+    streamed = response_stream is not None and response_stream.author == event.author
+    if response_stream:
+        response_stream.close()
+
     # Log basic event info
     print(f"Event ID: {event.id}, Author: {event.author}")
 
@@ -84,7 +186,12 @@ async def process_agent_response(event):
                 print(f"  Tool Response: {part.tool_response.output}")
                 has_specific_part = True
             # Also print any text parts found in any event for debugging
-            elif hasattr(part, "text") and part.text and not part.text.isspace():
+            elif (
+                hasattr(part, "text")
+                and part.text
+                and not part.text.isspace()
+                and not streamed
+            ):
                 print(f"  Text: '{part.text.strip()}'")
 
     # Check for final response after specific parts
@@ -97,6 +204,11 @@ async def process_agent_response(event):
             and event.content.parts[0].text
         ):
             final_response = event.content.parts[0].text.strip()
+            if streamed:
+                # Already rendered delta by delta
+                return final_response
+            if response_stream:
+                response_stream.mark_first_token()
             # Use colors and formatting to make the final response stand out
             print(
                 f"\n{Colors.BG_BLUE}{Colors.WHITE}{Colors.BOLD}╔══ AGENT RESPONSE ═════════════════════════════════════════{Colors.RESET}"
@@ -113,8 +225,15 @@ async def process_agent_response(event):
     return final_response
 
 
-async def call_agent_async(runner, user_id, session_id, query):
-    """Call the agent asynchronously with the user's query."""
+async def call_agent_async(
+    runner, user_id, session_id, query, stream=False, console=None
+):
+    """Call the agent asynchronously with the user's query.
+
+    Args:
+        stream: Stream the response, printing text as the model generates it
+        console: An AsyncConsole to write streamed text through (optional)
+    """
     content = types.Content(role="user", parts=[types.Part(text=query)])
     print(
         f"\n{Colors.BG_GREEN}{Colors.BLACK}{Colors.BOLD}--- Running Query: {query} ---{Colors.RESET}"
@@ -130,16 +249,26 @@ async def call_agent_async(runner, user_id, session_id, query):
         "State BEFORE processing",
     )
 
+    run_config = RunConfig(
+        streaming_mode=StreamingMode.SSE if stream else StreamingMode.NONE
+    )
+    response_stream = ResponseStream(write=console.write if console else None)
+
     try:
         async for event in runner.run_async(
-            user_id=user_id, session_id=session_id, new_message=content
+            user_id=user_id,
+            session_id=session_id,
+            new_message=content,
+            run_config=run_config,
         ):
             # Process each event and get the final response if available
-            response = await process_agent_response(event)
+            response = await process_agent_response(event, response_stream)
             if response:
                 final_response_text = response
     except Exception as e:
         print(f"Error during agent call: {e}")
+    response_stream.finish()
+    display_response_timing(response_stream)
 
     # Display state after processing the message
     display_state(
@@ -0,0 +1,347 @@
+"""
+Multi-Worker Session Service
+
+This module provides a session service for running several worker processes
+(uvicorn/gunicorn-style) against the same SQLite database file.
+
+It builds on CachedDatabaseSessionService and adds:
+- A pooled engine with WAL journaling and a busy timeout, so readers never
+  block writers and short write bursts wait instead of failing
+- Writes in a single BEGIN IMMEDIATE transaction, so a worker takes the write
+  lock up front instead of failing halfway through with "database is locked"
+- Optimistic concurrency on session versions: a write made from a session copy
+  that another worker (or a stock DatabaseSessionService) has since updated
+  raises SessionVersionConflictError
+- Bounded, jittered retries when the database stays locked past the busy timeout,
+  for every write (creating and deleting sessions, appending events)
+"""
+
+import base64
+import random
+import threading
+import time
+import weakref
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, DatabaseSessionService, Session
+from google.adk.sessions.database_session_service import (
+    StorageAppState,
+    StorageEvent,
+    StorageSession,
+    StorageUserState,
+)
+from google.adk.sessions.state import State
+from session_cache import CachedDatabaseSessionService, SessionKey, Stamp
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+# What a session copy was read at: the write counter and the number of events.
+# The event count also moves on writes by a stock DatabaseSessionService.
+Version = Tuple[int, int]
+
+
+def _version(stamp: Stamp) -> Version:
+    return (stamp.version or 0, stamp.event_count)
+
+
+class SessionVersionConflictError(ValueError):
+    """Raised when a session was updated by another worker since it was read."""
+
+
+T = TypeVar("T")
+
+
+def _split_state_delta(
+    state_delta: Dict[str, Any],
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Split a state delta into app, user and session deltas.
+
+    Prefixes are stripped from app and user keys the way DatabaseSessionService
+    stores them; temp keys are never persisted.
+    """
+    app_delta, user_delta, session_delta = {}, {}, {}
+    for key, value in state_delta.items():
+        if key.startswith(State.APP_PREFIX):
+            app_delta[key[len(State.APP_PREFIX) :]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_delta[key[len(State.USER_PREFIX) :]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_delta[key] = value
+    return app_delta, user_delta, session_delta
+
+
+def _is_locked_error(error: OperationalError) -> bool:
+    message = str(error.orig).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+class MultiWorkerSessionService(CachedDatabaseSessionService):
+    """Session service that can be shared by several worker processes.
+
+    Create one instance per process, after forking: engines and their pooled
+    connections must not be shared across processes.
+
+    Args:
+        db_url: The database URL to connect to
+        pool_size: Number of pooled connections kept open per process
+        max_overflow: Extra connections allowed above pool_size under load
+        busy_timeout_ms: How long SQLite waits for a lock before giving up
+        max_retries: Retries for a write that still finds the database locked
+        retry_backoff: Base delay in seconds for the exponential retry backoff
+        **cache_options: Passed on to CachedDatabaseSessionService
+    """
+
+    def __init__(
+        self,
+        db_url: str,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        busy_timeout_ms: int = 5000,
+        max_retries: int = 5,
+        retry_backoff: float = 0.02,
+        **cache_options,
+    ):
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        # Several workers starting at once can race on CREATE TABLE
+        for attempt in range(max_retries + 1):
+            try:
+                super().__init__(db_url=db_url, **cache_options)
+                break
+            except OperationalError:
+                if attempt == max_retries:
+                    raise
+                self._sleep_before_retry(attempt)
+
+        # Replace the default engine with a pooled, lock-aware one
+        self.db_engine.dispose()
+        self.db_engine = self._create_engine(
+            db_url, pool_size, max_overflow, busy_timeout_ms
+        )
+        self.DatabaseSessionFactory = sessionmaker(bind=self.db_engine)
+        self._bump_versions_on_write(self.DatabaseSessionFactory)
+
+        # Version of the stored session each handed-out copy was read at
+        self._versions: Dict[int, Tuple[weakref.ref, Version]] = {}
+        self._versions_lock = threading.Lock()
+        self._counters.update({"conflicts": 0, "lock_retries": 0})
+
+    @staticmethod
+    def _create_engine(db_url, pool_size, max_overflow, busy_timeout_ms):
+        if not db_url.startswith("sqlite"):
+            return create_engine(
+                db_url,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_pre_ping=True,
+            )
+
+        engine = create_engine(
+            db_url,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            connect_args={
+                "timeout": busy_timeout_ms / 1000,
+                "check_same_thread": False,
+            },
+        )
+
+        @event.listens_for(engine, "connect")
+        def _configure_connection(dbapi_connection, _):
+            # Let SQLAlchemy emit BEGIN itself, so writes can ask for IMMEDIATE
+            dbapi_connection.isolation_level = None
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+
+        @event.listens_for(engine, "begin")
+        def _begin(connection):
+            mode = connection.get_execution_options().get("sqlite_begin", "DEFERRED")
+            connection.exec_driver_sql(f"BEGIN {mode}")
+
+        return engine
+
+    def _sleep_before_retry(self, attempt: int) -> None:
+        delay = self.retry_backoff * (2**attempt)
+        time.sleep(delay * random.uniform(0.5, 1.5))
+
+    def _retry_locked(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run a write, retrying with backoff while the database stays locked.
+
+        Each attempt must be its own transaction, so a failed one has left
+        nothing behind.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as e:
+                if not _is_locked_error(e) or attempt == self.max_retries:
+                    raise
+                with self._lock:
+                    self._counters["lock_retries"] += 1
+                self._sleep_before_retry(attempt)
+
+    # ===== Session versions =====
+
+    def _remember_version(self, session: Session, version: Version) -> None:
+        session_ref = id(session)
+
+        def _forget(_):
+            with self._versions_lock:
+                self._versions.pop(session_ref, None)
+
+        with self._versions_lock:
+            self._versions[session_ref] = (weakref.ref(session, _forget), version)
+
+    def _version_of(self, session: Session) -> Optional[Version]:
+        with self._versions_lock:
+            entry = self._versions.get(id(session))
+        if entry is None or entry[0]() is not session:
+            return None
+        return entry[1]
+
+    def _session_loaded(self, session: Session, stamp: Stamp) -> None:
+        self._remember_version(session, _version(stamp))
+
+    def _load_session(
+        self, key: SessionKey, stamp: Stamp
+    ) -> Tuple[Optional[Session], Optional[Stamp]]:
+        # Re-check the stamp after loading so the remembered version matches
+        # the data; another worker may have written in between
+        app_name, user_id, session_id = key
+        for _ in range(self.max_retries + 1):
+            session = DatabaseSessionService.get_session(
+                self, app_name=app_name, user_id=user_id, session_id=session_id
+            )
+            with self.DatabaseSessionFactory() as db:
+                after = self._read_stamp(db, key)
+            if session is None or after == stamp:
+                return session, after
+            stamp = after
+        return session, None
+
+    # ===== Writes =====
+
+    def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        return self._retry_locked(
+            super().create_session,
+            app_name=app_name,
+            user_id=user_id,
+            state=state,
+            session_id=session_id,
+        )
+
+    def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        # Deleting is idempotent, so a retry after a partial delete is safe
+        self._retry_locked(
+            super().delete_session,
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+        )
+
+    def _commit_event(self, session: Session, event: Event) -> Optional[Stamp]:
+        return self._retry_locked(self._commit_event_once, session, event)
+
+    def _commit_event_once(self, session: Session, event: Event) -> Optional[Stamp]:
+        """Check the session version and store the event in one transaction."""
+        key = (session.app_name, session.user_id, session.id)
+        with self.DatabaseSessionFactory() as db:
+            # Take the write lock before reading, so the version can't move
+            db.connection(execution_options={"sqlite_begin": "IMMEDIATE"})
+
+            current = self._read_stamp(db, key)
+            if current is None:
+                raise ValueError(f"Session not found: {session.id}")
+            current_version = _version(current)
+            expected_version = self._version_of(session)
+            if expected_version is not None and current_version != expected_version:
+                with self._lock:
+                    self._counters["conflicts"] += 1
+                self._evict(key)
+                raise SessionVersionConflictError(
+                    f"Session {session.id} is at version {current_version} (writes,"
+                    f" events), but this copy was read at version {expected_version}."
+                    " Reload the session and try again."
+                )
+
+            storage_session = db.get(StorageSession, key)
+            storage_app_state = db.get(StorageAppState, (session.app_name))
+            storage_user_state = db.get(
+                StorageUserState, (session.app_name, session.user_id)
+            )
+
+            # Apply the state delta the same way DatabaseSessionService does
+            app_state_delta, user_state_delta, session_state_delta = (
+                _split_state_delta(event.actions.state_delta)
+                if event.actions and event.actions.state_delta
+                else ({}, {}, {})
+            )
+            if storage_app_state and app_state_delta:
+                storage_app_state.state = {**storage_app_state.state, **app_state_delta}
+            if storage_user_state and user_state_delta:
+                storage_user_state.state = {
+                    **storage_user_state.state,
+                    **user_state_delta,
+                }
+            if session_state_delta:
+                storage_session.state = {**storage_session.state, **session_state_delta}
+
+            storage_event = StorageEvent(
+                id=event.id,
+                invocation_id=event.invocation_id,
+                author=event.author,
+                branch=event.branch,
+                actions=event.actions,
+                session_id=session.id,
+                app_name=session.app_name,
+                user_id=session.user_id,
+                timestamp=datetime.fromtimestamp(event.timestamp),
+                long_running_tool_ids=event.long_running_tool_ids,
+                grounding_metadata=event.grounding_metadata,
+                partial=event.partial,
+                turn_complete=event.turn_complete,
+                error_code=event.error_code,
+                error_message=event.error_message,
+                interrupted=event.interrupted,
+            )
+            if event.content:
+                encoded_content = event.content.model_dump(exclude_none=True)
+                for part in encoded_content.get("parts", []):
+                    if "inline_data" in part:
+                        # A one-element list: DatabaseSessionService's
+                        # _decode_content reads data[0], so a plain string
+                        # would come back as its first character
+                        part["inline_data"]["data"] = [
+                            base64.b64encode(part["inline_data"]["data"]).decode(
+                                "utf-8"
+                            )
+                        ]
+                storage_event.content = encoded_content
+            # Committing bumps the write counter too (see _bump_versions_on_write)
+            db.add(storage_event)
+            db.commit()
+
+            db.refresh(storage_session)
+            session.last_update_time = storage_session.update_time.timestamp()
+            stamp = self._read_stamp(db, key)
+
+        # Update the caller's copy and remember the version it now matches
+        BaseSessionService.append_event(self, session=session, event=event)
+        self._remember_version(
+            session, (current_version[0] + 1, current_version[1] + 1)
+        )
+        return stamp
@@ -0,0 +1,189 @@
+"""
+Event Storage Benchmark
+
+Builds the events of many simulated customer service conversations and
+measures, with tracemalloc, the bytes per event held by:
+
+- Stock Event objects, as InMemorySessionService stores them
+- CompactEventLog records with every payload uncompressed
+- CompactEventLog records after compress_cold(), which leaves only the most
+  recent events of each session uncompressed
+
+It also checks that every compact record turns back into an identical Event.
+
+Usage:
+    python benchmark_event_storage.py [--sessions 2000] [--turns 10]
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from compact_events import CompactEventLog
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+QUESTIONS = [
+    "What's your refund policy?",
+    "I want to buy the AI Marketing Platform course",
+    "How do I deploy the app from section 4?",
+    "Which courses do I own?",
+    "Thanks!",
+]
+
+ANSWERS = {
+    "policy_agent": "Refunds are available within 30 days of purchase, no questions asked. "
+    "Reply with 'refund' and the course name if you would like one.",
+    "sales_agent": "Great choice! The AI Marketing Platform course is $149 and includes "
+    "lifetime access, source code and six weeks of community support.",
+    "course_support": "Section 4 covers deployment. Build the Docker image, push it to "
+    "your registry and follow the Cloud Run steps in the lesson notes.",
+    "order_agent": "You own the AI Marketing Platform course, purchased on 2025-04-21.",
+    "customer_service": "You're welcome! Let me know if there's anything else.",
+}
+
+
+def conversation(user_index, turns):
+    """Yield the events of one simulated conversation."""
+    for turn in range(turns):
+        invocation_id = f"e-{user_index}-{turn}"
+        question = random.choice(QUESTIONS)
+        agent = random.choice(list(ANSWERS))
+        timestamp = time.time() - random.uniform(0, 30 * 86400)
+        yield Event(
+            invocation_id=invocation_id,
+            author="user",
+            content=types.Content(role="user", parts=[types.Part(text=question)]),
+            timestamp=timestamp,
+        )
+        yield Event(
+            invocation_id=invocation_id,
+            author="user",
+            custom_metadata={
+                "state_append": {
+                    "key": "interaction_history",
+                    "item": {
+                        "action": "user_query",
+                        "query": question,
+                        "timestamp": time.strftime(
+                            "%Y-%m-%d %H:%M:%S", time.localtime(timestamp)
+                        ),
+                    },
+                    "max_length": 20,
+                }
+            },
+            timestamp=timestamp,
+        )
+        yield Event(
+            invocation_id=invocation_id,
+            author="customer_service",
+            content=types.Content(
+                role="model",
+                parts=[
+                    types.Part(
+                        function_call=types.FunctionCall(
+                            name="transfer_to_agent", args={"agent_name": agent}
+                        )
+                    )
+                ],
+            ),
+            timestamp=timestamp,
+        )
+        yield Event(
+            invocation_id=invocation_id,
+            author="customer_service",
+            content=types.Content(
+                role="user",
+                parts=[
+                    types.Part(
+                        function_response=types.FunctionResponse(
+                            name="transfer_to_agent", response={}
+                        )
+                    )
+                ],
+            ),
+            actions=EventActions(transfer_to_agent=agent),
+            timestamp=timestamp,
+        )
+        yield Event(
+            invocation_id=invocation_id,
+            author=agent,
+            content=types.Content(
+                role="model", parts=[types.Part(text=ANSWERS[agent])]
+            ),
+            actions=EventActions(
+                state_delta={"interaction_rollup": {"total_interactions": turn}}
+            ),
+            timestamp=timestamp,
+        )
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=2_000)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--hot-events", type=int, default=8)
+    args = parser.parse_args()
+
+    random.seed(0)
+    sessions = [list(conversation(i, args.turns)) for i in range(args.sessions)]
+    events = sum(len(s) for s in sessions)
+
+    # Copies, so neither measurement counts objects the generator shares
+    stock, stock_bytes = measure(
+        lambda: [[event.model_copy(deep=True) for event in s] for s in sessions]
+    )
+
+    def build_logs():
+        logs = []
+        for session_events in sessions:
+            log = CompactEventLog(args.hot_events)
+            for event in session_events:
+                log.append(event)
+            logs.append(log)
+        return logs
+
+    logs, compact_bytes = measure(build_logs)
+    del logs
+
+    def build_compressed_logs():
+        logs = build_logs()
+        for log in logs:
+            log.compress_cold()
+        return logs
+
+    logs, compressed_bytes = measure(build_compressed_logs)
+    cold = sum(1 for log in logs for record in log.events if record.compressed)
+
+    started = time.perf_counter()
+    restored = [log.to_events() for log in logs]
+    restore_us = (time.perf_counter() - started) / events * 1e6
+    assert restored == stock, "compact events did not round-trip"
+
+    print(f"{args.sessions:,} sessions, {events:,} events ({cold:,} cold)")
+    for name, used in (
+        ("Stock Event objects", stock_bytes),
+        ("Compact records", compact_bytes),
+        ("Compact, cold compressed", compressed_bytes),
+    ):
+        print(
+            f"  {name:<26} {used / 2**20:7.1f} MiB  {used / events:7,.0f} B/event"
+            f"  ({stock_bytes / used:4.1f}x smaller)"
+        )
+    print(f"  Rebuilding events: {restore_us:.1f} µs/event")
+
+
+if __name__ == "__main__":
+    main()
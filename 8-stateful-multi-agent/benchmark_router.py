@@ -0,0 +1,140 @@
+"""
+Intent Router Replay Benchmark
+
+Replays labelled customer messages through the local intent router and reports:
+
+- Coverage: the share of messages routed without the root agent's model call
+- Accuracy of the local decisions
+- Fallbacks to the model, by reason, and how many of them were messages for a
+  specialist (a model call the router could have saved) rather than for the
+  root agent itself (where falling back is the right outcome)
+- Router latency, and the model latency and cost saved
+
+None of these messages are in the router's training examples. The replay
+assumes a user who owns the course, so course_support is allowed. Model latency
+and token price are estimates; pass your own with --llm-latency-ms and
+--price-per-million-tokens.
+
+Usage:
+    python benchmark_router.py [--replay traffic.jsonl] [--repeat 20]
+"""
+
+import argparse
+import time
+
+from customer_service_agent.agent import customer_service_agent
+from customer_service_agent.router import ROOT_LABEL, load_examples, router
+
+# Held-out messages, labelled with the agent that should answer them
+REPLAY_TRAFFIC = [
+    ("Can you tell me your refund policy?", "policy_agent"),
+    ("Are there any rules for posting in the community?", "policy_agent"),
+    ("Is sharing my login with coworkers allowed?", "policy_agent"),
+    ("What's your stance on promoting my own products in the group?", "policy_agent"),
+    ("How do you use my data?", "policy_agent"),
+    ("How much is the marketing platform course?", "sales_agent"),
+    ("I want to buy it", "sales_agent"),
+    ("What will I learn if I enroll?", "sales_agent"),
+    ("Is the course on sale right now?", "sales_agent"),
+    ("I'd like to purchase the AI marketing course today", "sales_agent"),
+    ("Does the purchase include coaching calls?", "sales_agent"),
+    ("I'm stuck setting up the database in section 4", "course_support"),
+    ("Where do I find the code for the API lesson?", "course_support"),
+    ("Can you explain the module on vector search?", "course_support"),
+    ("The video for the auth chapter won't load", "course_support"),
+    ("What's the best order to go through the course material?", "course_support"),
+    ("My project from the course crashes when I deploy it", "course_support"),
+    ("Please refund my course", "order_agent"),
+    ("I want my money back", "order_agent"),
+    ("Which courses do I own?", "order_agent"),
+    ("When did I purchase the AI marketing platform?", "order_agent"),
+    ("Show me my orders", "order_agent"),
+    ("Can I return the course I bought last week?", "order_agent"),
+    ("Hey!", ROOT_LABEL),
+    ("Thanks, that's all", ROOT_LABEL),
+    ("What can you do?", ROOT_LABEL),
+    ("Good evening", ROOT_LABEL),
+    ("I need some help", ROOT_LABEL),
+    ("I bought the course but the refund policy confuses me", ROOT_LABEL),
+]
+
+
+def replay(traffic, repeat):
+    results = []
+    for text, label in traffic:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            route, method, confidence = router.route(text)
+        elapsed_ms = (time.perf_counter() - started) / repeat * 1000
+        results.append((text, label, route, method, confidence, elapsed_ms))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--replay", help="JSONL file of logged {text, label} traffic to replay"
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--llm-latency-ms", type=float, default=700.0)
+    parser.add_argument("--price-per-million-tokens", type=float, default=0.10)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    traffic = load_examples(args.replay) if args.replay else REPLAY_TRAFFIC
+    results = replay(traffic, args.repeat)
+
+    routed = [r for r in results if r[2] is not None]
+    correct_routed = sum(1 for r in routed if r[2] == r[1])
+    fallbacks = [r for r in results if r[2] is None]
+    root_fallbacks = sum(1 for r in fallbacks if r[1] == ROOT_LABEL)
+    latencies = sorted(r[5] for r in results)
+
+    # The routing call sends at least the root instruction plus the message
+    instruction_tokens = len(customer_service_agent.instruction) / 4
+    saved_tokens = sum(instruction_tokens + len(r[0]) / 4 for r in routed)
+
+    if args.verbose:
+        for text, label, route, method, confidence, _ in results:
+            if route is None:
+                mark = "✓" if label == ROOT_LABEL else "→"
+            else:
+                mark = "✓" if route == label else "✗"
+            print(
+                f"{mark} {method:<10} {confidence:.2f} {str(route):<15}"
+                f" (expected {label:<16}) {text}"
+            )
+
+    print(f"\nReplayed {len(results)} messages")
+    print(f"  Routed locally:      {len(routed)} ({len(routed) / len(results):.0%})")
+    for method in ("rules", "classifier"):
+        count = sum(1 for r in routed if r[3] == method)
+        print(f"    by {method:<16} {count}")
+    print(
+        f"  Local accuracy:      {correct_routed}/{len(routed)}"
+        f" ({correct_routed / max(len(routed), 1):.0%})"
+    )
+    print(f"  Fell back to model:  {len(fallbacks)}")
+    for method in ("ambiguous", "fallback"):
+        count = sum(1 for r in fallbacks if r[3] == method)
+        print(f"    {'low confidence' if method == 'fallback' else method:<19} {count}")
+    print(
+        f"    for the root agent  {root_fallbacks}"
+        f"\n    for a specialist    {len(fallbacks) - root_fallbacks}"
+    )
+    print(
+        f"  Router latency:      p50 {latencies[len(latencies) // 2]:.3f} ms,"
+        f" max {latencies[-1]:.3f} ms"
+    )
+    print(
+        f"  Model calls saved:   {len(routed)}"
+        f" (~{len(routed) * args.llm_latency_ms / 1000:.1f} s of routing latency)"
+    )
+    print(
+        f"  Input tokens saved:  ~{saved_tokens:,.0f}"
+        f" (~${saved_tokens / 1e6 * args.price_per_million_tokens:.5f})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Session Store Memory Benchmark
+
+Creates many customer sessions, each with the example's initial state and a few
+recorded interactions, in AppendableSessionService (the store main.py used
+before) and in ShardedSessionService, with and without compact events, and
+reports:
+
+- Memory held by the sessions (measured with tracemalloc), next to the
+  serialized size the sharded store accounts for
+- Lookup latency (get_session on random sessions)
+- Memory after idle sessions are evicted to disk (sharded store only)
+- Snapshot size and time, and restore time, eager and lazy (sharded store only)
+
+Usage:
+    python benchmark_session_store.py [--sessions 10000 100000] [--interactions 5]
+"""
+
+import argparse
+import gc
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from customer_service_agent.history import (
+    HISTORY_WINDOW,
+    new_rollup,
+    rollup_state_entry,
+)
+from session_service import AppendableSessionService
+from sharded_session_service import ShardedSessionService
+
+APP_NAME = "Customer Support"
+
+
+def initial_state(user_index):
+    return {
+        "user_name": f"Customer {user_index}",
+        "purchased_courses": {},
+        "interaction_history": [],
+        "interaction_rollup": new_rollup(),
+    }
+
+
+def populate(service, sessions, interactions):
+    ids = []
+    for index in range(sessions):
+        user_id = f"user-{index}"
+        session = service.create_session(
+            app_name=APP_NAME, user_id=user_id, state=initial_state(index)
+        )
+        for turn in range(interactions):
+            entry = {
+                "action": "user_query",
+                "query": f"Question {turn} about the AI marketing platform",
+                "timestamp": "2025-04-21 10:30:00",
+            }
+            service.append_to_state_list(
+                app_name=APP_NAME,
+                user_id=user_id,
+                session_id=session.id,
+                key="interaction_history",
+                item=entry,
+                max_length=HISTORY_WINDOW,
+                on_append=rollup_state_entry,
+            )
+        ids.append((user_id, session.id))
+    return ids
+
+
+def measure_lookups(service, ids, lookups):
+    sample = [random.choice(ids) for _ in range(lookups)]
+    started = time.perf_counter()
+    for user_id, session_id in sample:
+        service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+    return (time.perf_counter() - started) / lookups * 1e6
+
+
+def run(name, make_service, sessions, interactions, lookups):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    service = make_service()
+    ids = populate(service, sessions, interactions)
+    build_s = time.perf_counter() - started
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0]
+
+    lookup_us = measure_lookups(service, ids, lookups)
+    print(
+        f"  {name:<25} {used / 2**20:8.1f} MiB"
+        f"  {used / sessions:8,.0f} B/session"
+        f"  build {build_s:6.2f} s  lookup {lookup_us:7.1f} µs"
+    )
+
+    if isinstance(service, ShardedSessionService):
+        accounted = service.stats()["resident_bytes"]
+        started = time.perf_counter()
+        spilled = service.evict_idle(0)
+        evict_s = time.perf_counter() - started
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+        cold_us = measure_lookups(service, ids, min(lookups, 200))
+        print(
+            f"  {'':<25} accounted {accounted / 2**20:.1f} MiB of state and events;"
+            f" evicting {spilled:,} idle sessions took {evict_s:.2f} s"
+            f" and left {after / 2**20:.1f} MiB, cold lookup {cold_us:.1f} µs"
+        )
+        service.evict_idle(0)
+        tracemalloc.stop()
+        measure_snapshot(service, sessions)
+        shutil.rmtree(service.spill_dir, ignore_errors=True)
+    else:
+        tracemalloc.stop()
+
+
+def measure_snapshot(service, sessions):
+    """Time a snapshot of the store, and eager and lazy restores from it."""
+    snapshot_dir = tempfile.mkdtemp(prefix="adk_snapshot_")
+    path = os.path.join(snapshot_dir, "sessions.snapshot")
+    started = time.perf_counter()
+    service.snapshot(path)
+    snapshot_s = time.perf_counter() - started
+    size = os.path.getsize(path)
+
+    timings = []
+    for lazy in (False, True):
+        restored = ShardedSessionService(
+            num_shards=service.num_shards, compact_events=service.compact_events
+        )
+        started = time.perf_counter()
+        count = restored.restore(path, lazy=lazy)
+        timings.append(time.perf_counter() - started)
+        assert count == sessions
+        shutil.rmtree(restored.spill_dir, ignore_errors=True)
+    shutil.rmtree(snapshot_dir, ignore_errors=True)
+    print(
+        f"  {'':<25} snapshot {size / 2**20:.1f} MiB in {snapshot_s:.2f} s;"
+        f" restore {timings[0]:.2f} s, lazy {timings[1]:.2f} s"
+        f" ({size / 2**20 / timings[1]:.0f} MiB/s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--interactions", type=int, default=5)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    parser.add_argument("--shards", type=int, default=64)
+    args = parser.parse_args()
+
+    for sessions in args.sessions:
+        print(f"\n{sessions:,} sessions, {args.interactions} interactions each")
+        run(
+            "AppendableSessionService",
+            AppendableSessionService,
+            sessions,
+            args.interactions,
+            args.lookups,
+        )
+        run(
+            "ShardedSessionService",
+            lambda: ShardedSessionService(num_shards=args.shards),
+            sessions,
+            args.interactions,
+            args.lookups,
+        )
+        run(
+            "Sharded, compact events",
+            lambda: ShardedSessionService(num_shards=args.shards, compact_events=True),
+            sessions,
+            args.interactions,
+            args.lookups,
+        )
+
+
+if __name__ == "__main__":
+    main()
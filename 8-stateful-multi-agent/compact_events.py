@@ -0,0 +1,207 @@
+"""
+Compact Event Storage
+
+A stored Event is a tree of pydantic and genai objects: the event, its actions,
+its content, each part, each state delta dict... Most of that memory is object
+overhead, and much of it repeats: every event of a session carries the same
+author names, every event of an invocation the same invocation id, and the same
+user messages and cached answers come back again and again.
+
+CompactEvent keeps an event as a slotted record instead:
+
+- id, invocation_id, author and timestamp as plain fields, with the strings
+  interned so each distinct name is stored once
+- everything else as one JSON payload (bytes). Identical payloads, such as a
+  repeated question or an answer served from the response cache, share one
+  bytes object through a bounded pool
+- cold payloads (events that are no longer among the most recent) can be
+  zlib-compressed, unless they are shared
+
+CompactEventLog holds a session's events this way and turns them back into
+Event objects when the session is read.
+"""
+
+import json
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+from typing import List, Optional
+
+from google.adk.events import Event
+
+# Fields kept on the record itself; everything else goes into the payload
+_RECORD_FIELDS = {"id", "invocation_id", "author", "timestamp"}
+
+# Payloads above this size are compressed when they go cold, if that saves space
+_MIN_COMPRESS_BYTES = 128
+
+
+class _PayloadPool:
+    """A bounded LRU pool that lets identical payloads share one bytes object."""
+
+    def __init__(self, max_entries: int = 4096, max_payload_bytes: int = 4096):
+        self.max_entries = max_entries
+        self.max_payload_bytes = max_payload_bytes
+        self._payloads: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def share(self, payload: bytes) -> bytes:
+        if len(payload) > self.max_payload_bytes:
+            return payload
+        with self._lock:
+            shared = self._payloads.get(payload)
+            if shared is not None:
+                self._payloads.move_to_end(payload)
+                return shared
+            self._payloads[payload] = payload
+            if len(self._payloads) > self.max_entries:
+                self._payloads.popitem(last=False)
+            return payload
+
+    def holds(self, payload: bytes) -> bool:
+        """Return whether this exact payload object is shared through the pool."""
+        with self._lock:
+            return self._payloads.get(payload) is payload
+
+
+payload_pool = _PayloadPool()
+
+
+class CompactEvent:
+    """An event stored as interned fields plus a (possibly compressed) payload."""
+
+    __slots__ = ("id", "invocation_id", "author", "timestamp", "payload", "compressed")
+
+    def __init__(
+        self,
+        id: str,
+        invocation_id: str,
+        author: str,
+        timestamp: float,
+        payload: bytes,
+        compressed: bool = False,
+    ):
+        self.id = id
+        self.invocation_id = invocation_id
+        self.author = author
+        self.timestamp = timestamp
+        self.payload = payload
+        self.compressed = compressed
+
+    @classmethod
+    def from_event(cls, event: Event) -> "CompactEvent":
+        payload = event.model_dump_json(
+            exclude=_RECORD_FIELDS, exclude_none=True, exclude_defaults=True
+        ).encode("utf-8")
+        return cls(
+            id=event.id,
+            invocation_id=sys.intern(event.invocation_id),
+            author=sys.intern(event.author),
+            timestamp=event.timestamp,
+            payload=payload_pool.share(payload),
+        )
+
+    def to_event(self) -> Event:
+        payload = zlib.decompress(self.payload) if self.compressed else self.payload
+        return Event.model_validate(
+            {
+                **json.loads(payload),
+                "id": self.id,
+                "invocation_id": self.invocation_id,
+                "author": self.author,
+                "timestamp": self.timestamp,
+            }
+        )
+
+    def compress(self) -> int:
+        """Compress the payload if that makes it smaller.
+
+        Payloads shared through the pool are left alone: compressing one would
+        replace a shared object with a private copy.
+
+        Returns:
+            The number of bytes saved
+        """
+        if self.compressed or len(self.payload) < _MIN_COMPRESS_BYTES:
+            return 0
+        if payload_pool.holds(self.payload):
+            return 0
+        compressed = zlib.compress(self.payload, 6)
+        saved = len(self.payload) - len(compressed)
+        if saved <= 0:
+            return 0
+        self.payload, self.compressed = compressed, True
+        return saved
+
+    @property
+    def size(self) -> int:
+        """Approximate bytes held by this event (record plus payload)."""
+        return sys.getsizeof(self) + sys.getsizeof(self.payload)
+
+
+class CompactEventLog:
+    """A session's events, stored as CompactEvent records.
+
+    Args:
+        hot_events: How many of the most recent events compress_cold() leaves
+            uncompressed
+    """
+
+    __slots__ = ("events", "hot_events", "_cold_from")
+
+    def __init__(self, hot_events: int = 8):
+        self.events: List[CompactEvent] = []
+        self.hot_events = hot_events
+        # Events before this index have already been compressed
+        self._cold_from = 0
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def append(self, event: Event) -> CompactEvent:
+        record = CompactEvent.from_event(event)
+        self.events.append(record)
+        return record
+
+    def to_events(
+        self,
+        num_recent_events: Optional[int] = None,
+        after_timestamp: Optional[float] = None,
+    ) -> List[Event]:
+        """Rebuild Event objects, optionally only the recent ones."""
+        records = self.events
+        if num_recent_events:
+            records = records[-num_recent_events:]
+        elif after_timestamp:
+            records = [r for r in records if r.timestamp >= after_timestamp]
+        return [record.to_event() for record in records]
+
+    def compress_cold(self) -> int:
+        """Compress the payloads of all but the hot_events most recent events.
+
+        Returns:
+            The number of bytes saved
+        """
+        end = len(self.events) - self.hot_events
+        saved = 0
+        for record in self.events[self._cold_from : max(end, 0)]:
+            saved += record.compress()
+        self._cold_from = max(self._cold_from, end)
+        return saved
+
+    def copy(self) -> "CompactEventLog":
+        """Copy the log; records are copied too, since compress_cold() changes them."""
+        log = CompactEventLog(self.hot_events)
+        log.events = [
+            CompactEvent(
+                r.id, r.invocation_id, r.author, r.timestamp, r.payload, r.compressed
+            )
+            for r in self.events
+        ]
+        log._cold_from = self._cold_from
+        return log
+
+    @property
+    def size(self) -> int:
+        return sys.getsizeof(self.events) + sum(r.size for r in self.events)
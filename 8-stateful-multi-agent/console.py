@@ -0,0 +1,80 @@
+"""
+Async Console
+
+This module provides a terminal front-end for the interactive runners that
+never blocks the event loop. Calling input() inside an async function freezes
+the loop until the user presses Enter, so nothing else (streamed output,
+background writes, timers) can run in the meantime.
+
+AsyncConsole reads stdin on a daemon thread and hands complete lines to the
+event loop through a queue.
+"""
+
+import asyncio
+import sys
+import threading
+from typing import Optional
+
+
+class AsyncConsole:
+    """Non-blocking line input and streaming output for asyncio programs.
+
+    Use it as an async context manager:
+
+        async with AsyncConsole() as console:
+            user_input = await console.read_line("You: ")
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lines: Optional[asyncio.Queue] = None
+        self._prompt: Optional[str] = None
+
+    async def __aenter__(self):
+        self._loop = asyncio.get_running_loop()
+        self._lines = asyncio.Queue()
+        # A daemon thread: a read still waiting for input never delays exit
+        threading.Thread(
+            target=self._read_stdin, name="console-stdin", daemon=True
+        ).start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        # The stdin thread is a daemon, so there is nothing to shut down
+        pass
+
+    def _read_stdin(self):
+        while True:
+            line = sys.stdin.readline()
+            if not line:
+                # EOF (Ctrl+D, or stdin closed)
+                self._loop.call_soon_threadsafe(self._lines.put_nowait, None)
+                return
+            self._loop.call_soon_threadsafe(self._lines.put_nowait, line.rstrip("\r\n"))
+
+    async def read_line(self, prompt: str = "") -> str:
+        """Show a prompt and wait for a line of input without blocking the loop.
+
+        Raises:
+            EOFError: If stdin was closed
+        """
+        self._prompt = prompt
+        self.write(prompt)
+        try:
+            line = await self._lines.get()
+        finally:
+            self._prompt = None
+        if line is None:
+            raise EOFError("stdin closed")
+        return line
+
+    def write(self, text: str) -> None:
+        """Write text immediately, e.g. a streamed chunk of an agent response.
+
+        If a prompt is waiting for input, output ending in a newline is followed
+        by the prompt again so the user can see where to type.
+        """
+        sys.stdout.write(text)
+        if self._prompt and text.endswith("\n"):
+            sys.stdout.write(self._prompt)
+        sys.stdout.flush()
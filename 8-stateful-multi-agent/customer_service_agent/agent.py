@@ -1,5 +1,6 @@
 from google.adk.agents import Agent
 
+from .router import log_model_route, route_before_model
 from .sub_agents.course_support_agent.agent import course_support_agent
 from .sub_agents.order_agent.agent import order_agent
 from .sub_agents.policy_agent.agent import policy_agent
@@ -23,8 +24,10 @@ customer_service_agent = Agent(
 
     2. State Management
        - Track user interactions in state['interaction_history']
+         - Only the most recent interactions are kept; state['interaction_rollup'] counts
+           every interaction by action and records the last purchase and refund
        - Monitor user's purchased courses in state['purchased_courses']
-         - Course information is stored as objects with "id" and "purchase_date" properties
+         - Course information is stored as a mapping from course id to an object with a "purchase_date" property
        - Use state to provide personalized responses
 
     **User Information:**
@@ -39,7 +42,8 @@ customer_service_agent = Agent(
 
     **Interaction History:**
     <interaction_history>
-    {interaction_history}
+    Recent interactions: {interaction_history}
+    Summary of all interactions: {interaction_rollup?}
     </interaction_history>
 
     You have access to the following specialized agents:
@@ -56,7 +60,7 @@ customer_service_agent = Agent(
     3. Course Support Agent
        - For questions about course content
        - Only available for courses the user has purchased
-       - Check if a course with id "ai_marketing_platform" exists in the purchased courses before directing here
+       - Check if "ai_marketing_platform" is a key of the purchased courses before directing here
 
     4. Order Agent
        - For checking purchase history and processing refunds
@@ -77,4 +81,7 @@ customer_service_agent = Agent(
     """,
     sub_agents=[policy_agent, sales_agent, course_support_agent, order_agent],
     tools=[],
+    # Route clear-cut messages locally, without a model call
+    before_model_callback=route_before_model,
+    after_model_callback=log_model_route,
 )
@@ -0,0 +1,67 @@
+"""
+Course ownership store.
+
+state['purchased_courses'] maps each owned course id to its purchase details:
+
+    {"ai_marketing_platform": {"purchase_date": "2025-04-21 10:30:00"}}
+
+Checking ownership is a dict lookup instead of a scan of a list of dicts.
+Adding or removing a course still copies the dict, which is O(owned courses):
+ADK only records a state change that is assigned, and earlier events' state
+deltas hold the previous dict, so it can't be changed in place. Users own a
+handful of courses, so the copy is cheap. Courses keep the order they were
+bought in, so the state serializes (and renders into instructions) the same
+way every time.
+
+State saved in the older list format, [{"id": ..., "purchase_date": ...}], is
+migrated the first time a tool writes to it; readers accept both formats.
+"""
+
+from typing import Any, Dict
+
+COURSES_KEY = "purchased_courses"
+
+
+def load_courses(value: Any) -> Dict[str, Dict[str, Any]]:
+    """Return purchased courses as a dict keyed by course id.
+
+    Accepts the current dict format as well as the older list of
+    {"id": ..., "purchase_date": ...} dicts (or plain course id strings).
+    """
+    if isinstance(value, dict):
+        return value
+    courses = {}
+    for course in value or []:
+        if isinstance(course, dict) and course.get("id"):
+            details = {k: v for k, v in course.items() if k != "id"}
+            courses[course["id"]] = details
+        elif isinstance(course, str) and course:
+            courses[course] = {}
+    return courses
+
+
+def add_course(state, course_id: str, purchase_date: str) -> bool:
+    """Record a purchase. Returns False if the course was already owned."""
+    courses = load_courses(state.get(COURSES_KEY))
+    if course_id in courses:
+        return False
+    courses = dict(courses)
+    courses[course_id] = {"purchase_date": purchase_date}
+    _save(state, courses)
+    return True
+
+
+def remove_course(state, course_id: str) -> bool:
+    """Remove a course, e.g. after a refund. Returns False if it wasn't owned."""
+    courses = load_courses(state.get(COURSES_KEY))
+    if course_id not in courses:
+        return False
+    courses = dict(courses)
+    del courses[course_id]
+    _save(state, courses)
+    return True
+
+
+def _save(state, courses: Dict[str, Dict[str, Any]]) -> None:
+    # Assigned, so the change is picked up as a state delta
+    state[COURSES_KEY] = courses
@@ -0,0 +1,110 @@
+"""
+Bounded interaction history.
+
+state['interaction_history'] keeps only the most recent HISTORY_WINDOW entries.
+Everything that matters about older entries is folded into
+state['interaction_rollup'] as each entry is recorded:
+
+    {
+        "total_interactions": 42,
+        "action_counts": {"user_query": 20, "agent_response": 20, ...},
+        "last_purchase": {"course_id": "...", "timestamp": "..."},
+        "last_refund": None,
+    }
+
+Both values are interpolated into the agent instructions, so the prompt stays
+the same size no matter how long the conversation has been going.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List
+
+HISTORY_WINDOW = 20
+
+HISTORY_KEY = "interaction_history"
+ROLLUP_KEY = "interaction_rollup"
+
+
+def new_rollup() -> Dict[str, Any]:
+    """Return an empty rollup."""
+    return {
+        "total_interactions": 0,
+        "action_counts": {},
+        "last_purchase": None,
+        "last_refund": None,
+    }
+
+
+def update_rollup(rollup: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    """Fold one history entry into a rollup, in place."""
+    action = entry.get("action", "interaction")
+    rollup["total_interactions"] = rollup.get("total_interactions", 0) + 1
+    action_counts = rollup.setdefault("action_counts", {})
+    action_counts[action] = action_counts.get(action, 0) + 1
+
+    if action == "purchase_course":
+        rollup["last_purchase"] = {
+            "course_id": entry.get("course_id"),
+            "timestamp": entry.get("timestamp"),
+        }
+    elif action == "refund_course":
+        rollup["last_refund"] = {
+            "course_id": entry.get("course_id"),
+            "timestamp": entry.get("timestamp"),
+        }
+
+
+def build_rollup(history: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build a rollup from a full history, for state saved before rollups existed."""
+    rollup = new_rollup()
+    for entry in history:
+        if isinstance(entry, dict):
+            update_rollup(rollup, entry)
+    return rollup
+
+
+def rollup_state_entry(state: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    """Fold an appended entry into the rollup stored in a state dict.
+
+    Matches the on_append hook of AppendableSessionService.append_to_state_list,
+    which calls it after the entry was appended to state['interaction_history'].
+    The rollup is replaced rather than changed in place, since earlier events'
+    state_delta can hold the same dict.
+    """
+    rollup = state.get(ROLLUP_KEY)
+    if not isinstance(rollup, dict):
+        # The history (entry included) has not been trimmed yet
+        state[ROLLUP_KEY] = build_rollup(state.get(HISTORY_KEY, []))
+    else:
+        rollup = dict(rollup)
+        rollup["action_counts"] = dict(rollup.get("action_counts", {}))
+        update_rollup(rollup, entry)
+        state[ROLLUP_KEY] = rollup
+
+
+def record_interaction(state, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Record an entry in the bounded history of a tool's state.
+
+    The window and the rollup are written back by assignment, so the change is
+    picked up as a state delta. Both are bounded in size, so this costs the same
+    however many interactions came before.
+
+    Args:
+        state: tool_context.state (or any dict-like state)
+        entry: A dictionary with an 'action' key
+
+    Returns:
+        The recorded entry
+    """
+    if "timestamp" not in entry:
+        entry["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    history: List[Dict[str, Any]] = list(state.get(HISTORY_KEY, []))
+    history.append(entry)
+    rollup = dict(state.get(ROLLUP_KEY) or build_rollup(history[:-1]))
+    rollup["action_counts"] = dict(rollup.get("action_counts", {}))
+    update_rollup(rollup, entry)
+
+    state[HISTORY_KEY] = history[-HISTORY_WINDOW:]
+    state[ROLLUP_KEY] = rollup
+    return entry
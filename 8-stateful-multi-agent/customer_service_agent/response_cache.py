@@ -0,0 +1,300 @@
+"""
+Response cache for agents that answer from fixed instruction text.
+
+policy_agent and course_support answer from their instructions (the refund
+policy, the course sections, ...), so the same question gets the same answer,
+yet each one costs a full model call. enable_response_cache() gives such an
+agent model callbacks that answer repeated questions from a cache.
+
+A cached answer is only reused within the same scope:
+
+- the agent,
+- a hash of its instruction template (editing the instruction starts afresh),
+- and the state inputs the answer depends on, e.g. whether the user owns the
+  course; each agent passes a function that extracts them from state
+
+Within a scope, questions match after normalization (case, punctuation,
+contractions, filler words) when the cosine similarity of their character
+3-grams reaches the threshold. Numbers must match exactly, so "section 3" never
+answers "section 4". Entries expire after a TTL, and the least recently used
+entries are evicted beyond max_entries.
+
+Only questions that stand on their own are cached. A question with fewer than
+min_words content words ("thanks", "tell me more") is never stored or looked
+up. Nor is a message once the agent has already replied to it in the current
+turn (after a tool call, say). Earlier turns don't count: the app keeps one
+long-lived session, so almost every request has earlier model turns in it.
+"""
+
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+_CONTRACTIONS = {
+    "what's": "what is",
+    "whats": "what is",
+    "how's": "how is",
+    "where's": "where is",
+    "can't": "can not",
+    "don't": "do not",
+    "i'm": "i am",
+    "it's": "it is",
+}
+_FILLER_WORDS = {
+    "a", "an", "the", "your", "you", "me", "my", "please", "hi", "hey", "hello",
+    "thanks", "thank", "can", "could", "would", "tell", "is", "are", "do", "does",
+    "i", "about", "there", "any", "some", "again", "what", "explain",
+}  # fmt: skip
+_WORD = re.compile(r"[a-z0-9']+")
+_NUMBER = re.compile(r"\d+")
+
+
+def normalize_query(text: str) -> str:
+    """Reduce a question to its content words."""
+    words = []
+    for word in _WORD.findall(text.lower()):
+        words.extend(_CONTRACTIONS.get(word, word).split())
+    return " ".join(word for word in words if word not in _FILLER_WORDS)
+
+
+def _trigrams(text: str) -> Counter:
+    padded = f"  {text} "
+    return Counter(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    dot = sum(count * b[gram] for gram, count in a.items() if gram in b)
+    norm = math.sqrt(sum(c * c for c in a.values())) * math.sqrt(
+        sum(c * c for c in b.values())
+    )
+    return dot / norm if norm else 0.0
+
+
+class _Entry:
+    __slots__ = ("query", "numbers", "trigrams", "response", "created_at")
+
+    def __init__(self, query: str, response: str):
+        self.query = query
+        self.numbers = tuple(_NUMBER.findall(query))
+        self.trigrams = _trigrams(query)
+        self.response = response
+        self.created_at = time.monotonic()
+
+
+class ResponseCache:
+    """A TTL + LRU cache of text responses, looked up by similar questions.
+
+    Args:
+        threshold: Minimum trigram cosine similarity for a cache hit
+        ttl_seconds: How long a cached response stays valid
+        max_entries: Total number of responses kept, across all scopes
+        min_words: Minimum number of content words in a cacheable question
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        ttl_seconds: float = 3600.0,
+        max_entries: int = 512,
+        min_words: int = 2,
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.min_words = min_words
+        # scope -> normalized query -> entry, plus a global LRU order
+        self._scopes: Dict[Hashable, Dict[str, _Entry]] = {}
+        self._lru: "OrderedDict[Tuple[Hashable, str], None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "skipped": 0,
+            "stores": 0,
+            "expirations": 0,
+            "evictions": 0,
+        }
+
+    def cacheable(self, query: str) -> bool:
+        """Whether a normalized question has enough content to be cached."""
+        return len(query.split()) >= self.min_words
+
+    def lookup(self, scope: Hashable, text: str) -> Optional[Tuple[str, float]]:
+        """Return (cached response, similarity) for a question, if one matches."""
+        query = normalize_query(text)
+        now = time.monotonic()
+        with self._lock:
+            if not self.cacheable(query):
+                self._counters["skipped"] += 1
+                return None
+            entries = self._scopes.get(scope, {})
+            best, best_similarity = None, 0.0
+            entry = entries.get(query)
+            if entry is not None:
+                best, best_similarity = entry, 1.0
+            else:
+                numbers = tuple(_NUMBER.findall(query))
+                trigrams = _trigrams(query)
+                for candidate in entries.values():
+                    if candidate.numbers != numbers:
+                        continue
+                    similarity = _cosine(trigrams, candidate.trigrams)
+                    if similarity > best_similarity:
+                        best, best_similarity = candidate, similarity
+
+            if best is not None and now - best.created_at > self.ttl_seconds:
+                self._remove(scope, best.query)
+                self._counters["expirations"] += 1
+                best = None
+            if best is None or best_similarity < self.threshold:
+                self._counters["misses"] += 1
+                return None
+
+            self._lru.move_to_end((scope, best.query))
+            self._counters["hits"] += 1
+            return best.response, best_similarity
+
+    def store(self, scope: Hashable, text: str, response: str) -> None:
+        query = normalize_query(text)
+        if not self.cacheable(query):
+            return
+        with self._lock:
+            self._scopes.setdefault(scope, {})[query] = _Entry(query, response)
+            self._lru[(scope, query)] = None
+            self._lru.move_to_end((scope, query))
+            self._counters["stores"] += 1
+            while len(self._lru) > self.max_entries:
+                old_scope, old_query = next(iter(self._lru))
+                self._remove(old_scope, old_query)
+                self._counters["evictions"] += 1
+
+    def _remove(self, scope: Hashable, query: str) -> None:
+        self._lru.pop((scope, query), None)
+        entries = self._scopes.get(scope)
+        if entries is not None:
+            entries.pop(query, None)
+            if not entries:
+                del self._scopes[scope]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._lru)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+# Shared by every agent; scopes keep their answers apart
+response_cache = ResponseCache()
+
+
+def _instruction_version(agent: LlmAgent) -> str:
+    instruction = agent.instruction
+    template = getattr(instruction, "template", instruction)
+    if not isinstance(template, str):
+        # An arbitrary instruction provider: only its identity is known
+        template = repr(template)
+    digest = hashlib.sha1(f"{agent.model}\n{template}".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def _response_text(llm_response: LlmResponse) -> Optional[str]:
+    """Return the text of a plain text response (no function calls)."""
+    content = llm_response.content
+    if not content or not content.parts:
+        return None
+    if any(part.function_call for part in content.parts):
+        return None
+    text = "".join(part.text or "" for part in content.parts).strip()
+    return text or None
+
+
+def enable_response_cache(
+    agent: LlmAgent,
+    state_inputs: Callable[[Any], Hashable] = lambda state: (),
+    cache: ResponseCache = response_cache,
+) -> LlmAgent:
+    """Serve an agent's repeated questions from a cache.
+
+    Args:
+        agent: An agent whose answers depend only on its instruction and on
+            the state inputs
+        state_inputs: Extracts the state values the answers depend on
+        cache: The cache to use (defaults to the shared one)
+
+    Returns:
+        The same agent, with its model callbacks set
+    """
+    version = _instruction_version(agent)
+    question_key = f"temp:cache_question_{agent.name}"
+
+    def scope_for(callback_context: CallbackContext) -> Hashable:
+        return (agent.name, version, state_inputs(callback_context.state))
+
+    def question(callback_context: CallbackContext, llm_request: LlmRequest):
+        # Only the first model call for the user's message is answerable from
+        # the cache; later calls follow up on tool results
+        if llm_request.contents:
+            last = llm_request.contents[-1]
+            if any(part.function_response for part in last.parts or []):
+                return None
+        user_content = callback_context.user_content
+        if not user_content or not user_content.parts:
+            return None
+        text = "".join(part.text or "" for part in user_content.parts).strip()
+        if not text:
+            return None
+        # The agent's own replies are the model turns in its request. Only
+        # those since the customer's message make this a follow-up; earlier
+        # turns of the session are other questions
+        for content in reversed(llm_request.contents):
+            if content.role == "model":
+                return None
+            content_text = "".join(part.text or "" for part in content.parts or [])
+            if content.role == "user" and content_text.strip() == text:
+                break
+        return text
+
+    def before_model_callback(
+        callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        text = question(callback_context, llm_request)
+        if text is None:
+            return None
+        cached = cache.lookup(scope_for(callback_context), text)
+        if cached is None:
+            # Remembered for this invocation only, to store the model's answer
+            callback_context.state[question_key] = text
+            return None
+
+        response, similarity = cached
+        print(f"[CACHE] {agent.name} answered from cache (similarity {similarity:.2f})")
+        return LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=response)])
+        )
+
+    def after_model_callback(
+        callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        text = callback_context.state.get(question_key)
+        if not text or llm_response.partial or llm_response.error_code:
+            return None
+        response = _response_text(llm_response)
+        if response is not None:
+            cache.store(scope_for(callback_context), text, response)
+            callback_context.state[question_key] = None
+        return None
+
+    agent.before_model_callback = before_model_callback
+    agent.after_model_callback = after_model_callback
+    return agent
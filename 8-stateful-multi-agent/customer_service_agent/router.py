@@ -0,0 +1,365 @@
+"""
+Local intent router for the customer service agent.
+
+The root customer_service agent makes a full model call on every message just
+to decide which specialist should answer. IntentRouter makes that decision on
+the CPU first:
+
+1. Keyword rules: if exactly one agent's rules match, route there; if several
+   do, the message asks for more than one thing and goes to the model
+2. A TF-IDF + logistic regression classifier, trained at startup on
+   routing_examples.jsonl plus any logged traffic, routes when it is confident
+
+When neither is sure (or the message is small talk for the root agent itself),
+the message goes to the model as before. So does a message for course_support
+from a user who doesn't own the course: the root agent only sends owners there. route_before_model is the
+before_model_callback that answers with a transfer_to_agent call in place of
+the model; log_model_route is the after_model_callback that logs the model's
+own routing decisions, so they can be used as training data.
+
+Set ROUTER_TRAFFIC_LOG to a file path to log and train on that traffic.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from .course_store import COURSES_KEY, load_courses
+
+ROUTES = ("policy_agent", "sales_agent", "course_support", "order_agent")
+
+# Label for messages the root agent should handle itself
+ROOT_LABEL = "customer_service"
+
+# course_support only helps owners of this course
+SUPPORTED_COURSE = "ai_marketing_platform"
+
+EXAMPLES_PATH = Path(__file__).with_name("routing_examples.jsonl")
+TRAFFIC_LOG_PATH = os.getenv("ROUTER_TRAFFIC_LOG")
+
+# Keyword rules per agent; a rule only routes when no other agent matches too
+KEYWORD_RULES: Dict[str, List[str]] = {
+    "policy_agent": [
+        r"\bpolic(y|ies)\b",
+        r"\bguidelines?\b",
+        r"\bcode of conduct\b",
+        r"\bcommunity rules?\b",
+        r"\bprivacy\b",
+    ],
+    "sales_agent": [
+        r"\b(buy|buying|enroll|sign me up)\b",
+        r"\bhow much\b",
+        r"\b(price|pricing|cost|discounts?)\b",
+    ],
+    "course_support": [
+        r"\b(section|lesson|module|tutorial|video)s?\b",
+        r"\bsource code\b",
+        r"\bstuck\b",
+    ],
+    "order_agent": [
+        r"\b(refund|money back)\b(?!.*\b(policy|guarantee)\b)",
+        r"\b(purchase history|my orders?|order status)\b",
+        r"\bwhat (courses )?(have i|did i) (bought|buy|purchased?)\b",
+        r"\bi (bought|purchased)\b",
+    ],
+}
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+def normalize(text: str) -> List[str]:
+    """Lowercase a message and split it into word tokens."""
+    return _TOKEN.findall(text.lower())
+
+
+def load_examples(path) -> List[Tuple[str, str]]:
+    """Load (text, label) pairs from a JSONL file of {"text", "label"} objects."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    examples = []
+    with path.open() as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                examples.append((record["text"], record["label"]))
+    return examples
+
+
+class TfidfLogisticClassifier:
+    """A tiny TF-IDF (word unigrams + bigrams) softmax classifier in numpy."""
+
+    def __init__(self, l2: float = 1e-3, epochs: int = 300, learning_rate: float = 2.0):
+        self.l2 = l2
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.vocabulary: Dict[str, int] = {}
+        self.labels: List[str] = []
+
+    @staticmethod
+    def _features(text: str) -> List[str]:
+        words = normalize(text)
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def _vectorize(self, texts: Iterable[str]) -> np.ndarray:
+        texts = list(texts)
+        matrix = np.zeros((len(texts), len(self.vocabulary)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                column = self.vocabulary.get(feature)
+                if column is not None:
+                    matrix[row, column] += 1.0
+        matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def fit(self, texts: List[str], labels: List[str]) -> "TfidfLogisticClassifier":
+        for text in texts:
+            for feature in self._features(text):
+                self.vocabulary.setdefault(feature, len(self.vocabulary))
+        self.labels = sorted(set(labels))
+
+        # Smoothed inverse document frequency, as in scikit-learn
+        document_frequency = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for text in texts:
+            for feature in set(self._features(text)):
+                document_frequency[self.vocabulary[feature]] += 1
+        self.idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1
+
+        x = self._vectorize(texts)
+        y = np.zeros((len(texts), len(self.labels)), dtype=np.float32)
+        for row, label in enumerate(labels):
+            y[row, self.labels.index(label)] = 1.0
+
+        # Full-batch gradient descent on the L2-regularized cross-entropy
+        self.weights = np.zeros((x.shape[1], len(self.labels)), dtype=np.float32)
+        self.bias = np.zeros(len(self.labels), dtype=np.float32)
+        for _ in range(self.epochs):
+            error = self._softmax(x @ self.weights + self.bias) - y
+            self.weights -= self.learning_rate * (
+                x.T @ error / len(texts) + self.l2 * self.weights
+            )
+            self.bias -= self.learning_rate * error.mean(axis=0)
+        return self
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        logits = logits - logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        probabilities = self._softmax(
+            self._vectorize([text]) @ self.weights + self.bias
+        )
+        return dict(zip(self.labels, probabilities[0].tolist()))
+
+
+class IntentRouter:
+    """Routes messages to a specialist agent locally when it is confident.
+
+    Args:
+        examples: Labelled (text, label) pairs to train the classifier on
+        threshold: Minimum classifier probability to route without the model
+        margin: Minimum lead of the best route over the runner-up
+    """
+
+    def __init__(
+        self,
+        examples: List[Tuple[str, str]],
+        threshold: float = 0.6,
+        margin: float = 0.25,
+    ):
+        self.threshold = threshold
+        self.margin = margin
+        self.rules = {
+            route: [re.compile(pattern) for pattern in patterns]
+            for route, patterns in KEYWORD_RULES.items()
+        }
+        texts, labels = zip(*examples)
+        self.classifier = TfidfLogisticClassifier().fit(list(texts), list(labels))
+        self._lock = threading.Lock()
+        self._counters = {"rules": 0, "classifier": 0, "fallback": 0}
+
+    def match_rules(self, text: str) -> List[str]:
+        """Return the agents whose keyword rules match a message."""
+        lowered = text.lower()
+        return [
+            route
+            for route, patterns in self.rules.items()
+            if any(pattern.search(lowered) for pattern in patterns)
+        ]
+
+    def route(
+        self, text: str, allowed: Iterable[str] = ROUTES
+    ) -> Tuple[Optional[str], str, float]:
+        """Pick an agent for a message.
+
+        Args:
+            text: The customer's message
+            allowed: The agents the message may be sent to; a message for any
+                other agent falls back to the model
+
+        Returns:
+            (agent name or None to fall back to the model, how it was decided,
+            confidence). Fallbacks are decided by "ambiguous" (several agents'
+            rules match), "not_allowed" or "fallback" (not confident).
+        """
+        matches = self.match_rules(text)
+        if len(matches) > 1:
+            # Several intents in one message: the model sorts them out
+            self._count("fallback")
+            return None, "ambiguous", 1.0
+        if matches:
+            route, method, confidence = matches[0], "rules", 1.0
+        else:
+            probabilities = self.classifier.predict_proba(text)
+            ranked = sorted(
+                probabilities.items(), key=lambda item: item[1], reverse=True
+            )
+            (best, confidence), (_, second_p) = ranked[0], ranked[1]
+            if (
+                best not in ROUTES
+                or confidence < self.threshold
+                or confidence - second_p < self.margin
+            ):
+                self._count("fallback")
+                return None, "fallback", confidence
+            route, method = best, "classifier"
+
+        if route not in allowed:
+            self._count("fallback")
+            return None, "not_allowed", confidence
+        self._count(method)
+        return route, method, confidence
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            counters = dict(self._counters)
+        total = sum(counters.values())
+        counters["coverage"] = (total - counters["fallback"]) / total if total else 0.0
+        return counters
+
+
+def log_traffic(text: str, label: str, path: Optional[str] = TRAFFIC_LOG_PATH) -> None:
+    """Append a routing decision to the traffic log, if one is configured."""
+    if not path:
+        return
+    with open(path, "a") as f:
+        f.write(json.dumps({"text": text, "label": label}) + "\n")
+
+
+def build_router() -> IntentRouter:
+    """Train a router on the seed examples plus any logged traffic."""
+    examples = load_examples(EXAMPLES_PATH)
+    if TRAFFIC_LOG_PATH:
+        examples += load_examples(TRAFFIC_LOG_PATH)
+    return IntentRouter(examples)
+
+
+router = build_router()
+
+
+def _customer_text(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[str]:
+    """Return the customer's message, if it is the last thing in the request.
+
+    After a sub-agent hands back to root, the last user-role content is ADK's
+    "For context: [agent] said ..." rewrite of that agent's reply, not the
+    customer's message. That case is left to the model: routing the original
+    message again would send it straight back to the same agent.
+    """
+    user_content = callback_context.user_content
+    if not llm_request.contents or not user_content or not user_content.parts:
+        return None
+    content = llm_request.contents[-1]
+    if content.role != "user" or not content.parts:
+        return None
+    # Function responses also come back with the user role
+    if any(part.function_response for part in content.parts):
+        return None
+    text = "".join(part.text or "" for part in user_content.parts).strip()
+    last_text = "".join(part.text or "" for part in content.parts).strip()
+    if not text or last_text != text:
+        return None
+    return text
+
+
+def route_before_model(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """Transfer straight to a specialist agent when the router is confident.
+
+    Returns:
+        A transfer_to_agent function call in place of the model response, or
+        None to let the model decide
+    """
+    text = _customer_text(callback_context, llm_request)
+    if text is None:
+        return None
+
+    # Only owners of the course go to course support
+    allowed = ROUTES
+    if SUPPORTED_COURSE not in load_courses(callback_context.state.get(COURSES_KEY)):
+        allowed = tuple(route for route in ROUTES if route != "course_support")
+
+    started = time.perf_counter()
+    route, method, confidence = router.route(text, allowed)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if route is None:
+        print(f"[ROUTER] No local route ({method}, {confidence:.2f}), asking the model")
+        # Remembered for this invocation only, to log the model's decision
+        callback_context.state["temp:router_query"] = text
+        return None
+
+    print(
+        f"[ROUTER] → {route} by {method} ({confidence:.2f}) in {elapsed_ms:.2f} ms,"
+        " skipping the routing model call"
+    )
+    return LlmResponse(
+        content=types.Content(
+            role="model",
+            parts=[
+                types.Part(
+                    function_call=types.FunctionCall(
+                        name="transfer_to_agent", args={"agent_name": route}
+                    )
+                )
+            ],
+        )
+    )
+
+
+def log_model_route(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> Optional[LlmResponse]:
+    """Log the model's routing decisions as training data for the router."""
+    if not TRAFFIC_LOG_PATH or not llm_response.content:
+        return None
+    text = callback_context.state.get("temp:router_query")
+    if not text:
+        return None
+    for part in llm_response.content.parts or []:
+        call = part.function_call
+        if call and call.name == "transfer_to_agent":
+            log_traffic(text, (call.args or {}).get("agent_name", ROOT_LABEL))
+            return None
+    if any(part.text for part in llm_response.content.parts or []):
+        # The root agent answered itself
+        log_traffic(text, ROOT_LABEL)
+    return None
@@ -1,5 +1,8 @@
 from google.adk.agents import Agent
 
+from ...course_store import load_courses
+from ...response_cache import enable_response_cache
+
 # Create the course support agent
 course_support_agent = Agent(
     name="course_support",
@@ -19,8 +22,8 @@ course_support_agent = Agent(
 
     Before helping:
     - Check if the user owns the AI Marketing Platform course
-    - Course information is stored as objects with "id" and "purchase_date" properties
-    - Look for a course with id "ai_marketing_platform" in the purchased courses
+    - Course information is stored as a mapping from course id to an object with a "purchase_date" property
+    - Look for the "ai_marketing_platform" key in the purchased courses
     - Only provide detailed help if they own the course
     - If they don't own the course, direct them to the sales agent
     - If they do own the course, you can mention when they purchased it (from the purchase_date property)
@@ -141,3 +144,13 @@ course_support_agent = Agent(
     """,
     tools=[],
 )
+
+
+def _course_support_inputs(state):
+    """The state that course support answers depend on."""
+    course = load_courses(state.get("purchased_courses")).get("ai_marketing_platform")
+    # Whether the user owns the course, and when they bought it
+    return state.get("user_name"), course and course.get("purchase_date")
+
+
+enable_response_cache(course_support_agent, state_inputs=_course_support_inputs)
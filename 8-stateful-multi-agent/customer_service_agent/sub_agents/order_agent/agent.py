@@ -3,6 +3,9 @@ from datetime import datetime
 from google.adk.agents import Agent
 from google.adk.tools.tool_context import ToolContext
 
+from ...course_store import remove_course
+from ...history import record_interaction
+
 
 def get_current_time() -> dict:
     """Get the current time in the format YYYY-MM-DD HH:MM:SS"""
@@ -19,46 +22,19 @@ def refund_course(tool_context: ToolContext) -> dict:
     course_id = "ai_marketing_platform"
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    # Get current purchased courses
-    current_purchased_courses = tool_context.state.get("purchased_courses", [])
-
-    # Check if user owns the course
-    course_ids = [
-        course["id"] for course in current_purchased_courses if isinstance(course, dict)
-    ]
-    if course_id not in course_ids:
+    # Remove the course, unless the user doesn't own it
+    if not remove_course(tool_context.state, course_id):
         return {
             "status": "error",
             "message": "You don't own this course, so it can't be refunded.",
         }
 
-    # Create new list without the course to be refunded
-    new_purchased_courses = []
-    for course in current_purchased_courses:
-        # Skip empty entries or non-dict entries
-        if not course or not isinstance(course, dict):
-            continue
-        # Skip the course being refunded
-        if course.get("id") == course_id:
-            continue
-        # Keep all other courses
-        new_purchased_courses.append(course)
-
-    # Update purchased courses in state via assignment
-    tool_context.state["purchased_courses"] = new_purchased_courses
-
-    # Get current interaction history
-    current_interaction_history = tool_context.state.get("interaction_history", [])
-
-    # Create new interaction history with refund added
-    new_interaction_history = current_interaction_history.copy()
-    new_interaction_history.append(
-        {"action": "refund_course", "course_id": course_id, "timestamp": current_time}
+    # Record the refund in the bounded interaction history
+    record_interaction(
+        tool_context.state,
+        {"action": "refund_course", "course_id": course_id, "timestamp": current_time},
     )
 
-    # Update interaction history in state via assignment
-    tool_context.state["interaction_history"] = new_interaction_history
-
     return {
         "status": "success",
         "message": """Successfully refunded the AI Marketing Platform course! 
@@ -86,15 +62,16 @@ order_agent = Agent(
     </purchase_info>
 
     <interaction_history>
-    {interaction_history}
+    Recent interactions: {interaction_history}
+    Summary of all interactions: {interaction_rollup?}
     </interaction_history>
 
     When users ask about their purchases:
     1. Check their course list from the purchase info above
-       - Course information is stored as objects with "id" and "purchase_date" properties
+       - Course information is stored as a mapping from course id to an object with a "purchase_date" property
     2. Format the response clearly showing:
        - Which courses they own
-       - When they were purchased (from the course.purchase_date property)
+       - When they were purchased (from the purchase_date property of each course)
 
     When users request a refund:
     1. Verify they own the course they want to refund ("ai_marketing_platform")
@@ -1,5 +1,7 @@
 from google.adk.agents import Agent
 
+from ...response_cache import enable_response_cache
+
 # Create the policy agent
 policy_agent = Agent(
     name="policy_agent",
@@ -58,3 +60,6 @@ policy_agent = Agent(
     """,
     tools=[],
 )
+
+# Policy answers only depend on the instruction (and the name it greets with)
+enable_response_cache(policy_agent, state_inputs=lambda state: state.get("user_name"))
@@ -3,6 +3,9 @@ from datetime import datetime
 from google.adk.agents import Agent
 from google.adk.tools.tool_context import ToolContext
 
+from ...course_store import add_course
+from ...history import record_interaction
+
 
 def purchase_course(tool_context: ToolContext) -> dict:
     """
@@ -12,41 +15,20 @@ def purchase_course(tool_context: ToolContext) -> dict:
     course_id = "ai_marketing_platform"
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    # Get current purchased courses
-    current_purchased_courses = tool_context.state.get("purchased_courses", [])
-
-    # Check if user already owns the course
-    course_ids = [
-        course["id"] for course in current_purchased_courses if isinstance(course, dict)
-    ]
-    if course_id in course_ids:
+    # Add the course, unless the user already owns it
+    if not add_course(tool_context.state, course_id, current_time):
         return {"status": "error", "message": "You already own this course!"}
 
-    # Create new list with the course added
-    new_purchased_courses = []
-    # Only include valid dictionary courses
-    for course in current_purchased_courses:
-        if isinstance(course, dict) and "id" in course:
-            new_purchased_courses.append(course)
-
-    # Add the new course as a dictionary with id and purchase_date
-    new_purchased_courses.append({"id": course_id, "purchase_date": current_time})
-
-    # Update purchased courses in state via assignment
-    tool_context.state["purchased_courses"] = new_purchased_courses
-
-    # Get current interaction history
-    current_interaction_history = tool_context.state.get("interaction_history", [])
-
-    # Create new interaction history with purchase added
-    new_interaction_history = current_interaction_history.copy()
-    new_interaction_history.append(
-        {"action": "purchase_course", "course_id": course_id, "timestamp": current_time}
+    # Record the purchase in the bounded interaction history
+    record_interaction(
+        tool_context.state,
+        {
+            "action": "purchase_course",
+            "course_id": course_id,
+            "timestamp": current_time,
+        },
     )
 
-    # Update interaction history in state via assignment
-    tool_context.state["interaction_history"] = new_interaction_history
-
     return {
         "status": "success",
         "message": "Successfully purchased the AI Marketing Platform course!",
@@ -73,7 +55,8 @@ sales_agent = Agent(
     </purchase_info>
 
     <interaction_history>
-    {interaction_history}
+    Recent interactions: {interaction_history}
+    Summary of all interactions: {interaction_rollup?}
     </interaction_history>
 
     Course Details:
@@ -84,7 +67,7 @@ sales_agent = Agent(
 
     When interacting with users:
     1. Check if they already own the course (check purchased_courses above)
-       - Course information is stored as objects with "id" and "purchase_date" properties
+       - Course information is stored as a mapping from course id to an object with a "purchase_date" property
        - The course id is "ai_marketing_platform"
     2. If they own it:
        - Remind them they have access
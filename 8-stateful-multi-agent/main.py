@@ -1,25 +1,42 @@
 import asyncio
+import os
+
+from console import AsyncConsole
 
 # Import the main customer service agent
 from customer_service_agent.agent import customer_service_agent
+from customer_service_agent.history import new_rollup
+from customer_service_agent.response_cache import response_cache
 from dotenv import load_dotenv
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from utils import add_user_query_to_history, call_agent_async
+from session_snapshot import SnapshotError
+from sharded_session_service import ShardedSessionService
+from utils import (
+    StateView,
+    add_user_query_to_history,
+    call_agent_async,
+    display_response_cache_stats,
+)
 
 load_dotenv()
 
 # ===== PART 1: Initialize In-Memory Session Service =====
-# Using in-memory storage for this example (non-persistent)
-session_service = InMemorySessionService()
+# Using in-memory storage for this example. The sharded service lets the
+# interaction history grow without rewriting the whole state, and spills
+# sessions that sit idle to disk. Sessions are snapshotted to SNAPSHOT_PATH
+# while the app runs and on exit, and restored from it on the next start
+session_service = ShardedSessionService()
+SNAPSHOT_PATH = os.getenv("SESSION_SNAPSHOT", "./customer_service_sessions.snapshot")
+SNAPSHOT_INTERVAL_SECONDS = 60
 
 
 # ===== PART 2: Define Initial State =====
 # This will be used when creating a new session
 initial_state = {
     "user_name": "Brandon Hancock",
-    "purchased_courses": [],
+    "purchased_courses": {},
     "interaction_history": [],
+    "interaction_rollup": new_rollup(),
 }
 
 
@@ -28,15 +45,39 @@ async def main_async():
     APP_NAME = "Customer Support"
     USER_ID = "aiwithbrandon"
 
-    # ===== PART 3: Session Creation =====
-    # Create a new session with initial state
-    new_session = session_service.create_session(
+    # ===== PART 3: Session Management - Restore or Create =====
+    # Warm start from the last snapshot; sessions load from disk on first use
+    if os.path.exists(SNAPSHOT_PATH):
+        try:
+            restored = session_service.restore(SNAPSHOT_PATH, lazy=True)
+            print(f"Restored {restored} sessions from {SNAPSHOT_PATH}")
+        except SnapshotError as e:
+            print(f"Ignoring snapshot: {e}")
+
+    existing_sessions = session_service.list_sessions(
         app_name=APP_NAME,
         user_id=USER_ID,
-        state=initial_state,
     )
-    SESSION_ID = new_session.id
-    print(f"Created new session: {SESSION_ID}")
+    if existing_sessions.sessions:
+        SESSION_ID = existing_sessions.sessions[0].id
+        print(f"Continuing existing session: {SESSION_ID}")
+    else:
+        # Create a new session with initial state
+        new_session = session_service.create_session(
+            app_name=APP_NAME,
+            user_id=USER_ID,
+            state=initial_state,
+        )
+        SESSION_ID = new_session.id
+        print(f"Created new session: {SESSION_ID}")
+
+    # Snapshot in the background, one shard at a time, while the chat runs
+    session_service.start_snapshotter(SNAPSHOT_PATH, SNAPSHOT_INTERVAL_SECONDS)
+
+    # Follow the session's state through its events, so each turn only
+    # displays what changed
+    state_view = StateView.attach(session_service, APP_NAME, USER_ID, SESSION_ID)
+    state_view.display("Initial State")
 
     # ===== PART 4: Agent Runner Setup =====
     # Create a runner with the main customer service agent
@@ -50,22 +91,35 @@ async def main_async():
     print("\nWelcome to Customer Service Chat!")
     print("Type 'exit' or 'quit' to end the conversation.\n")
 
-    while True:
-        # Get user input
-        user_input = input("You: ")
-
-        # Check if user wants to exit
-        if user_input.lower() in ["exit", "quit"]:
-            print("Ending conversation. Goodbye!")
-            break
-
-        # Update interaction history with the user's query
-        add_user_query_to_history(
-            session_service, APP_NAME, USER_ID, SESSION_ID, user_input
-        )
-
-        # Process the user query through the agent
-        await call_agent_async(runner, USER_ID, SESSION_ID, user_input)
+    # The console reads input without blocking the event loop
+    async with AsyncConsole() as console:
+        while True:
+            # Get user input
+            try:
+                user_input = await console.read_line("You: ")
+            except EOFError:
+                user_input = "exit"
+
+            # Check if user wants to exit
+            if user_input.lower() in ["exit", "quit"]:
+                print("Ending conversation. Goodbye!")
+                break
+
+            # Update interaction history with the user's query
+            add_user_query_to_history(
+                session_service, APP_NAME, USER_ID, SESSION_ID, user_input
+            )
+
+            # Process the user query through the agent
+            await call_agent_async(
+                runner,
+                USER_ID,
+                SESSION_ID,
+                user_input,
+                stream=True,
+                console=console,
+                state_view=state_view,
+            )
 
     # ===== PART 6: State Examination =====
     # Show final session state
@@ -76,6 +130,14 @@ async def main_async():
     for key, value in final_session.state.items():
         print(f"{key}: {value}")
 
+    # Show how many model calls the response cache saved
+    display_response_cache_stats(response_cache)
+
+    # Save the final state for the next run
+    session_service.stop_snapshotter()
+    session_service.snapshot(SNAPSHOT_PATH)
+    print(f"Saved sessions to {SNAPSHOT_PATH}")
+
 
 def main():
     """Entry point for the application."""
@@ -0,0 +1,187 @@
+"""
+Appendable Session Service
+
+This module adds an append-to-list operation to the in-memory session service.
+
+Updating interaction_history with get_session + create_session copies and
+rewrites the whole state on every message, so each update costs O(history),
+and the change never shows up in the session's event log. append_to_state_list
+appends one item to a list in the stored state instead:
+
+- Atomic per session: appends and event writes to the same session are
+  serialized by a per-session lock
+- Bounded cost: with max_length, each append copies at most max_length items,
+  however long the conversation has been going
+- Recorded as an event, so the session's event log still explains every change
+
+The list is replaced by a new one rather than changed in place: earlier
+events' state_delta, callers' session copies and snapshots taken outside the
+lock can hold the same list object, and must keep the value they recorded.
+
+The event records the append in custom_metadata["state_append"] rather than in
+a state_delta, which would hold the whole list. So the append can't be replayed
+from state_delta: a service or view that rebuilds state from the event log has
+to apply state_append records itself (as utils.StateView does).
+
+append_state_item() holds the append itself, shared by AppendableSessionService
+and ShardedSessionService; each service resolves the state dict and holds its
+own lock around it.
+"""
+
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService, Session
+from google.adk.sessions.state import State
+
+SessionKey = Tuple[str, str, str]
+
+
+def append_state_item(
+    state: Dict[str, Any],
+    state_key: str,
+    *,
+    key: str,
+    item: Any,
+    max_length: Optional[int] = None,
+    on_append: Optional[Callable[[Dict[str, Any], Any], None]] = None,
+    author: str = "user",
+) -> Event:
+    """Append an item to the list state[state_key].
+
+    The list is replaced by a new one, so objects that hold the old list
+    (earlier events' state_delta, snapshots) don't change. The caller holds the session's lock and stores the returned event. Its
+    custom_metadata["state_append"] records the append; there is no
+    state_delta, so the append can't be replayed from state deltas.
+
+    Args:
+        state: The stored state dict that holds the list
+        state_key: The list's key within state (without an app:/user: prefix)
+        key: The full state key, as recorded in the event
+        item, max_length, on_append, author: As for append_to_state_list
+
+    Returns:
+        The event recording the append
+
+    Raises:
+        ValueError: If the state value under key is not a list
+    """
+    items = state.get(state_key, [])
+    if not isinstance(items, list):
+        raise ValueError(f"State key {key!r} holds {type(items).__name__}, not a list")
+    items = state[state_key] = [*items, item]
+    if on_append is not None:
+        on_append(state, item)
+    if max_length is not None and len(items) > max_length:
+        state[state_key] = items[-max_length:]
+
+    # The event carries the appended item rather than a state_delta, which
+    # would hold (and later re-apply) the whole list
+    return Event(
+        invocation_id=f"e-{uuid.uuid4()}",
+        author=author,
+        custom_metadata={
+            "state_append": {"key": key, "item": item, "max_length": max_length}
+        },
+        timestamp=time.time(),
+    )
+
+
+class AppendableSessionService(InMemorySessionService):
+    """In-memory session service with an atomic append-to-state-list operation."""
+
+    def __init__(self):
+        super().__init__()
+        self._session_locks: Dict[SessionKey, threading.Lock] = {}
+        self._session_locks_lock = threading.Lock()
+
+    def _lock_for(self, key: SessionKey) -> threading.Lock:
+        with self._session_locks_lock:
+            lock = self._session_locks.get(key)
+            if lock is None:
+                lock = self._session_locks[key] = threading.Lock()
+            return lock
+
+    def _state_for_key(self, storage_session: Session, key: str):
+        """Return the stored dict that holds key, and the key within it."""
+        app_name, user_id = storage_session.app_name, storage_session.user_id
+        if key.startswith(State.APP_PREFIX):
+            return (
+                self.app_state.setdefault(app_name, {}),
+                key.removeprefix(State.APP_PREFIX),
+            )
+        if key.startswith(State.USER_PREFIX):
+            return (
+                self.user_state.setdefault(app_name, {}).setdefault(user_id, {}),
+                key.removeprefix(State.USER_PREFIX),
+            )
+        return storage_session.state, key
+
+    def append_to_state_list(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        key: str,
+        item: Any,
+        max_length: Optional[int] = None,
+        on_append: Optional[Callable[[Dict[str, Any], Any], None]] = None,
+        author: str = "user",
+    ) -> Event:
+        """Append an item to a list in session state.
+
+        Args:
+            app_name: The application name
+            user_id: The user ID
+            session_id: The session ID
+            key: The state key holding the list (app: and user: prefixes work)
+            item: The item to append
+            max_length: Keep only this many of the most recent items
+            on_append: Called under the lock with the state dict holding the
+                list and the appended item, before the list is trimmed; use it
+                to keep derived values (such as rollups) in step with the list
+            author: Author of the recorded event
+
+        Returns:
+            The event recording the append, in custom_metadata["state_append"]
+            (it has no state_delta, so the append can't be replayed from one)
+
+        Raises:
+            ValueError: If the session does not exist, or the state value under
+                key is not a list
+        """
+        storage_session = (
+            self.sessions.get(app_name, {}).get(user_id, {}).get(session_id)
+        )
+        if storage_session is None:
+            raise ValueError(f"Session not found: {session_id}")
+
+        with self._lock_for((app_name, user_id, session_id)):
+            state, state_key = self._state_for_key(storage_session, key)
+            event = append_state_item(
+                state,
+                state_key,
+                key=key,
+                item=item,
+                max_length=max_length,
+                on_append=on_append,
+                author=author,
+            )
+            storage_session.events.append(event)
+            storage_session.last_update_time = event.timestamp
+        return event
+
+    def append_event(self, session: Session, event: Event) -> Event:
+        with self._lock_for((session.app_name, session.user_id, session.id)):
+            return super().append_event(session=session, event=event)
+
+    def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        super().delete_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        with self._session_locks_lock:
+            self._session_locks.pop((app_name, user_id, session_id), None)
@@ -0,0 +1,111 @@
+"""
+Session Snapshot Format
+
+A snapshot is a stream of length-prefixed frames after a magic header:
+
+    b"ADKSNAP1"
+    frame*: kind (1 byte) | payload length (8 bytes, little-endian) | payload
+
+Payloads are pickles. There is one frame per app state, per user state and per
+session, and an END frame with the number of frames before it, so a truncated
+file is detected instead of silently restoring part of the store. Sessions are
+framed one by one, so neither writing nor reading needs the whole store
+serialized in memory at once. The reader checks the frame headers and the END
+frame before it yields anything, so nothing is restored from a truncated
+file.
+
+Snapshots are written to a temporary file and renamed into place, so a crash
+mid-write leaves the previous snapshot intact. They are read through mmap: the
+reader walks the frame headers and hands out payload slices without copying
+the file into memory first.
+"""
+
+import mmap
+import os
+import pickle
+import struct
+from typing import Any, Iterable, Iterator, List, Tuple
+
+MAGIC = b"ADKSNAP1"
+
+APP_STATE = 1
+USER_STATE = 2
+SESSION = 3
+END = 4
+
+_HEADER = struct.Struct("<BQ")
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is not valid or is incomplete."""
+
+
+def write_snapshot(path: str, frames: Iterable[Tuple[int, Any]]) -> int:
+    """Write (kind, value) frames to a snapshot file, atomically.
+
+    Values of SESSION frames that are already bytes are written as they are.
+
+    Returns:
+        The number of frames written (END excluded)
+    """
+    tmp_path = f"{path}.tmp"
+    count = 0
+    with open(tmp_path, "wb", buffering=1 << 20) as f:
+        f.write(MAGIC)
+        for kind, value in frames:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            f.write(_HEADER.pack(kind, len(payload)))
+            f.write(payload)
+            count += 1
+        payload = pickle.dumps(count)
+        f.write(_HEADER.pack(END, len(payload)))
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+def read_snapshot(path: str) -> Iterator[Tuple[int, Any]]:
+    """Yield the (kind, value) frames of a snapshot file, END excluded.
+
+    The frame headers and the END frame are checked before the first frame is
+    yielded, so a truncated file raises before a caller has applied any of it.
+
+    Raises:
+        SnapshotError: If the file is not a snapshot, or is truncated
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < len(MAGIC):
+            raise SnapshotError(f"Not a session snapshot: {path}")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped[: len(MAGIC)] != MAGIC:
+                raise SnapshotError(f"Not a session snapshot: {path}")
+            view = memoryview(mapped)
+            try:
+                frames = _frame_index(view, path)
+                for kind, start, end in frames:
+                    with view[start:end] as payload:
+                        value = pickle.loads(payload)
+                    yield kind, value
+            finally:
+                view.release()
+
+
+def _frame_index(view: memoryview, path: str) -> List[Tuple[int, int, int]]:
+    """(kind, payload start, payload end) of each frame before a valid END."""
+    offset, frames = len(MAGIC), []
+    while offset + _HEADER.size <= len(view):
+        kind, length = _HEADER.unpack_from(view, offset)
+        start = offset + _HEADER.size
+        if start + length > len(view):
+            break
+        offset = start + length
+        if kind == END:
+            with view[start:offset] as payload:
+                count = pickle.loads(payload)
+            if count != len(frames):
+                break
+            return frames
+        frames.append((kind, start, offset))
+    raise SnapshotError(f"Truncated session snapshot: {path}")
@@ -0,0 +1,695 @@
+"""
+Sharded Session Service
+
+An in-memory session service for serving many customers from one process.
+InMemorySessionService keeps every session in nested dicts with no locking and
+keeps them in memory forever. ShardedSessionService adds:
+
+- Sharding: sessions are spread over shards by (app_name, user_id), each with
+  its own lock, so requests for different users rarely wait on each other.
+  Lookups are dict lookups, O(1) in the number of sessions
+- Memory accounting: each session tracks an estimate of its size (state plus
+  serialized events), summed per shard
+- Idle eviction: sessions not used for a while are pickled to a spill
+  directory and reloaded transparently the next time they are read. A memory
+  budget can also spill the least recently used sessions of a shard
+- Compact events (optional): events are kept as CompactEvent records (see
+  compact_events.py) instead of full Event objects, and the payloads of all but
+  the most recent events are compressed
+- The atomic append_to_state_list operation of AppendableSessionService
+- Subscriptions: observers can follow the events stored on a session, e.g. to
+  keep a view of its state up to date without re-reading it
+- Snapshots: the whole store can be written to a snapshot file (see
+  session_snapshot.py) shard by shard while serving continues, and restored on
+  startup, eagerly or lazily through the spill directory
+"""
+
+import copy
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from compact_events import CompactEventLog
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import (
+    GetSessionConfig,
+    ListEventsResponse,
+    ListSessionsResponse,
+)
+from google.adk.sessions.state import State
+from session_service import append_state_item
+from session_snapshot import (
+    APP_STATE,
+    SESSION,
+    USER_STATE,
+    read_snapshot,
+    write_snapshot,
+)
+
+UserKey = Tuple[str, str]
+SessionKey = Tuple[str, str, str]
+
+
+def _estimate_size(value: Any) -> int:
+    """Rough size in bytes of a JSON-like value, as serialized."""
+    return len(json.dumps(value, default=str))
+
+
+def _event_size(event: Event) -> int:
+    return len(event.model_dump_json(exclude_none=True))
+
+
+class _Slot:
+    """One stored session, in memory or spilled to disk."""
+
+    __slots__ = ("session", "events", "spill_path", "last_access", "size")
+
+    def __init__(
+        self, session: Session, size: int, events: Optional[CompactEventLog] = None
+    ):
+        self.session: Optional[Session] = session
+        # In compact mode the events live here, and session.events stays empty
+        self.events = events
+        self.spill_path: Optional[str] = None
+        self.last_access = time.monotonic()
+        self.size = size
+
+
+class _PeriodicTask:
+    """Runs a function on a daemon thread every interval_seconds.
+
+    A run that raises is reported and the schedule carries on, so one failed
+    snapshot (a full disk, say) doesn't stop all later ones.
+    """
+
+    def __init__(self, name: str, func: Callable[[], Any], interval_seconds: float):
+        self._stop = threading.Event()
+
+        def _run():
+            while not self._stop.wait(interval_seconds):
+                try:
+                    func()
+                except Exception as e:
+                    print(
+                        f"[{name}] Failed, trying again in {interval_seconds}s: {e!r}"
+                    )
+
+        self._thread = threading.Thread(target=_run, name=name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class _Shard:
+    __slots__ = ("lock", "sessions", "user_state", "resident_bytes")
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        # (app_name, user_id) -> session_id -> slot
+        self.sessions: Dict[UserKey, Dict[str, _Slot]] = {}
+        # (app_name, user_id) -> user state
+        self.user_state: Dict[UserKey, Dict[str, Any]] = {}
+        self.resident_bytes = 0
+
+
+class ShardedSessionService(BaseSessionService):
+    """In-memory session service with sharded locks and idle eviction to disk.
+
+    Args:
+        num_shards: Number of shards (and locks)
+        spill_dir: Directory for evicted sessions (a temporary one by default)
+        max_idle_seconds: Sessions idle for longer are spilled by evict_idle()
+        max_resident_bytes: Memory budget for sessions, split evenly over the
+            shards; a shard over its share spills its least recently used
+            sessions after a write
+        compact_events: Store events as compact records rather than Event
+            objects
+        hot_events: In compact mode, how many recent events per session are
+            left uncompressed
+    """
+
+    def __init__(
+        self,
+        num_shards: int = 64,
+        spill_dir: Optional[str] = None,
+        max_idle_seconds: float = 900.0,
+        max_resident_bytes: Optional[int] = None,
+        compact_events: bool = False,
+        hot_events: int = 8,
+    ):
+        self.num_shards = num_shards
+        self._shards = [_Shard() for _ in range(num_shards)]
+        self.spill_dir = spill_dir or tempfile.mkdtemp(prefix="adk_sessions_")
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self.max_idle_seconds = max_idle_seconds
+        self.max_resident_bytes = max_resident_bytes
+        self.compact_events = compact_events
+        self.hot_events = hot_events
+
+        # App state is shared by every shard; it changes rarely
+        self.app_state: Dict[str, Dict[str, Any]] = {}
+        self._app_state_lock = threading.Lock()
+
+        self._counters_lock = threading.Lock()
+        self._counters = {"spills": 0, "loads": 0, "snapshots": 0}
+        self._subscribers: Dict[SessionKey, List[Callable[[Event], None]]] = {}
+        self._subscribers_lock = threading.Lock()
+        self._evictor: Optional[_PeriodicTask] = None
+        self._snapshotter: Optional[_PeriodicTask] = None
+
+    # ===== Shards and slots =====
+
+    def _shard(self, app_name: str, user_id: str) -> _Shard:
+        return self._shards[hash((app_name, user_id)) % self.num_shards]
+
+    def _count(self, name: str) -> None:
+        with self._counters_lock:
+            self._counters[name] += 1
+
+    def _slot(
+        self, shard: _Shard, app_name: str, user_id: str, session_id: str
+    ) -> Optional[_Slot]:
+        return shard.sessions.get((app_name, user_id), {}).get(session_id)
+
+    def _resident(self, shard: _Shard, slot: _Slot) -> Session:
+        """Return the slot's session, loading it from disk if it was spilled."""
+        if slot.session is None:
+            with open(slot.spill_path, "rb") as f:
+                slot.session, slot.events = pickle.load(f)
+            os.remove(slot.spill_path)
+            slot.spill_path = None
+            shard.resident_bytes += slot.size
+            self._count("loads")
+        slot.last_access = time.monotonic()
+        return slot.session
+
+    def _spill(self, shard: _Shard, slot: _Slot) -> None:
+        session = slot.session
+        if session is None:
+            return
+        slot.spill_path = self._spill_path(
+            session.app_name, session.user_id, session.id
+        )
+        with open(slot.spill_path, "wb") as f:
+            pickle.dump((session, slot.events), f, protocol=pickle.HIGHEST_PROTOCOL)
+        slot.session = slot.events = None
+        shard.resident_bytes -= slot.size
+        self._count("spills")
+
+    def _spill_path(self, app_name: str, user_id: str, session_id: str) -> str:
+        name = hashlib.sha1(
+            f"{app_name}\0{user_id}\0{session_id}".encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.spill_dir, f"{name}.pkl")
+
+    def _grow(self, shard: _Shard, slot: _Slot, size: int) -> None:
+        slot.size += size
+        shard.resident_bytes += size
+        if self.max_resident_bytes is not None:
+            self._enforce_budget(shard, keep=slot)
+
+    def _store_event(self, shard: _Shard, slot: _Slot, event: Event) -> None:
+        """Add an event to the stored session, whose state is already updated."""
+        stored = slot.session
+        stored.last_update_time = event.timestamp
+        if slot.events is None:
+            stored.events.append(event)
+            self._grow(shard, slot, _event_size(event))
+            return
+        record = slot.events.append(event)
+        saved = slot.events.compress_cold()
+        self._grow(shard, slot, record.size - saved)
+
+    def _enforce_budget(self, shard: _Shard, keep: Optional[_Slot] = None) -> None:
+        budget = self.max_resident_bytes / self.num_shards
+        if shard.resident_bytes <= budget:
+            return
+        resident = [
+            slot
+            for sessions in shard.sessions.values()
+            for slot in sessions.values()
+            if slot.session is not None and slot is not keep
+        ]
+        resident.sort(key=lambda slot: slot.last_access)
+        for slot in resident:
+            if shard.resident_bytes <= budget:
+                break
+            self._spill(shard, slot)
+
+    def _merge_state(self, app_name: str, user_id: str, shard: _Shard, session):
+        for key, value in self.app_state.get(app_name, {}).items():
+            session.state[State.APP_PREFIX + key] = value
+        for key, value in shard.user_state.get((app_name, user_id), {}).items():
+            session.state[State.USER_PREFIX + key] = value
+        return session
+
+    # ===== BaseSessionService =====
+
+    def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = (
+            session_id.strip()
+            if session_id and session_id.strip()
+            else str(uuid.uuid4())
+        )
+        session = Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=copy.deepcopy(state) if state else {},
+            last_update_time=time.time(),
+        )
+        shard = self._shard(app_name, user_id)
+        with shard.lock:
+            sessions = shard.sessions.setdefault((app_name, user_id), {})
+            previous = sessions.get(session_id)
+            if previous is not None:
+                self._discard(shard, previous)
+            events = CompactEventLog(self.hot_events) if self.compact_events else None
+            slot = sessions[session_id] = _Slot(session, 0, events)
+            self._grow(shard, slot, _estimate_size(session.state))
+            return self._merge_state(app_name, user_id, shard, copy.deepcopy(session))
+
+    def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        shard = self._shard(app_name, user_id)
+        with shard.lock:
+            slot = self._slot(shard, app_name, user_id, session_id)
+            if slot is None:
+                return None
+            copied = copy.deepcopy(self._resident(shard, slot))
+            merged = self._merge_state(app_name, user_id, shard, copied)
+            if slot.events is not None:
+                # Only the requested events are rebuilt
+                merged.events = slot.events.to_events(
+                    config.num_recent_events if config else None,
+                    config.after_timestamp if config else None,
+                )
+                return merged
+
+        if config:
+            if config.num_recent_events:
+                merged.events = merged.events[-config.num_recent_events :]
+            elif config.after_timestamp:
+                merged.events = [
+                    event
+                    for event in merged.events
+                    if event.timestamp >= config.after_timestamp
+                ]
+        return merged
+
+    def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        shard = self._shard(app_name, user_id)
+        sessions = []
+        with shard.lock:
+            for session_id, slot in shard.sessions.get((app_name, user_id), {}).items():
+                # Listing doesn't need the contents, so spilled sessions stay on disk
+                sessions.append(
+                    Session(
+                        app_name=app_name,
+                        user_id=user_id,
+                        id=session_id,
+                        last_update_time=(
+                            slot.session.last_update_time if slot.session else 0.0
+                        ),
+                    )
+                )
+        return ListSessionsResponse(sessions=sessions)
+
+    def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        shard = self._shard(app_name, user_id)
+        with shard.lock:
+            sessions = shard.sessions.get((app_name, user_id), {})
+            slot = sessions.pop(session_id, None)
+            if slot is not None:
+                self._discard(shard, slot)
+            if not sessions:
+                shard.sessions.pop((app_name, user_id), None)
+        with self._subscribers_lock:
+            self._subscribers.pop((app_name, user_id, session_id), None)
+
+    def _discard(self, shard: _Shard, slot: _Slot) -> None:
+        if slot.session is not None:
+            shard.resident_bytes -= slot.size
+        elif slot.spill_path and os.path.exists(slot.spill_path):
+            os.remove(slot.spill_path)
+
+    def list_events(
+        self, *, app_name: str, user_id: str, session_id: str
+    ) -> ListEventsResponse:
+        session = self.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        return ListEventsResponse(events=session.events if session else [])
+
+    def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        # Update the caller's copy
+        super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        shard = self._shard(session.app_name, session.user_id)
+        with shard.lock:
+            slot = self._slot(shard, session.app_name, session.user_id, session.id)
+            if slot is None:
+                return event
+
+            if event.actions and event.actions.state_delta:
+                for key, value in event.actions.state_delta.items():
+                    if key.startswith(State.APP_PREFIX):
+                        with self._app_state_lock:
+                            self.app_state.setdefault(session.app_name, {})[
+                                key.removeprefix(State.APP_PREFIX)
+                            ] = value
+                    elif key.startswith(State.USER_PREFIX):
+                        shard.user_state.setdefault(
+                            (session.app_name, session.user_id), {}
+                        )[key.removeprefix(State.USER_PREFIX)] = value
+
+            stored = self._resident(shard, slot)
+            if event.actions and event.actions.state_delta:
+                for key, value in event.actions.state_delta.items():
+                    if not key.startswith(State.TEMP_PREFIX):
+                        stored.state[key] = value
+            self._store_event(shard, slot, event)
+        self._notify((session.app_name, session.user_id, session.id), event)
+        return event
+
+    # ===== Append API =====
+
+    def append_to_state_list(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        key: str,
+        item: Any,
+        max_length: Optional[int] = None,
+        on_append: Optional[Callable[[Dict[str, Any], Any], None]] = None,
+        author: str = "user",
+    ) -> Event:
+        """Append an item to a list in session state.
+
+        Same behavior as AppendableSessionService.append_to_state_list (both
+        use session_service.append_state_item): the append is atomic per
+        session, bounded by max_length rather than the history length, and
+        recorded as an event. The
+        event has no state_delta, so the append can't be replayed from one.
+        """
+        shard = self._shard(app_name, user_id)
+        with shard.lock:
+            slot = self._slot(shard, app_name, user_id, session_id)
+            if slot is None:
+                raise ValueError(f"Session not found: {session_id}")
+            storage_session = self._resident(shard, slot)
+
+            if key.startswith(State.APP_PREFIX):
+                state, state_key = (
+                    self.app_state.setdefault(app_name, {}),
+                    key.removeprefix(State.APP_PREFIX),
+                )
+            elif key.startswith(State.USER_PREFIX):
+                state, state_key = (
+                    shard.user_state.setdefault((app_name, user_id), {}),
+                    key.removeprefix(State.USER_PREFIX),
+                )
+            else:
+                state, state_key = storage_session.state, key
+
+            event = append_state_item(
+                state,
+                state_key,
+                key=key,
+                item=item,
+                max_length=max_length,
+                on_append=on_append,
+                author=author,
+            )
+            self._store_event(shard, slot, event)
+        self._notify((app_name, user_id, session_id), event)
+        return event
+
+    # ===== Subscriptions =====
+
+    def subscribe(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        callback: Callable[[Event], None],
+    ) -> Callable[[], None]:
+        """Call callback(event) for every event stored on a session.
+
+        Callbacks run on the thread that stored the event, after the shard lock
+        is released, in the order the events were stored.
+
+        Returns:
+            A function that cancels the subscription
+        """
+        key = (app_name, user_id, session_id)
+        with self._subscribers_lock:
+            self._subscribers.setdefault(key, []).append(callback)
+
+        def unsubscribe():
+            with self._subscribers_lock:
+                callbacks = self._subscribers.get(key, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+                if not callbacks:
+                    self._subscribers.pop(key, None)
+
+        return unsubscribe
+
+    def _notify(self, key: SessionKey, event: Event) -> None:
+        with self._subscribers_lock:
+            callbacks = list(self._subscribers.get(key, ()))
+        for callback in callbacks:
+            callback(event)
+
+    # ===== Eviction and accounting =====
+
+    def evict_idle(self, max_idle_seconds: Optional[float] = None) -> int:
+        """Spill sessions idle for longer than max_idle_seconds to disk.
+
+        Returns:
+            The number of sessions spilled
+        """
+        max_idle = (
+            self.max_idle_seconds if max_idle_seconds is None else max_idle_seconds
+        )
+        cutoff = time.monotonic() - max_idle
+        spilled = 0
+        for shard in self._shards:
+            with shard.lock:
+                for sessions in shard.sessions.values():
+                    for slot in sessions.values():
+                        if slot.session is not None and slot.last_access <= cutoff:
+                            self._spill(shard, slot)
+                            spilled += 1
+        return spilled
+
+    def start_evictor(self, interval_seconds: float = 60.0) -> None:
+        """Run evict_idle() on a background thread every interval_seconds."""
+        if self._evictor is None:
+            self._evictor = _PeriodicTask(
+                "session-evictor", self.evict_idle, interval_seconds
+            )
+
+    def stop_evictor(self) -> None:
+        if self._evictor is not None:
+            self._evictor.stop()
+            self._evictor = None
+
+    # ===== Snapshots =====
+
+    def _capture_shard(self, shard: _Shard):
+        """Copy what a snapshot needs from one shard, holding only its lock.
+
+        Stored events are never modified, so only the containers around them
+        are copied: the shard is locked for as long as it takes to copy the
+        session states and event lists, not to serialize them.
+        """
+        user_states, sessions = [], []
+        with shard.lock:
+            for user_key, state in shard.user_state.items():
+                user_states.append((user_key, copy.deepcopy(state)))
+            for (app_name, user_id), slots in shard.sessions.items():
+                for session_id, slot in slots.items():
+                    key = (app_name, user_id, session_id)
+                    if slot.session is None:
+                        # Already pickled in the spill file
+                        with open(slot.spill_path, "rb") as f:
+                            sessions.append((key, slot.size, f.read()))
+                        continue
+                    session = slot.session.model_copy(
+                        update={
+                            "state": copy.deepcopy(slot.session.state),
+                            "events": list(slot.session.events),
+                        }
+                    )
+                    events = slot.events.copy() if slot.events is not None else None
+                    sessions.append((key, slot.size, (session, events)))
+        return user_states, sessions
+
+    def snapshot(self, path: str) -> int:
+        """Write every session, and the app and user state, to a snapshot file.
+
+        Shards are captured and written one at a time, so serving continues
+        (a shard is only locked while it is being copied) and only one shard's
+        copy is held in memory at a time.
+
+        Returns:
+            The number of frames written
+        """
+
+        def frames():
+            with self._app_state_lock:
+                app_states = copy.deepcopy(self.app_state)
+            for app_name, state in app_states.items():
+                yield APP_STATE, (app_name, state)
+            for shard in self._shards:
+                user_states, sessions = self._capture_shard(shard)
+                for user_key, state in user_states:
+                    yield USER_STATE, (user_key, state)
+                for key, size, value in sessions:
+                    if not isinstance(value, bytes):
+                        value = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                    yield SESSION, (key, size, value)
+
+        count = write_snapshot(path, frames())
+        self._count("snapshots")
+        return count
+
+    def restore(self, path: str, lazy: bool = False) -> int:
+        """Load the sessions and state of a snapshot file into this service.
+
+        Sessions already in the service with the same ids are replaced.
+
+        Args:
+            path: A file written by snapshot()
+            lazy: Write the sessions to the spill directory as they are instead
+                of unpickling them; each one is loaded on first access
+
+        Returns:
+            The number of sessions restored
+
+        Raises:
+            SnapshotError: If the file is not a valid snapshot
+        """
+        restored = 0
+        for kind, value in read_snapshot(path):
+            if kind == APP_STATE:
+                app_name, state = value
+                with self._app_state_lock:
+                    self.app_state[app_name] = state
+            elif kind == USER_STATE:
+                (app_name, user_id), state = value
+                shard = self._shard(app_name, user_id)
+                with shard.lock:
+                    shard.user_state[(app_name, user_id)] = state
+            elif kind == SESSION:
+                (app_name, user_id, session_id), size, blob = value
+                self._restore_session(app_name, user_id, session_id, size, blob, lazy)
+                restored += 1
+        return restored
+
+    def _restore_session(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        size: int,
+        blob: bytes,
+        lazy: bool,
+    ) -> None:
+        shard = self._shard(app_name, user_id)
+        slot = _Slot(None, size)
+        if lazy:
+            # The previous slot may be spilled to the same path, so the blob
+            # is only moved there once that slot is discarded
+            spill_path = self._spill_path(app_name, user_id, session_id)
+            tmp_path = f"{spill_path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(blob)
+        else:
+            slot.session, slot.events = pickle.loads(blob)
+        with shard.lock:
+            sessions = shard.sessions.setdefault((app_name, user_id), {})
+            previous = sessions.get(session_id)
+            if previous is not None:
+                self._discard(shard, previous)
+            if lazy:
+                os.replace(tmp_path, spill_path)
+                slot.spill_path = spill_path
+            sessions[session_id] = slot
+            if slot.session is not None:
+                shard.resident_bytes += size
+
+    def start_snapshotter(self, path: str, interval_seconds: float = 300.0) -> None:
+        """Run snapshot(path) on a background thread every interval_seconds."""
+        if self._snapshotter is None:
+            self._snapshotter = _PeriodicTask(
+                "session-snapshotter", lambda: self.snapshot(path), interval_seconds
+            )
+
+    def stop_snapshotter(self) -> None:
+        if self._snapshotter is not None:
+            self._snapshotter.stop()
+            self._snapshotter = None
+
+    def session_size(self, *, app_name: str, user_id: str, session_id: str) -> int:
+        """Estimated size in bytes of a session's state and events."""
+        shard = self._shard(app_name, user_id)
+        with shard.lock:
+            slot = self._slot(shard, app_name, user_id, session_id)
+            return slot.size if slot else 0
+
+    def stats(self) -> Dict[str, Any]:
+        sessions = resident = resident_bytes = 0
+        shard_sessions: List[int] = []
+        for shard in self._shards:
+            with shard.lock:
+                count = sum(len(s) for s in shard.sessions.values())
+                sessions += count
+                resident += sum(
+                    1
+                    for s in shard.sessions.values()
+                    for slot in s.values()
+                    if slot.session is not None
+                )
+                resident_bytes += shard.resident_bytes
+                shard_sessions.append(count)
+        with self._counters_lock:
+            counters = dict(self._counters)
+        return {
+            "sessions": sessions,
+            "resident": resident,
+            "spilled": sessions - resident,
+            "resident_bytes": resident_bytes,
+            "largest_shard": max(shard_sessions, default=0),
+            **counters,
+        }
@@ -1,5 +1,12 @@
+import copy
+import sys
+import time
 from datetime import datetime
 
+from customer_service_agent.course_store import load_courses
+from customer_service_agent.history import HISTORY_WINDOW, rollup_state_entry
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.sessions.state import State
 from google.genai import types
 
 
@@ -34,7 +41,7 @@ def update_interaction_history(session_service, app_name, user_id, session_id, e
     """Add an entry to the interaction history in state.
 
     Args:
-        session_service: The session service instance
+        session_service: The session service instance (an AppendableSessionService)
         app_name: The application name
         user_id: The user ID
         session_id: The session ID
@@ -43,31 +50,20 @@ def update_interaction_history(session_service, app_name, user_id, session_id, e
             - other keys are flexible depending on the action type
     """
     try:
-        # Get current session
-        session = session_service.get_session(
-            app_name=app_name, user_id=user_id, session_id=session_id
-        )
-
-        # Get current interaction history
-        interaction_history = session.state.get("interaction_history", [])
-
         # Add timestamp if not already present
         if "timestamp" not in entry:
             entry["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        # Add the entry to interaction history
-        interaction_history.append(entry)
-
-        # Create updated state
-        updated_state = session.state.copy()
-        updated_state["interaction_history"] = interaction_history
-
-        # Create a new session with updated state
-        session_service.create_session(
+        # Append the entry under the session's lock; this is recorded as an event.
+        # Only the most recent entries are kept; older ones live on in the rollup
+        session_service.append_to_state_list(
             app_name=app_name,
             user_id=user_id,
             session_id=session_id,
-            state=updated_state,
+            key="interaction_history",
+            item=entry,
+            max_length=HISTORY_WINDOW,
+            on_append=rollup_state_entry,
         )
     except Exception as e:
         print(f"Error updating interaction history: {e}")
@@ -104,6 +100,66 @@ def add_agent_response_to_history(
     )
 
 
+# State keys display_state shows in their own sections (or not at all)
+DISPLAYED_KEYS = [
+    "user_name",
+    "purchased_courses",
+    "interaction_history",
+    "interaction_rollup",
+]
+
+
+def format_interaction(idx, interaction):
+    """Format one interaction history entry as a display line."""
+    # Pretty format dict entries, or just show strings
+    if not isinstance(interaction, dict):
+        return f"  {idx}. {interaction}"
+
+    action = interaction.get("action", "interaction")
+    timestamp = interaction.get("timestamp", "unknown time")
+
+    if action == "user_query":
+        query = interaction.get("query", "")
+        return f'  {idx}. User query at {timestamp}: "{query}"'
+    if action == "agent_response":
+        agent = interaction.get("agent", "unknown")
+        response = interaction.get("response", "")
+        # Truncate very long responses for display
+        if len(response) > 100:
+            response = response[:97] + "..."
+        return f'  {idx}. {agent} response at {timestamp}: "{response}"'
+    details = ", ".join(
+        f"{k}: {v}" for k, v in interaction.items() if k not in ["action", "timestamp"]
+    )
+    return f"  {idx}. {action} at {timestamp}" + (f" ({details})" if details else "")
+
+
+def print_courses(state):
+    """Print purchased courses (keyed by course id, or the older list format)."""
+    purchased_courses = load_courses(state.get("purchased_courses", {}))
+    if purchased_courses:
+        print("📚 Courses:")
+        for course_id, details in purchased_courses.items():
+            purchase_date = details.get("purchase_date", "Unknown date")
+            print(f"  - {course_id} (purchased on {purchase_date})")
+    else:
+        print("📚 Courses: None")
+
+
+def print_rollup(state):
+    """Print the summary of all interactions, including those out of the window."""
+    rollup = state.get("interaction_rollup")
+    if rollup:
+        counts = ", ".join(
+            f"{action}: {count}"
+            for action, count in rollup.get("action_counts", {}).items()
+        )
+        print(
+            f"📊 Interaction Summary: {rollup.get('total_interactions', 0)} total"
+            + (f" ({counts})" if counts else "")
+        )
+
+
 def display_state(
     session_service, app_name, user_id, session_id, label="Current State"
 ):
@@ -120,61 +176,21 @@ def display_state(
         user_name = session.state.get("user_name", "Unknown")
         print(f"👤 User: {user_name}")
 
-        # Handle purchased courses
-        purchased_courses = session.state.get("purchased_courses", [])
-        if purchased_courses and any(purchased_courses):
-            print("📚 Courses:")
-            for course in purchased_courses:
-                if isinstance(course, dict):
-                    course_id = course.get("id", "Unknown")
-                    purchase_date = course.get("purchase_date", "Unknown date")
-                    print(f"  - {course_id} (purchased on {purchase_date})")
-                elif course:  # Handle string format for backward compatibility
-                    print(f"  - {course}")
-        else:
-            print("📚 Courses: None")
+        print_courses(session.state)
 
         # Handle interaction history in a more readable way
         interaction_history = session.state.get("interaction_history", [])
         if interaction_history:
             print("📝 Interaction History:")
             for idx, interaction in enumerate(interaction_history, 1):
-                # Pretty format dict entries, or just show strings
-                if isinstance(interaction, dict):
-                    action = interaction.get("action", "interaction")
-                    timestamp = interaction.get("timestamp", "unknown time")
-
-                    if action == "user_query":
-                        query = interaction.get("query", "")
-                        print(f'  {idx}. User query at {timestamp}: "{query}"')
-                    elif action == "agent_response":
-                        agent = interaction.get("agent", "unknown")
-                        response = interaction.get("response", "")
-                        # Truncate very long responses for display
-                        if len(response) > 100:
-                            response = response[:97] + "..."
-                        print(f'  {idx}. {agent} response at {timestamp}: "{response}"')
-                    else:
-                        details = ", ".join(
-                            f"{k}: {v}"
-                            for k, v in interaction.items()
-                            if k not in ["action", "timestamp"]
-                        )
-                        print(
-                            f"  {idx}. {action} at {timestamp}"
-                            + (f" ({details})" if details else "")
-                        )
-                else:
-                    print(f"  {idx}. {interaction}")
+                print(format_interaction(idx, interaction))
         else:
             print("📝 Interaction History: None")
 
+        print_rollup(session.state)
+
         # Show any additional state keys that might exist
-        other_keys = [
-            k
-            for k in session.state.keys()
-            if k not in ["user_name", "purchased_courses", "interaction_history"]
-        ]
+        other_keys = [k for k in session.state.keys() if k not in DISPLAYED_KEYS]
         if other_keys:
             print("🔑 Additional State:")
             for key in other_keys:
@@ -185,15 +201,247 @@ def display_state(
         print(f"Error displaying state: {e}")
 
 
-async def process_agent_response(event):
-    """Process and display agent response events."""
+class StateView:
+    """A copy of session state kept up to date from events, shown as changes.
+
+    display_state re-reads the session and prints the whole interaction history
+    every time. A StateView reads the session once, then applies the state
+    changes each stored event carries (state deltas, and the appends recorded by
+    append_to_state_list). display_changes() prints only the keys that changed
+    since the last call, and only the new history entries, so its cost doesn't
+    depend on how long the conversation has been going.
+
+    Args:
+        state: The session state to start from (a copy the view may modify)
+        on_append: Per state key, the on_append hook that was passed to
+            append_to_state_list, to re-apply to the view's copy
+    """
+
+    def __init__(self, state, on_append=None):
+        self.state = state
+        self.on_append = (
+            on_append
+            if on_append is not None
+            else {"interaction_history": rollup_state_entry}
+        )
+        self.unsubscribe = None
+        self._changed = {}
+        self._history_shown = self._history_total()
+
+    @classmethod
+    def attach(cls, session_service, app_name, user_id, session_id):
+        """Create a view of a session that follows the events stored on it.
+
+        Args:
+            session_service: A service with subscribe(), such as
+                ShardedSessionService
+        """
+        session = session_service.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        view = cls(session.state)
+        view.unsubscribe = session_service.subscribe(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            callback=view.apply_event,
+        )
+        return view
+
+    def apply_event(self, event):
+        """Apply the state changes recorded on an event."""
+        if event.actions and event.actions.state_delta:
+            for key, value in event.actions.state_delta.items():
+                if key.startswith(State.TEMP_PREFIX):
+                    continue
+                # Copied, since the session service holds the same objects
+                self.state[key] = copy.deepcopy(value)
+                self._changed[key] = None
+
+        state_append = (event.custom_metadata or {}).get("state_append")
+        if state_append:
+            key, item = state_append["key"], copy.deepcopy(state_append["item"])
+            items = self.state.setdefault(key, [])
+            items.append(item)
+            hook = self.on_append.get(key)
+            if hook is not None:
+                hook(self.state, item)
+            max_length = state_append.get("max_length")
+            if max_length is not None and len(items) > max_length:
+                del items[:-max_length]
+            self._changed[key] = None
+
+    def _history_total(self):
+        """How many history entries were ever recorded (the rollup's count)."""
+        rollup = self.state.get("interaction_rollup")
+        if isinstance(rollup, dict):
+            return rollup.get("total_interactions", 0)
+        return len(self.state.get("interaction_history", []))
+
+    def display(self, label="Current State"):
+        """Print the whole state once, like display_state."""
+        print(f"\n{'-' * 10} {label} {'-' * 10}")
+        print(f"👤 User: {self.state.get('user_name', 'Unknown')}")
+        print_courses(self.state)
+        interaction_history = self.state.get("interaction_history", [])
+        if interaction_history:
+            print("📝 Interaction History:")
+            first = self._history_total() - len(interaction_history) + 1
+            for idx, interaction in enumerate(interaction_history, first):
+                print(format_interaction(idx, interaction))
+        else:
+            print("📝 Interaction History: None")
+        print_rollup(self.state)
+        for key in self.state:
+            if key not in DISPLAYED_KEYS:
+                print(f"🔑 {key}: {self.state[key]}")
+        print("-" * (22 + len(label)))
+        self._changed.clear()
+        self._history_shown = self._history_total()
+
+    def display_changes(self, label="State Changes"):
+        """Print the keys that changed since the last display."""
+        print(f"\n{'-' * 10} {label} {'-' * 10}")
+        if not self._changed:
+            print("(no changes)")
+        for key in self._changed:
+            if key == "user_name":
+                print(f"👤 User: {self.state.get('user_name', 'Unknown')}")
+            elif key == "purchased_courses":
+                print_courses(self.state)
+            elif key == "interaction_history":
+                # The rollup changes with the history, and is shown with it
+                self._display_new_history()
+                print_rollup(self.state)
+            elif key == "interaction_rollup":
+                if "interaction_history" not in self._changed:
+                    print_rollup(self.state)
+            else:
+                print(f"🔑 {key}: {self.state.get(key)}")
+        print("-" * (22 + len(label)))
+        self._changed.clear()
+        self._history_shown = self._history_total()
+
+    def _display_new_history(self):
+        interaction_history = self.state.get("interaction_history", [])
+        total = self._history_total()
+        new = min(total - self._history_shown, len(interaction_history))
+        if new <= 0:
+            return
+        print("📝 New Interactions:")
+        entries = interaction_history[len(interaction_history) - new :]
+        for idx, interaction in enumerate(entries, total - new + 1):
+            print(format_interaction(idx, interaction))
+
+
+def display_response_cache_stats(cache):
+    """Display hit rates of the policy and course support response cache."""
+    stats = cache.stats()
+    print(f"\n{'-' * 10} Response Cache {'-' * 10}")
+    print(
+        f"💾 Lookups: {stats['hits'] + stats['misses']} (hits: {stats['hits']}, "
+        f"misses: {stats['misses']})"
+    )
+    print(f"🎯 Hit rate: {stats['hit_rate']:.1%}")
+    print(
+        f"🗂️  Cached answers: {stats['entries']} (expired: {stats['expirations']}, "
+        f"evicted: {stats['evictions']})"
+    )
+    print("-" * 36)
+
+
+class ResponseStream:
+    """Renders streamed text deltas and times one agent call.
+
+    Time to first token is measured from the start of the call to the first
+    text the user sees, separately from the total latency of the call.
+    """
+
+    def __init__(self, write=None):
+        self.write = write or _write_stdout
+        self.author = None
+        self.started_at = time.perf_counter()
+        self.first_token_s = None
+        self.total_s = None
+
+    @property
+    def is_open(self):
+        return self.author is not None
+
+    def mark_first_token(self):
+        if self.first_token_s is None:
+            self.first_token_s = time.perf_counter() - self.started_at
+
+    def add_delta(self, author, text):
+        """Print a chunk of a partial response as soon as it arrives."""
+        if self.author != author:
+            self.close()
+            self.write(
+                f"\n{Colors.BG_BLUE}{Colors.WHITE}{Colors.BOLD}╔══ AGENT RESPONSE ({author}) ═════════════════════════════{Colors.RESET}\n"
+            )
+            self.author = author
+        self.mark_first_token()
+        self.write(f"{Colors.CYAN}{Colors.BOLD}{text}{Colors.RESET}")
+
+    def close(self):
+        """End the response currently being streamed, if any."""
+        if not self.is_open:
+            return
+        self.write(
+            f"\n{Colors.BG_BLUE}{Colors.WHITE}{Colors.BOLD}╚═════════════════════════════════════════════════════════════{Colors.RESET}\n\n"
+        )
+        self.author = None
+
+    def finish(self):
+        self.close()
+        self.total_s = time.perf_counter() - self.started_at
+
+
+def _write_stdout(text):
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def display_response_timing(response_stream):
+    """Display time to first token and total latency of an agent call."""
+    first_token = (
+        f"{response_stream.first_token_s:.2f}s"
+        if response_stream.first_token_s is not None
+        else "n/a"
+    )
+    print(f"⏱️  First token: {first_token}, total: {response_stream.total_s:.2f}s")
+
+
+async def process_agent_response(event, response_stream=None):
+    """Process and display agent response events.
+
+    Partial events (streaming mode) are rendered as text deltas through
+    response_stream; the final event that follows them is not printed again.
+    """
+    # Render streamed text as it arrives
+    if event.partial:
+        if response_stream and event.content and event.content.parts:
+            for part in event.content.parts:
+                if part.text:
+                    response_stream.add_delta(event.author, part.text)
+        return None
+
+    streamed = response_stream is not None and response_stream.author == event.author
+    if response_stream:
+        response_stream.close()
+
     print(f"Event ID: {event.id}, Author: {event.author}")
 
     # Check for specific parts first
     has_specific_part = False
     if event.content and event.content.parts:
         for part in event.content.parts:
-            if hasattr(part, "text") and part.text and not part.text.isspace():
+            if (
+                hasattr(part, "text")
+                and part.text
+                and not part.text.isspace()
+                and not streamed
+            ):
                 print(f"  Text: '{part.text.strip()}'")
 
     # Check for final response after specific parts
@@ -206,6 +454,11 @@ async def process_agent_response(event):
             and event.content.parts[0].text
         ):
             final_response = event.content.parts[0].text.strip()
+            if streamed:
+                # Already rendered delta by delta
+                return final_response
+            if response_stream:
+                response_stream.mark_first_token()
             # Use colors and formatting to make the final response stand out
             print(
                 f"\n{Colors.BG_BLUE}{Colors.WHITE}{Colors.BOLD}╔══ AGENT RESPONSE ═════════════════════════════════════════{Colors.RESET}"
@@ -222,8 +475,17 @@ async def process_agent_response(event):
     return final_response
 
 
-async def call_agent_async(runner, user_id, session_id, query):
-    """Call the agent asynchronously with the user's query."""
+async def call_agent_async(
+    runner, user_id, session_id, query, stream=False, console=None, state_view=None
+):
+    """Call the agent asynchronously with the user's query.
+
+    Args:
+        stream: Stream the response, printing text as the model generates it
+        console: An AsyncConsole to write streamed text through (optional)
+        state_view: A StateView of the session; if given, only state changes
+            are displayed instead of the full state before and after
+    """
     content = types.Content(role="user", parts=[types.Part(text=query)])
     print(
         f"\n{Colors.BG_GREEN}{Colors.BLACK}{Colors.BOLD}--- Running Query: {query} ---{Colors.RESET}"
@@ -232,27 +494,40 @@ async def call_agent_async(runner, user_id, session_id, query):
     agent_name = None
 
     # Display state before processing the message
-    display_state(
-        runner.session_service,
-        runner.app_name,
-        user_id,
-        session_id,
-        "State BEFORE processing",
+    if state_view:
+        state_view.display_changes("State changes BEFORE processing")
+    else:
+        display_state(
+            runner.session_service,
+            runner.app_name,
+            user_id,
+            session_id,
+            "State BEFORE processing",
+        )
+
+    run_config = RunConfig(
+        streaming_mode=StreamingMode.SSE if stream else StreamingMode.NONE
     )
+    response_stream = ResponseStream(write=console.write if console else None)
 
     try:
         async for event in runner.run_async(
-            user_id=user_id, session_id=session_id, new_message=content
+            user_id=user_id,
+            session_id=session_id,
+            new_message=content,
+            run_config=run_config,
         ):
             # Capture the agent name from the event if available
             if event.author:
                 agent_name = event.author
 
-            response = await process_agent_response(event)
+            response = await process_agent_response(event, response_stream)
             if response:
                 final_response_text = response
     except Exception as e:
         print(f"{Colors.BG_RED}{Colors.WHITE}ERROR during agent run: {e}{Colors.RESET}")
+    response_stream.finish()
+    display_response_timing(response_stream)
 
     # Add the agent response to interaction history if we got a final response
     if final_response_text and agent_name:
@@ -266,13 +541,16 @@ async def call_agent_async(runner, user_id, session_id, query):
         )
 
     # Display state after processing the message
-    display_state(
-        runner.session_service,
-        runner.app_name,
-        user_id,
-        session_id,
-        "State AFTER processing",
-    )
+    if state_view:
+        state_view.display_changes("State changes AFTER processing")
+    else:
+        display_state(
+            runner.session_service,
+            runner.app_name,
+            user_id,
+            session_id,
+            "State AFTER processing",
+        )
 
     print(f"{Colors.YELLOW}{'-' * 30}{Colors.RESET}")
     return final_response_text